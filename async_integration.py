@@ -0,0 +1,237 @@
+"""
+AI简历职位匹配系统 - 异步集成模块
+JobSearchIntegration的asyncio版本：阻塞的Selenium抓取交给有界线程池，
+简历解析、分析和匹配交给独立的计算线程池，MCP调用使用aiohttp非阻塞执行（aiohttp未安装时退回asyncio.to_thread调用同步实现）。
+相同的并发搜索在事件循环内合并，等待中的请求不占用线程，一个事件循环可以服务大量并发用户
+"""
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from job_search_integration_selenium import JobSearchIntegration
+from query_normalizer import canonical_search_key
+from web_scraper import search_jobs_with_mcp_async
+
+logger = logging.getLogger(__name__)
+
+# 同时运行的Selenium抓取数（每个抓取占用一个浏览器进程）
+DEFAULT_SELENIUM_WORKERS = int(os.environ.get("JOBMATCH_SELENIUM_WORKERS", 2))
+# 简历解析、分析、匹配和缓存命中的搜索使用的线程数
+DEFAULT_CPU_WORKERS = int(os.environ.get("JOBMATCH_ASYNC_CPU_WORKERS", 4))
+
+SEARCH_BACKENDS = ("selenium", "mcp")
+
+
+class AsyncJobSearchIntegration:
+    """异步职位搜索集成类
+
+    取消或超时时等待立即结束并向调用方抛出asyncio.CancelledError/asyncio.TimeoutError；
+    已经在线程中运行的抓取无法中断，会在后台完成并写入缓存，供后续请求使用
+    """
+
+    def __init__(self, integration: Optional[JobSearchIntegration] = None, search_backend: str = "selenium",
+                 selenium_workers: int = DEFAULT_SELENIUM_WORKERS, cpu_workers: int = DEFAULT_CPU_WORKERS):
+        """初始化异步集成类
+
+        Args:
+            integration: 同步集成实例，为None时新建
+            search_backend: 搜索后端，selenium或mcp
+            selenium_workers: 同时运行的Selenium抓取数
+            cpu_workers: 计算线程数
+
+        Raises:
+            ValueError: 搜索后端无效
+        """
+        if search_backend not in SEARCH_BACKENDS:
+            raise ValueError(f"无效的搜索后端: {search_backend}")
+        self.integration = integration or JobSearchIntegration()
+        self.search_backend = search_backend
+        self._selenium_executor = ThreadPoolExecutor(max_workers=selenium_workers, thread_name_prefix="async-selenium")
+        self._cpu_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="async-cpu")
+        # 进行中的搜索，键为(事件循环, 搜索键)，相同搜索的后到者直接等待同一个任务
+        self._inflight = {}
+
+    async def _run(self, executor: ThreadPoolExecutor, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def _with_timeout(self, coro, timeout: Optional[float]) -> Any:
+        if timeout is None:
+            return await coro
+        return await asyncio.wait_for(coro, timeout)
+
+    def _can_answer_without_crawl(self, keywords: str, location: str, limit: int, platform: str) -> bool:
+        """判断搜索能否不启动浏览器完成（模拟数据或缓存可用）"""
+        scraper = self.integration.job_scraper
+        if platform == "模拟数据" or scraper is None:
+            return True
+        entry = scraper._load_cache_entry(keywords, location, platform, limit)
+        if entry is None:
+            return False
+        max_age = scraper.hard_ttl if scraper.stale_while_revalidate else scraper.soft_ttl
+        return time.time() - entry[0] <= max_age
+
+    async def _search(self, keywords: str, location: str, limit: int, platform: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        if self.search_backend == "mcp":
+            jobs = await search_jobs_with_mcp_async(keywords, location, limit, platform)
+            return jobs, {'source': 'mcp', 'age_seconds': 0.0, 'stale': False, 'refreshing': False}
+
+        # 缓存可用时不占用Selenium线程，避免排在慢抓取之后
+        fast = await self._run(self._cpu_executor, self._can_answer_without_crawl, keywords, location, limit, platform)
+        executor = self._cpu_executor if fast else self._selenium_executor
+        return await self._run(executor, self.integration.search_jobs_with_meta, keywords, location, limit, platform)
+
+    async def search_jobs_with_meta(self, keywords: str, location: str = "北京", limit: int = 10,
+                                    platform: str = "智联招聘", timeout: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """搜索职位，并返回结果的来源和新鲜度
+
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            limit: 结果数量限制
+            platform: 平台
+            timeout: 超时时间（秒）
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, Any]]: (职位列表, 元数据)
+        """
+        key = (asyncio.get_running_loop(), f"{self.search_backend}|{canonical_search_key(keywords, location, platform)}|{limit}")
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._search(keywords, location, limit, platform))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield：一个调用方取消或超时不影响等待同一搜索的其他调用方
+        jobs, meta = await self._with_timeout(asyncio.shield(task), timeout)
+        return [dict(job) for job in jobs], dict(meta)
+
+    async def search_jobs(self, keywords: str, location: str = "北京", limit: int = 10,
+                          platform: str = "智联招聘", timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """搜索职位
+
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            limit: 结果数量限制
+            platform: 平台
+            timeout: 超时时间（秒）
+
+        Returns:
+            List[Dict[str, Any]]: 职位列表
+        """
+        jobs, _ = await self.search_jobs_with_meta(keywords, location, limit, platform, timeout)
+        return jobs
+
+    async def parse_resume(self, file_path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """解析简历
+
+        Args:
+            file_path: 简历文件路径
+            timeout: 超时时间（秒）
+
+        Returns:
+            Dict[str, Any]: 简历数据
+        """
+        return await self._with_timeout(self._run(self._cpu_executor, self.integration.parse_resume, file_path), timeout)
+
+    async def analyze_resume(self, resume_data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """分析简历
+
+        Args:
+            resume_data: 简历数据
+            timeout: 超时时间（秒）
+
+        Returns:
+            Dict[str, Any]: 分析结果
+        """
+        return await self._with_timeout(self._run(self._cpu_executor, self.integration.analyze_resume, resume_data), timeout)
+
+    async def parse_and_analyze_resume(self, file_path: str,
+                                       timeout: Optional[float] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """解析并分析简历，内容相同的简历直接返回缓存的结果
+
+        Args:
+            file_path: 简历文件路径
+            timeout: 超时时间（秒）
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: (简历数据, 分析结果)
+        """
+        return await self._with_timeout(
+            self._run(self._cpu_executor, self.integration.parse_and_analyze_resume, file_path), timeout
+        )
+
+    async def match_resume_to_jobs(self, resume_data: Dict[str, Any], jobs: List[Dict[str, Any]],
+                                   resume_analysis: Optional[Dict[str, Any]] = None,
+                                   timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """匹配简历与职位
+
+        Args:
+            resume_data: 简历数据
+            jobs: 职位列表
+            resume_analysis: 已有的简历分析结果，为None时重新分析
+            timeout: 超时时间（秒）
+
+        Returns:
+            List[Dict[str, Any]]: 匹配结果
+        """
+        return await self._with_timeout(
+            self._run(self._cpu_executor, self.integration.match_resume_to_jobs, resume_data, jobs, resume_analysis),
+            timeout
+        )
+
+    async def _process(self, resume_file_path: str, keywords: str, location: str, limit: int, platform: str) -> Dict[str, Any]:
+        resume_task = asyncio.ensure_future(self.parse_and_analyze_resume(resume_file_path))
+        search_task = asyncio.ensure_future(self.search_jobs_with_meta(keywords, location, limit, platform))
+        tasks = [resume_task, search_task]
+        try:
+            # 任一分支出错时立即取消另一个分支并抛出异常
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+            (resume_data, resume_analysis), (jobs, jobs_meta) = resume_task.result(), search_task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        match_results = await self.match_resume_to_jobs(resume_data, jobs, resume_analysis)
+        return {
+            'resume_data': resume_data,
+            'resume_analysis': resume_analysis,
+            'jobs': jobs,
+            'jobs_meta': jobs_meta,
+            'match_results': match_results
+        }
+
+    async def process_resume_and_search_jobs(self, resume_file_path: str, keywords: str, location: str = "北京",
+                                             limit: int = 10, platform: str = "智联招聘",
+                                             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """处理简历并搜索职位，简历分支与搜索分支并发执行
+
+        Args:
+            resume_file_path: 简历文件路径
+            keywords: 搜索关键词
+            location: 地点
+            limit: 结果数量限制
+            platform: 平台
+            timeout: 整个流程的超时时间（秒）
+
+        Returns:
+            Dict[str, Any]: 处理结果，与JobSearchIntegration.process_resume_and_search_jobs相同
+        """
+        return await self._with_timeout(
+            self._process(resume_file_path, keywords, location, limit, platform), timeout
+        )
+
+    def close(self) -> None:
+        """关闭线程池，不等待正在运行的抓取"""
+        self._selenium_executor.shutdown(wait=False)
+        self._cpu_executor.shutdown(wait=False)
+
+
+# 导出类
+__all__ = ['AsyncJobSearchIntegration']
@@ -0,0 +1,293 @@
+"""
+AI简历职位匹配系统 - 批量匹配命令行工具
+离线批量匹配：流式读取简历目录和JSONL职位文件，在进程池中解析、分析和匹配简历，
+每份简历的前k个匹配结果逐行写入JSONL；输出文件同时作为检查点，中断后重新运行会跳过已完成的简历。
+提取单份简历文本有时间和内存上限，超出时该简历记为失败；--retry-failed重新处理失败的简历，
+新结果追加在失败记录之后，同一简历以最后一行为准
+
+用法:
+    python batch_match.py --resumes ./resumes --jobs jobs.jsonl --output matches.jsonl --top-k 10
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Iterator, Set
+
+from resume_analyzer import ResumeAnalyzer, parse_resume_text, match_resume_to_jobs_enhanced
+from resume_extractors import (extract_text, ExtractionError, RESOURCE_AVAILABLE,
+                               DEFAULT_EXTRACT_TIMEOUT, DEFAULT_EXTRACT_MEMORY_MB)
+
+if RESOURCE_AVAILABLE:
+    import resource
+
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = ('.txt', '.pdf', '.docx')
+DEFAULT_TOP_K = 10
+DEFAULT_REPORT_INTERVAL = 10.0  # 吞吐量报告间隔（秒）
+
+
+def iter_resume_files(directory: str) -> Iterator[str]:
+    """按路径顺序遍历目录（含子目录）中的简历文件
+
+    Args:
+        directory: 简历目录
+
+    Yields:
+        str: 相对于directory的简历路径
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                yield os.path.relpath(os.path.join(root, name), directory)
+
+
+def iter_jobs(jobs_path: str) -> Iterator[Dict[str, Any]]:
+    """逐行读取JSONL职位文件，跳过空行和无法解析的行
+
+    Args:
+        jobs_path: JSONL文件路径
+
+    Yields:
+        Dict[str, Any]: 职位
+    """
+    with open(jobs_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError:
+                logger.warning(f"跳过无法解析的职位（第{line_number}行）")
+                continue
+            if isinstance(job, dict):
+                yield job
+
+
+def load_checkpoint(output_path: str, retry_failed: bool = False) -> Set[str]:
+    """从已有的输出文件恢复已完成的简历
+
+    中断时可能留下写了一半的最后一行，将其截掉后继续追加
+
+    Args:
+        output_path: 输出文件路径
+        retry_failed: 为True时失败的简历不算完成，会被重新处理
+
+    Returns:
+        Set[str]: 已完成的简历路径
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    valid_size = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+                resume = record['resume']
+            except (ValueError, KeyError, TypeError):
+                break
+            if 'error' in record and retry_failed:
+                # 后面的行可能是之前重试成功的结果
+                done.discard(resume)
+            else:
+                done.add(resume)
+            valid_size += len(line)
+
+    if valid_size < os.path.getsize(output_path):
+        logger.warning(f"输出文件末尾不完整，截断到{valid_size}字节")
+        with open(output_path, 'r+b') as f:
+            f.truncate(valid_size)
+    return done
+
+
+# 工作进程内的全局状态：每个进程只加载一次职位索引和分析器
+_worker_jobs = []
+_worker_analyzer = None
+_worker_extract_timeout = 0.0
+
+
+def _address_space_bytes() -> Optional[int]:
+    """当前进程的虚拟内存大小，无法获取时返回None（仅支持Linux的/proc）"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _init_worker(jobs_path: str, extract_timeout: float = DEFAULT_EXTRACT_TIMEOUT,
+                 extract_memory_mb: int = DEFAULT_EXTRACT_MEMORY_MB) -> None:
+    global _worker_jobs, _worker_analyzer, _worker_extract_timeout
+    _worker_jobs = list(iter_jobs(jobs_path))
+    _worker_analyzer = ResumeAnalyzer()
+    _worker_extract_timeout = extract_timeout if hasattr(signal, 'SIGALRM') else 0.0
+
+    # 职位索引和知识库已经加载，内存上限在当前占用之上再留出提取单份简历的余量；
+    # 超出时提取抛出MemoryError，只有该简历记为失败
+    if RESOURCE_AVAILABLE and extract_memory_mb > 0:
+        current = _address_space_bytes()
+        if current is not None:
+            limit = current + extract_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+
+
+def _on_extract_timeout(signum, frame):
+    raise ExtractionError(f"提取简历文本超时（{_worker_extract_timeout:g}秒）")
+
+
+def _extract_with_timeout(path: str) -> str:
+    """在工作进程的主线程中提取简历文本，超过时间上限时由SIGALRM中断"""
+    if _worker_extract_timeout <= 0:
+        return extract_text(path)
+    previous = signal.signal(signal.SIGALRM, _on_extract_timeout)
+    signal.setitimer(signal.ITIMER_REAL, _worker_extract_timeout)
+    try:
+        return extract_text(path)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def match_one(resume_dir: str, relative_path: str, top_k: int) -> Dict[str, Any]:
+    """在工作进程中解析、分析并匹配一份简历
+
+    Args:
+        resume_dir: 简历目录
+        relative_path: 简历相对路径
+        top_k: 保留的匹配数量
+
+    Returns:
+        Dict[str, Any]: 一行输出
+    """
+    try:
+        # 已在工作进程中，直接提取，不再经过提取进程池；时间和内存上限在工作进程内施加
+        text = _extract_with_timeout(os.path.join(resume_dir, relative_path))
+        resume_data = parse_resume_text(text, _worker_analyzer)
+        resume_analysis = _worker_analyzer.analyze_resume(resume_data)
+        match_results = match_resume_to_jobs_enhanced(resume_data, _worker_jobs, _worker_analyzer,
+                                                      resume_analysis=resume_analysis)
+    except MemoryError:
+        return {'resume': relative_path, 'error': "提取或分析简历超出内存上限"}
+    except Exception as e:
+        return {'resume': relative_path, 'error': str(e)}
+
+    return {
+        'resume': relative_path,
+        'name': resume_data.get('personal_info', {}).get('name', '未知'),
+        'personal_summary': resume_analysis.get('personal_summary', {}),
+        'top_matches': match_results[:top_k]
+    }
+
+
+def run_batch(resume_dir: str, jobs_path: str, output_path: str, top_k: int = DEFAULT_TOP_K,
+              workers: Optional[int] = None, report_interval: float = DEFAULT_REPORT_INTERVAL,
+              retry_failed: bool = False, extract_timeout: float = DEFAULT_EXTRACT_TIMEOUT,
+              extract_memory_mb: int = DEFAULT_EXTRACT_MEMORY_MB) -> Dict[str, Any]:
+    """运行批量匹配
+
+    同时提交的任务数不超过工作进程数的4倍，内存占用与简历总数无关
+
+    Args:
+        resume_dir: 简历目录
+        jobs_path: JSONL职位文件
+        output_path: JSONL输出文件，已存在时跳过其中已完成的简历并追加
+        top_k: 每份简历保留的匹配数量
+        workers: 工作进程数，默认为CPU核数
+        report_interval: 吞吐量报告间隔（秒）
+        retry_failed: 重新处理输出文件中失败的简历
+        extract_timeout: 单份简历的文本提取时间上限（秒），0表示不限制
+        extract_memory_mb: 工作进程在加载职位后可再使用的内存（MB），0表示不限制
+
+    Returns:
+        Dict[str, Any]: 运行统计
+    """
+    workers = workers or os.cpu_count() or 1
+    done = load_checkpoint(output_path, retry_failed)
+    if done:
+        logger.info(f"从检查点恢复，跳过已完成的{len(done)}份简历")
+
+    pending_paths = (path for path in iter_resume_files(resume_dir) if path not in done)
+    max_in_flight = workers * 4
+    stats = {'processed': 0, 'failed': 0, 'skipped': len(done)}
+    started = time.time()
+    last_report = started
+
+    with open(output_path, 'a', encoding='utf-8') as output, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(jobs_path, extract_timeout, extract_memory_mb)) as pool:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                path = next(pending_paths, None)
+                if path is None:
+                    exhausted = True
+                    break
+                in_flight.add(pool.submit(match_one, resume_dir, path, top_k))
+
+            if not in_flight:
+                break
+            completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in completed:
+                record = future.result()
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                stats['processed'] += 1
+                if 'error' in record:
+                    stats['failed'] += 1
+                    logger.warning(f"处理简历失败: {record['resume']} - {record['error']}")
+            # 每批结果落盘后才算完成，中断时最多丢失正在处理的简历
+            output.flush()
+
+            now = time.time()
+            if now - last_report >= report_interval:
+                elapsed = now - started
+                logger.info(f"已处理{stats['processed']}份简历，{stats['processed'] / elapsed:.1f}份/秒")
+                last_report = now
+
+    elapsed = time.time() - started
+    stats['elapsed_seconds'] = round(elapsed, 2)
+    stats['resumes_per_second'] = round(stats['processed'] / elapsed, 2) if elapsed > 0 else 0.0
+    return stats
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="批量匹配简历目录与JSONL职位文件")
+    parser.add_argument("--resumes", required=True, help="简历目录（txt/pdf/docx，含子目录）")
+    parser.add_argument("--jobs", required=True, help="JSONL职位文件，每行一个职位")
+    parser.add_argument("--output", required=True, help="JSONL输出文件，已存在时从中断处继续")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="每份简历保留的匹配数量")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认为CPU核数")
+    parser.add_argument("--report-interval", type=float, default=DEFAULT_REPORT_INTERVAL, help="吞吐量报告间隔（秒）")
+    parser.add_argument("--retry-failed", action="store_true", help="重新处理输出文件中失败的简历")
+    parser.add_argument("--extract-timeout", type=float, default=DEFAULT_EXTRACT_TIMEOUT,
+                        help="单份简历的文本提取时间上限（秒），0表示不限制")
+    parser.add_argument("--extract-memory-mb", type=int, default=DEFAULT_EXTRACT_MEMORY_MB,
+                        help="工作进程加载职位后可再使用的内存（MB），0表示不限制")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not os.path.isdir(args.resumes):
+        parser.error(f"简历目录不存在: {args.resumes}")
+    if not os.path.exists(args.jobs):
+        parser.error(f"职位文件不存在: {args.jobs}")
+
+    stats = run_batch(args.resumes, args.jobs, args.output, args.top_k, args.workers, args.report_interval,
+                      args.retry_failed, args.extract_timeout, args.extract_memory_mb)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
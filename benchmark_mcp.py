@@ -0,0 +1,120 @@
+"""
+AI简历职位匹配系统 - MCP抓取基准测试
+基于本地替身服务器(mock_mcp_server.py)测量search_jobs_with_mcp的吞吐量和延迟，
+用于离线比较客户端侧的性能改动
+"""
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+from mock_mcp_server import MockMCPServer, MockMCPConfig
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """计算已排序数据的百分位数（线性插值）"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * percent / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def run_benchmark(requests_count: int = 50, concurrency: int = 4, limit: int = 5,
+                  keywords: str = "Python开发", location: str = "北京",
+                  config: MockMCPConfig = None) -> Dict[str, Any]:
+    """启动替身服务器并对search_jobs_with_mcp进行压测
+
+    Args:
+        requests_count: 总搜索次数
+        concurrency: 并发线程数
+        limit: 每次搜索的结果数量
+        keywords: 搜索关键词
+        location: 搜索地点
+        config: 替身服务器的注入配置
+
+    Returns:
+        Dict[str, Any]: 基准测试结果
+    """
+    with MockMCPServer(port=0, config=config) as server:
+        # search_jobs_with_mcp从环境变量读取服务器地址和API密钥
+        os.environ["FIRECRAWL_MCP_URL"] = server.url
+        os.environ.setdefault("FIRECRAWL_API_KEY", "benchmark-dummy-key")
+
+        from web_scraper import search_jobs_with_mcp
+
+        def one_search(_):
+            start = time.perf_counter()
+            jobs = search_jobs_with_mcp(keywords, location, limit)
+            elapsed = time.perf_counter() - start
+            # 回退到模拟数据的结果没有URL
+            fallback = not jobs or not any(job.get('url') for job in jobs)
+            return elapsed, len(jobs), fallback
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(one_search, range(requests_count)))
+        wall_time = time.perf_counter() - wall_start
+
+        server_stats = dict(server.stats)
+
+    latencies = sorted(sample[0] for sample in samples)
+    total_jobs = sum(sample[1] for sample in samples)
+    fallbacks = sum(1 for sample in samples if sample[2])
+
+    return {
+        'requests': requests_count,
+        'concurrency': concurrency,
+        'limit': limit,
+        'wall_time_s': round(wall_time, 3),
+        'searches_per_s': round(requests_count / wall_time, 2) if wall_time > 0 else 0.0,
+        'jobs_per_s': round(total_jobs / wall_time, 2) if wall_time > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+            'p50': round(_percentile(latencies, 50) * 1000, 1),
+            'p95': round(_percentile(latencies, 95) * 1000, 1),
+            'p99': round(_percentile(latencies, 99) * 1000, 1),
+            'max': round(latencies[-1] * 1000, 1) if latencies else 0.0
+        },
+        'fallback_searches': fallbacks,
+        'server_requests': server_stats['requests'],
+        'server_errors_injected': server_stats['errors_injected']
+    }
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="search_jobs_with_mcp离线基准测试")
+    parser.add_argument("--requests", type=int, default=50, help="总搜索次数")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发线程数")
+    parser.add_argument("--limit", type=int, default=5, help="每次搜索的结果数量")
+    parser.add_argument("--keywords", default="Python开发", help="搜索关键词")
+    parser.add_argument("--location", default="北京", help="搜索地点")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="服务器基础延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="服务器延迟抖动上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="服务器注入HTTP 500的概率")
+    parser.add_argument("--payload-size", type=int, default=0, help="每个页面正文的目标字节数")
+    parser.add_argument("--seed", type=int, default=42, help="随机数种子")
+    parser.add_argument("--output", default="", help="将结果以JSON格式写入该文件")
+    args = parser.parse_args()
+
+    config = MockMCPConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        payload_size=args.payload_size,
+        seed=args.seed
+    )
+    result = run_benchmark(args.requests, args.concurrency, args.limit, args.keywords, args.location, config)
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
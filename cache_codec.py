@@ -0,0 +1,274 @@
+"""
+AI简历职位匹配系统 - 缓存编码模块
+紧凑的压缩缓存格式：每条职位记录单独压缩并顺序存放，文件头保存记录的偏移索引，
+读取单个职位时只需解码文件头和该条记录，不必解析整个文件。
+记录之间不使用换行分隔：压缩后的字节本身可能包含换行符，按行分隔需要再做base64等转义，
+体积增加约三分之一；文件头中的偏移已经能定位每条记录，分隔符没有用处
+"""
+import os
+import json
+import zlib
+import struct
+import tempfile
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+# 编码方式：json为带缩进的可读格式（供用户下载和手工查看），jobz为压缩的按记录索引格式
+CODEC_JSON = "json"
+CODEC_JOBZ = "jobz"
+
+# 文件格式：MAGIC + 4字节文件头长度 + 压缩后的文件头 + 逐条压缩的记录
+MAGIC = b"JOBZ\x01"
+_HEADER_LENGTH = struct.Struct(">I")
+
+# 单条记录的前缀，便于将来更换字典或压缩算法
+RECORD_PREFIX = b"z1"
+
+# 预置压缩字典：单条职位记录很短，预置常见字段名后压缩率接近整体压缩
+RECORD_DICT = (
+    '"experience_requirement":"","experience_years":,"education_requirement":"本科",'
+    '"required_skills":["Python","Java","JavaScript","SQL","Linux"],"description":"",'
+    '"platform":"智联招聘","platform":"前程无忧","platform":"猎聘网","platform":"模拟数据",'
+    '"url":"https://","salary_range":"K-K","location":"北京","company":"","title":"开发工程师",'
+    '{"id":"job_'
+).encode('utf-8')
+
+COMPRESSION_LEVEL = 6
+
+
+def compress_record(record: Any) -> bytes:
+    """将单条记录编码为紧凑JSON并压缩
+
+    Args:
+        record: 可JSON序列化的对象
+
+    Returns:
+        bytes: 压缩后的记录
+    """
+    raw = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=RECORD_DICT)
+    return RECORD_PREFIX + compressor.compress(raw) + compressor.flush()
+
+
+def decompress_record(data: Any) -> Any:
+    """解码单条记录，兼容未压缩的JSON文本
+
+    Args:
+        data: compress_record的结果，或旧版本保存的JSON字符串/字节
+
+    Returns:
+        Any: 记录对象
+    """
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    if isinstance(data, bytes) and data.startswith(RECORD_PREFIX):
+        decompressor = zlib.decompressobj(zdict=RECORD_DICT)
+        raw = decompressor.decompress(data[len(RECORD_PREFIX):]) + decompressor.flush()
+        return json.loads(raw)
+    return json.loads(data)
+
+
+def encode_jobz(records: List[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> bytes:
+    """将记录列表编码为jobz格式
+
+    Args:
+        records: 记录列表，带id字段的记录可按id单独读取
+        meta: 随文件保存的其他数据
+
+    Returns:
+        bytes: 编码后的内容
+    """
+    chunks = []
+    index = []
+    offset = 0
+    for record in records:
+        chunk = compress_record(record)
+        record_id = record.get('id', '') if isinstance(record, dict) else ''
+        index.append([record_id, offset, len(chunk)])
+        chunks.append(chunk)
+        offset += len(chunk)
+
+    header = {'version': 1, 'count': len(records), 'index': index, 'meta': meta or {}}
+    header_bytes = compress_record(header)
+    return b"".join([MAGIC, _HEADER_LENGTH.pack(len(header_bytes)), header_bytes] + chunks)
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """先写临时文件再替换，读者不会看到写了一半的文件
+
+    临时文件名由mkstemp生成，同一进程的多个线程同时写同一路径时互不干扰；写入失败时删除临时文件
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_jobz(path: str, records: List[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> int:
+    """将记录列表写入jobz文件
+
+    Args:
+        path: 文件路径
+        records: 记录列表
+        meta: 随文件保存的其他数据
+
+    Returns:
+        int: 写入的字节数
+    """
+    data = encode_jobz(records, meta)
+    _atomic_write(path, data)
+    return len(data)
+
+
+def is_jobz(path: str) -> bool:
+    """判断文件是否为jobz格式"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class JobzReader:
+    """jobz文件读取器，打开时只解码文件头"""
+
+    def __init__(self, path: str):
+        """打开jobz文件
+
+        Args:
+            path: 文件路径
+
+        Raises:
+            ValueError: 文件不是jobz格式
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是jobz格式的文件: {path}")
+            (header_length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            header = decompress_record(f.read(header_length))
+
+        self.meta = header.get('meta', {})
+        self._index = header.get('index', [])
+        self._body_offset = len(MAGIC) + _HEADER_LENGTH.size + header_length
+        self._positions = {record_id: i for i, (record_id, _, _) in enumerate(self._index) if record_id}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def ids(self) -> List[str]:
+        """获取所有记录的id"""
+        return [record_id for record_id, _, _ in self._index]
+
+    def read(self, position: int) -> Dict[str, Any]:
+        """按位置读取单条记录
+
+        Args:
+            position: 记录序号
+
+        Returns:
+            Dict[str, Any]: 记录
+        """
+        _, offset, length = self._index[position]
+        with open(self.path, 'rb') as f:
+            f.seek(self._body_offset + offset)
+            return decompress_record(f.read(length))
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """按id读取单条记录
+
+        Args:
+            record_id: 记录id
+
+        Returns:
+            Optional[Dict[str, Any]]: 记录，不存在时返回None
+        """
+        position = self._positions.get(record_id)
+        if position is None:
+            return None
+        return self.read(position)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, 'rb') as f:
+            f.seek(self._body_offset)
+            body = f.read()
+        for _, offset, length in self._index:
+            yield decompress_record(body[offset:offset + length])
+
+
+def read_jobz(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """读取整个jobz文件
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        Tuple[Dict[str, Any], List[Dict[str, Any]]]: (附加数据, 记录列表)
+    """
+    reader = JobzReader(path)
+    return reader.meta, list(reader)
+
+
+def codec_for_path(path: str) -> str:
+    """根据文件扩展名选择编码方式"""
+    return CODEC_JOBZ if path.endswith('.jobz') else CODEC_JSON
+
+
+def dump_results(results: Dict[str, Any], path: str, codec: Optional[str] = None,
+                 records_key: str = 'jobs') -> int:
+    """保存匹配结果
+
+    jobz编码下results[records_key]中的职位逐条压缩存放，其余字段保存在文件头中
+
+    Args:
+        results: 处理结果
+        path: 文件路径
+        codec: 编码方式，为None时根据扩展名选择
+        records_key: 作为记录存放的字段
+
+    Returns:
+        int: 写入的字节数
+    """
+    codec = codec or codec_for_path(path)
+    if codec == CODEC_JOBZ:
+        meta = {key: value for key, value in results.items() if key != records_key}
+        return write_jobz(path, results.get(records_key) or [], dict(meta, _records_key=records_key))
+
+    data = json.dumps(results, ensure_ascii=False, indent=2).encode('utf-8')
+    _atomic_write(path, data)
+    return len(data)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """读取dump_results保存的结果，自动识别编码方式
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        Dict[str, Any]: 处理结果
+    """
+    if is_jobz(path):
+        meta, records = read_jobz(path)
+        meta = dict(meta)
+        records_key = meta.pop('_records_key', 'jobs')
+        meta[records_key] = records
+        return meta
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# 导出函数
+__all__ = ['CODEC_JSON', 'CODEC_JOBZ', 'compress_record', 'decompress_record',
+           'encode_jobz', 'write_jobz', 'read_jobz', 'is_jobz', 'JobzReader',
+           'codec_for_path', 'dump_results', 'load_results']
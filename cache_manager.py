@@ -0,0 +1,383 @@
+"""
+AI简历职位匹配系统 - 缓存管理模块
+两级缓存：进程内LRU内存层位于SQLite职位库（磁盘层）之前；
+磁盘层和结果文件目录都有字节预算，按LRU/LFU淘汰，并由后台线程定期清理过期数据
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Tuple, Iterable
+
+from job_store import JobStore
+from query_normalizer import filter_jobs_by_city
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过环境变量覆盖
+DEFAULT_MEMORY_ENTRIES = int(os.environ.get("JOBMATCH_MEMORY_CACHE_ENTRIES", 256))
+DEFAULT_DISK_BUDGET = int(os.environ.get("JOBMATCH_DISK_CACHE_BYTES", 200 * 1024 * 1024))
+DEFAULT_RESULTS_BUDGET = int(os.environ.get("JOBMATCH_RESULTS_CACHE_BYTES", 50 * 1024 * 1024))
+DEFAULT_EVICTION_POLICY = os.environ.get("JOBMATCH_CACHE_EVICTION", "lru")
+DEFAULT_SOFT_TTL = 24 * 60 * 60  # 软过期时间（秒），超过后返回旧结果并在后台刷新
+DEFAULT_HARD_TTL = 3 * 24 * 60 * 60  # 硬过期时间（秒），超过后必须重新抓取
+DEFAULT_CLEANUP_INTERVAL = 10 * 60  # 后台清理间隔（秒）
+
+
+class LRUCache:
+    """线程安全的进程内LRU缓存"""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES):
+        """初始化LRU缓存
+
+        Args:
+            max_entries: 最多保存的条目数
+        """
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取条目，命中时将其移到最近使用的位置"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """写入条目，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """删除条目"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredJobCache:
+    """职位搜索结果的两级缓存：内存LRU + SQLite职位库"""
+
+    def __init__(self, store: JobStore, memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 disk_budget: int = DEFAULT_DISK_BUDGET, policy: str = DEFAULT_EVICTION_POLICY,
+                 ttl: float = DEFAULT_HARD_TTL):
+        """初始化两级缓存
+
+        Args:
+            store: 磁盘层职位库
+            memory_entries: 内存层最多保存的搜索数
+            disk_budget: 磁盘层字节预算
+            policy: 磁盘层淘汰策略，"lru"或"lfu"
+            ttl: 后台清理时使用的过期时间（秒），应不小于硬过期时间
+        """
+        self.store = store
+        self.memory = LRUCache(memory_entries)
+        self.disk_budget = disk_budget
+        self.policy = policy
+        self.ttl = ttl
+
+        # 访问记录先在内存中累计，由后台线程批量写入磁盘层
+        self._pending_access = {}
+        self._access_lock = threading.Lock()
+
+    def _record_access(self, key: str) -> None:
+        with self._access_lock:
+            hits, _ = self._pending_access.get(key, (0, 0))
+            self._pending_access[key] = (hits + 1, time.time())
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """读取搜索结果，先查内存层，未命中再查磁盘层并回填内存层
+
+        Args:
+            key: 搜索键
+            max_age: 最大缓存时间（秒）
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 职位列表，不存在或已过期时返回None
+        """
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        created_at, jobs = entry
+        if max_age is not None and time.time() - created_at > max_age:
+            return None
+        return jobs
+
+    def _get_cached(self, key: str) -> Optional[Tuple[float, List[Dict[str, Any]], bool]]:
+        """读取(保存时间戳, 职位列表, 结果是否完整)，先查内存层，未命中再查磁盘层并回填内存层
+
+        内存层命中时仍按主键读取磁盘层的保存时间：其他进程或预热器刷新、淘汰了这次搜索时，
+        内存层的旧条目作废，不会一直以旧的时间戳判断过期
+        """
+        info = self.store.get_search_info(key)
+        if info is None:
+            self.memory.delete(key)
+            return None
+        entry = self.memory.get(key)
+        if entry is None or entry[0] != info['created_at']:
+            jobs = self.store.load_search(key)
+            if jobs is None:
+                return None
+            entry = (info['created_at'], jobs, info['exhausted'])
+            self.memory.set(key, entry)
+
+        self._record_access(key)
+        return entry
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        """读取搜索结果及其保存时间，不检查过期
+
+        Args:
+            key: 搜索键
+
+        Returns:
+            Optional[Tuple[float, List[Dict[str, Any]]]]: (保存时间戳, 职位列表)，不存在时返回None
+        """
+        entry = self._get_cached(key)
+        if entry is None:
+            return None
+        created_at, jobs, _ = entry
+        # 返回列表副本，调用方对列表的修改不影响缓存
+        return created_at, list(jobs)
+
+    def lookup(self, key: str, limit: Optional[int] = None, city: str = "",
+               superset_keys: Tuple[str, ...] = ()) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        """按包含关系查找搜索结果，不检查过期
+
+        先查同一搜索；结果数不足limit时，再从更宽泛的搜索（如不限地点的同一关键词）
+        中按城市筛选。抓取时确认结果已经完整（exhausted）的缓存即使数量不足也可以直接使用；
+        只是少于当时请求数量的结果可能漏掉了抓取失败的职位，不视为完整。
+
+        Args:
+            key: 搜索键
+            limit: 需要的结果数量，None表示不限
+            city: 标准城市名，用于筛选更宽泛的搜索结果
+            superset_keys: 可以覆盖本次搜索的更宽泛搜索的键
+
+        Returns:
+            Optional[Tuple[float, List[Dict[str, Any]]]]: (保存时间戳, 职位列表)，找不到时返回None
+        """
+        entry = self._get_cached(key)
+        if entry is not None:
+            created_at, jobs, exhausted = entry
+            if limit is None or len(jobs) >= limit or exhausted:
+                return created_at, list(jobs[:limit])
+
+        for superset_key in superset_keys:
+            entry = self._get_cached(superset_key)
+            if entry is None:
+                continue
+            created_at, jobs, exhausted = entry
+            matched = filter_jobs_by_city(jobs, city)
+            if matched and (limit is None or len(matched) >= limit or exhausted):
+                return created_at, matched[:limit]
+
+        return None
+
+    def put(self, key: str, jobs: List[Dict[str, Any]], platform: str = "",
+            query: str = "", location: str = "", request_limit: int = 0,
+            reused_ids: Iterable[str] = (), exhausted: bool = False) -> None:
+        """写入搜索结果到两级缓存
+
+        Args:
+            key: 搜索键
+            jobs: 职位列表
+            platform: 平台
+            query: 搜索关键词
+            location: 地点
+            request_limit: 搜索时请求的结果数量
+            reused_ids: 复用职位库中已有数据的职位ID，保留原来的抓取时间
+            exhausted: 结果是否已经完整，完整的结果数量不足时也可以回答更大的请求
+        """
+        created_at = time.time()
+        self.store.save_search(key, jobs, platform, query, location, created_at=created_at,
+                               request_limit=request_limit, reused_ids=reused_ids, exhausted=exhausted)
+        self.memory.set(key, (created_at, list(jobs), exhausted))
+
+    def flush_access(self) -> None:
+        """将累计的访问记录写入磁盘层"""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+        if pending:
+            self.store.record_access(pending)
+
+    def cleanup(self) -> None:
+        """清理过期数据并将磁盘层控制在预算之内"""
+        self.flush_access()
+        self.store.purge_expired(self.ttl)
+        evicted = self.store.evict_to_budget(self.disk_budget, self.policy)
+        if evicted:
+            # 磁盘层已淘汰的搜索不应继续从内存层返回
+            self.memory.clear()
+
+
+class DirectoryBudget:
+    """结果文件目录的字节预算，按最后访问/修改时间淘汰最旧的文件"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_RESULTS_BUDGET,
+                 ttl: Optional[float] = None):
+        """初始化目录预算
+
+        Args:
+            directory: 受管理的目录
+            max_bytes: 目录字节预算
+            ttl: 文件过期时间（秒），None表示不按时间清理
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def _list_files(self) -> List[Tuple[float, int, str]]:
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+        return files
+
+    def enforce(self) -> int:
+        """删除过期文件，并按LRU淘汰文件直到目录大小不超过预算
+
+        Returns:
+            int: 删除的文件数
+        """
+        removed = 0
+        with self._lock:
+            files = sorted(self._list_files())
+            now = time.time()
+            total = sum(size for _, size, _ in files)
+            for last_used, size, path in files:
+                expired = self.ttl is not None and now - last_used > self.ttl
+                if not expired and total <= self.max_bytes:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"删除缓存文件失败: {path} - {str(e)}")
+        return removed
+
+    def cleanup(self) -> None:
+        """供后台线程调用的清理入口"""
+        removed = self.enforce()
+        if removed:
+            logger.info(f"已清理{self.directory}中的{removed}个结果文件")
+
+
+class CacheJanitor:
+    """后台清理线程，定期执行已注册的清理任务"""
+
+    def __init__(self, interval: float = DEFAULT_CLEANUP_INTERVAL):
+        """初始化清理线程
+
+        Args:
+            interval: 清理间隔（秒）
+        """
+        self.interval = interval
+        self._tasks = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def register(self, task: Callable[[], None]) -> None:
+        """注册清理任务，首次注册时启动后台线程"""
+        with self._lock:
+            if task not in self._tasks:
+                self._tasks.append(task)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cache-janitor", daemon=True)
+                self._thread.start()
+
+    def run_once(self) -> None:
+        """立即执行一轮清理"""
+        with self._lock:
+            tasks = list(self._tasks)
+        for task in tasks:
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"缓存清理任务失败: {str(e)}")
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.run_once()
+
+    def stop(self) -> None:
+        """停止后台线程"""
+        self._stop_event.set()
+
+
+# 进程级共享实例：同一进程内的所有JobScraper共用内存层，多个会话之间也能命中
+_janitor = CacheJanitor()
+_job_caches = {}
+_directory_budgets = {}
+_registry_lock = threading.Lock()
+
+
+def get_janitor() -> CacheJanitor:
+    """获取进程级后台清理线程"""
+    return _janitor
+
+
+def get_job_cache(cache_dir: str = "./cache") -> TieredJobCache:
+    """获取缓存目录对应的进程级两级职位缓存
+
+    Args:
+        cache_dir: 缓存目录
+
+    Returns:
+        TieredJobCache: 两级职位缓存
+    """
+    db_path = os.path.abspath(os.path.join(cache_dir, "jobs.db"))
+    with _registry_lock:
+        cache = _job_caches.get(db_path)
+        if cache is None:
+            cache = TieredJobCache(JobStore(db_path))
+            _job_caches[db_path] = cache
+            _janitor.register(cache.cleanup)
+    return cache
+
+
+def get_results_budget(results_dir: str = "./cache/results") -> DirectoryBudget:
+    """获取结果文件目录对应的进程级字节预算
+
+    Args:
+        results_dir: 结果文件目录
+
+    Returns:
+        DirectoryBudget: 目录字节预算
+    """
+    results_dir = os.path.abspath(results_dir)
+    with _registry_lock:
+        budget = _directory_budgets.get(results_dir)
+        if budget is None:
+            budget = DirectoryBudget(results_dir, ttl=7 * 24 * 60 * 60)
+            _directory_budgets[results_dir] = budget
+            _janitor.register(budget.cleanup)
+    return budget
+
+
+# 导出类和函数
+__all__ = ['LRUCache', 'TieredJobCache', 'DirectoryBudget', 'CacheJanitor',
+           'get_janitor', 'get_job_cache', 'get_results_budget']
@@ -0,0 +1,366 @@
+"""
+AI简历职位匹配系统 - 缓存预热模块
+统计集成层的搜索频率，在可配置的低峰时段内按平台限速重新抓取热门搜索，
+使缓存在高峰期到来之前保持新鲜，把抓取负载从高峰时段移走。
+每个工作进程都会启动预热线程，但同一缓存目录同时只有一个进程（持有cache/locks下的预热锁）执行预热，
+平台限速因此不会随进程数成倍增加；该进程退出后由其他进程接替
+"""
+import os
+import time
+import logging
+import datetime
+import threading
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from cache_manager import get_job_cache, DEFAULT_SOFT_TTL
+from job_store import JobStore
+from query_normalizer import canonical_search_key
+from single_flight import SingleFlight
+
+# 文件锁仅在类Unix系统上可用，其他平台每个进程各自预热
+try:
+    import fcntl
+    FILE_LOCK_AVAILABLE = True
+except ImportError:
+    FILE_LOCK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过环境变量覆盖
+DEFAULT_WARM_ENABLED = os.environ.get("JOBMATCH_WARM_ENABLED", "1") != "0"
+DEFAULT_WARM_WINDOWS = os.environ.get("JOBMATCH_WARM_WINDOWS", "02:00-06:00")
+DEFAULT_WARM_TOP_N = int(os.environ.get("JOBMATCH_WARM_TOP_N", 20))
+# 每个平台每小时最多预热抓取的次数
+DEFAULT_RATE_LIMITS = os.environ.get("JOBMATCH_WARM_RATE_LIMITS", "智联招聘=30,前程无忧=30,猎聘网=20")
+DEFAULT_PLATFORM_RATE = 20
+DEFAULT_STATS_WINDOW = 7 * 24 * 60 * 60  # 只统计最近7天内搜索过的查询
+DEFAULT_CHECK_INTERVAL = 5 * 60  # 检查是否进入低峰时段的间隔（秒）
+
+
+def parse_windows(spec: str) -> List[Tuple[int, int]]:
+    """解析低峰时段配置
+
+    Args:
+        spec: 逗号分隔的时段，如"02:00-06:00,13:00-14:00"，结束早于开始表示跨越午夜
+
+    Returns:
+        List[Tuple[int, int]]: (开始分钟, 结束分钟)列表
+
+    Raises:
+        ValueError: 时段格式错误
+    """
+    windows = []
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, end = part.split('-')
+        windows.append((_parse_minutes(start), _parse_minutes(end)))
+    return windows
+
+
+def _parse_minutes(text: str) -> int:
+    hours, minutes = text.strip().split(':')
+    value = int(hours) * 60 + int(minutes)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(f"无效的时间: {text}")
+    return value
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """解析平台限速配置
+
+    Args:
+        spec: 逗号分隔的"平台=每小时次数"
+
+    Returns:
+        Dict[str, float]: 平台到每小时最多抓取次数的映射
+    """
+    limits = {}
+    for part in (spec or '').split(','):
+        if '=' not in part:
+            continue
+        platform, value = part.split('=', 1)
+        limits[platform.strip()] = float(value)
+    return limits
+
+
+class OffPeakSchedule:
+    """每日低峰时段"""
+
+    def __init__(self, windows: List[Tuple[int, int]]):
+        """初始化低峰时段
+
+        Args:
+            windows: (开始分钟, 结束分钟)列表
+        """
+        self.windows = windows
+
+    def _occurrences(self, timestamp: float) -> List[Tuple[float, float]]:
+        """获取该时间前后几天内所有时段的(开始, 结束)时间戳"""
+        today = datetime.datetime.fromtimestamp(timestamp).replace(hour=0, minute=0, second=0, microsecond=0)
+        occurrences = []
+        for day in range(-1, 3):
+            midnight = today + datetime.timedelta(days=day)
+            for start, end in self.windows:
+                if end <= start:
+                    end += 24 * 60
+                occurrences.append((
+                    (midnight + datetime.timedelta(minutes=start)).timestamp(),
+                    (midnight + datetime.timedelta(minutes=end)).timestamp()
+                ))
+        return sorted(occurrences)
+
+    def current_window_end(self, timestamp: float) -> Optional[float]:
+        """获取当前所在低峰时段的结束时间，不在低峰时段时返回None"""
+        ends = [end for start, end in self._occurrences(timestamp) if start <= timestamp < end]
+        return max(ends) if ends else None
+
+    def is_off_peak(self, timestamp: float) -> bool:
+        """判断是否处于低峰时段"""
+        return self.current_window_end(timestamp) is not None
+
+    def next_window_start(self, timestamp: float) -> Optional[float]:
+        """获取该时间之后下一个低峰时段的开始时间"""
+        starts = [start for start, _ in self._occurrences(timestamp) if start >= timestamp]
+        return min(starts) if starts else None
+
+
+class PlatformRateLimiter:
+    """按平台限制抓取频率，两次抓取之间至少间隔3600/每小时次数秒"""
+
+    def __init__(self, per_hour: Dict[str, float], default_per_hour: float = DEFAULT_PLATFORM_RATE):
+        """初始化限速器
+
+        Args:
+            per_hour: 平台到每小时最多抓取次数的映射
+            default_per_hour: 未配置平台的每小时最多抓取次数
+        """
+        self.per_hour = per_hour
+        self.default_per_hour = default_per_hour
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def wait_time(self, platform: str, now: Optional[float] = None) -> float:
+        """获取该平台还需等待的秒数"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return max(0.0, self._next_allowed.get(platform, 0.0) - now)
+
+    def acquire(self, platform: str, now: Optional[float] = None) -> None:
+        """记录一次抓取"""
+        now = time.time() if now is None else now
+        rate = self.per_hour.get(platform, self.default_per_hour)
+        with self._lock:
+            self._next_allowed[platform] = now + (3600.0 / rate if rate > 0 else float('inf'))
+
+
+class CacheWarmer:
+    """热门搜索的低峰预热"""
+
+    def __init__(self, store: JobStore, crawl: Optional[Callable[[str, str, str, int], Any]] = None,
+                 schedule: Optional[OffPeakSchedule] = None, top_n: int = DEFAULT_WARM_TOP_N,
+                 rate_limiter: Optional[PlatformRateLimiter] = None, soft_ttl: float = DEFAULT_SOFT_TTL,
+                 stats_window: float = DEFAULT_STATS_WINDOW, lock_dir: str = "./cache/locks",
+                 check_interval: float = DEFAULT_CHECK_INTERVAL):
+        """初始化预热器
+
+        Args:
+            store: 职位库，保存查询统计并提供缓存时间
+            crawl: 抓取函数(keywords, location, platform, limit)，负责写入缓存，默认使用Selenium抓取器
+            schedule: 低峰时段
+            top_n: 每个时段最多预热的热门查询数
+            rate_limiter: 平台限速器
+            soft_ttl: 缓存的软过期时间（秒）
+            stats_window: 查询统计的时间窗口（秒）
+            lock_dir: 与前台搜索共用的跨进程文件锁目录
+            check_interval: 后台线程的检查间隔（秒）
+        """
+        self.store = store
+        self.crawl = crawl or _selenium_crawl
+        self.schedule = schedule or OffPeakSchedule(parse_windows(DEFAULT_WARM_WINDOWS))
+        self.top_n = top_n
+        self.rate_limiter = rate_limiter or PlatformRateLimiter(parse_rate_limits(DEFAULT_RATE_LIMITS))
+        self.soft_ttl = soft_ttl
+        self.stats_window = stats_window
+        self.check_interval = check_interval
+        self.lock_dir = lock_dir
+        self._flight = SingleFlight(lock_dir)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._leader_file = None
+
+    def record(self, keywords: str, location: str, platform: str, limit: int) -> None:
+        """记录一次用户搜索
+
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            platform: 平台
+            limit: 结果数量限制
+        """
+        try:
+            self.store.record_query(canonical_search_key(keywords, location, platform),
+                                    keywords, location, platform, limit)
+        except Exception as e:
+            logger.error(f"记录搜索统计失败: {str(e)}")
+
+    def _is_due(self, query: Dict[str, Any], now: float) -> bool:
+        """判断查询的缓存是否会在下一个低峰时段之前过期"""
+        info = self.store.get_search_info(query['search_key'])
+        if info is None or info['request_limit'] < query['request_limit']:
+            return True
+
+        window_end = self.schedule.current_window_end(now) or now
+        next_start = self.schedule.next_window_start(window_end)
+        horizon = next_start if next_start is not None else now
+        return info['created_at'] + self.soft_ttl <= horizon
+
+    def due_queries(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """获取需要预热的热门查询
+
+        Args:
+            now: 当前时间，默认为time.time()
+
+        Returns:
+            List[Dict[str, Any]]: 按搜索次数从高到低排列的查询
+        """
+        now = time.time() if now is None else now
+        queries = self.store.top_queries(self.top_n, since=now - self.stats_window)
+        return [query for query in queries if self._is_due(query, now)]
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """处于低峰时段时预热一轮热门查询
+
+        各平台交替抓取：当前平台受限速时先处理其他平台的查询，全部受限时等待，
+        低峰时段结束或预热器停止时立即返回
+
+        Args:
+            now: 当前时间，默认为time.time()
+
+        Returns:
+            int: 本轮预热的查询数
+        """
+        now = time.time() if now is None else now
+        window_end = self.schedule.current_window_end(now)
+        if window_end is None:
+            return 0
+
+        self.store.purge_query_stats(self.stats_window)
+        pending = self.due_queries(now)
+        if pending:
+            logger.info(f"低峰预热开始，待预热查询{len(pending)}个")
+
+        warmed = 0
+        while pending and not self._stop_event.is_set() and time.time() < window_end:
+            ready = [q for q in pending if self.rate_limiter.wait_time(q['platform']) == 0]
+            if not ready:
+                wait = min(self.rate_limiter.wait_time(q['platform']) for q in pending)
+                self._stop_event.wait(min(wait, max(0.0, window_end - time.time())))
+                continue
+
+            query = ready[0]
+            pending.remove(query)
+            if self._warm(query):
+                warmed += 1
+
+        return warmed
+
+    def _warm(self, query: Dict[str, Any]) -> bool:
+        """抓取一个查询并写入缓存，与前台相同搜索共用文件锁"""
+        flight_key = f"{query['search_key']}|{query['request_limit']}"
+
+        def crawl():
+            # 拿到锁后再检查一次，其他进程可能刚刚完成了同一搜索；确实需要抓取时才占用限速额度
+            if not self._is_due(query, time.time()):
+                return False
+            self.rate_limiter.acquire(query['platform'])
+            return self.crawl(query['keywords'], query['location'],
+                              query['platform'], query['request_limit']) is not None
+
+        try:
+            done, _ = self._flight.do(flight_key, crawl)
+            return bool(done)
+        except Exception as e:
+            logger.error(f"预热搜索失败: {query['search_key']} - {str(e)}")
+            return False
+
+    def elect(self) -> bool:
+        """尝试成为同一缓存目录下负责预热的进程
+
+        以非阻塞方式获取预热锁，获取后一直持有到后台线程停止或进程退出
+
+        Returns:
+            bool: 当前进程是否负责预热
+        """
+        if self._leader_file is not None or not self.lock_dir or not FILE_LOCK_AVAILABLE:
+            return True
+        os.makedirs(self.lock_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.lock_dir, "cache-warmer.lock"), 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._leader_file = lock_file
+        logger.info(f"当前进程负责缓存预热: pid={os.getpid()}")
+        return True
+
+    def start(self) -> None:
+        """启动后台预热线程"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                if self.elect():
+                    self.run_once()
+            except Exception as e:
+                logger.error(f"缓存预热失败: {str(e)}")
+        if self._leader_file is not None:
+            self._leader_file.close()
+            self._leader_file = None
+
+    def stop(self) -> None:
+        """停止后台预热线程，线程退出时释放预热锁交给其他进程"""
+        self._stop_event.set()
+
+
+def _selenium_crawl(keywords: str, location: str, platform: str, limit: int) -> Any:
+    """使用独立的Selenium抓取器抓取并写入缓存"""
+    from web_scraper_selenium import JobScraper
+    return JobScraper(headless=True)._crawl_jobs(keywords, location, platform, limit)
+
+
+# 进程级共享实例
+_warmers = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache_warmer(cache_dir: str = "./cache") -> CacheWarmer:
+    """获取缓存目录对应的进程级预热器，启用预热时同时启动后台线程
+
+    Args:
+        cache_dir: 缓存目录
+
+    Returns:
+        CacheWarmer: 预热器
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    with _registry_lock:
+        warmer = _warmers.get(cache_dir)
+        if warmer is None:
+            warmer = CacheWarmer(get_job_cache(cache_dir).store, lock_dir=os.path.join(cache_dir, "locks"))
+            _warmers[cache_dir] = warmer
+            if DEFAULT_WARM_ENABLED:
+                warmer.start()
+    return warmer
+
+
+# 导出类和函数
+__all__ = ['CacheWarmer', 'OffPeakSchedule', 'PlatformRateLimiter',
+           'parse_windows', 'parse_rate_limits', 'get_cache_warmer']
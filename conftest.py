@@ -0,0 +1,7 @@
+"""
+pytest配置
+test_scraper.py需要浏览器和网络访问真实的招聘网站，默认不收集；设置JOBMATCH_LIVE_TESTS=1时运行
+"""
+import os
+
+collect_ignore = [] if os.environ.get("JOBMATCH_LIVE_TESTS") else ["test_scraper.py"]
@@ -0,0 +1,164 @@
+"""
+AI简历职位匹配系统 - 地名词典模块
+院校、公司和城市等名称列表的编译匹配：名称和别名统一规范化（全角转半角、小写、合并空白）后
+构建字符前缀树，从左到右一次扫描找出文本中所有条目，耗时只与文本长度和最长名称有关，与条目数量无关。
+每个条目可带层级元数据（如C9/985/211、一线/新一线），英文名称按词边界匹配，避免mit匹配summit
+"""
+import re
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Mapping, Tuple, Union
+
+_WHITESPACE = re.compile(r'\s+')
+
+# 前缀树节点中标记名称结尾的键，值为该写法对应的条目
+_END = ''
+
+
+def normalize_name(text: str) -> str:
+    """规范化名称或待匹配文本：全角转半角、小写、连续空白合并为一个空格
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    if not text:
+        return ""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text).lower()).strip()
+
+
+def _is_word_char(char: str) -> bool:
+    """英文名称两端不能紧邻的字符"""
+    return 'a' <= char <= 'z' or '0' <= char <= '9'
+
+
+class Gazetteer:
+    """编译后的名称词典"""
+
+    def __init__(self, entries: Iterable[Union[str, Mapping[str, Any]]]):
+        """编译名称词典
+
+        Args:
+            entries: 条目列表，每个条目是名称字符串，或包含name、可选tier和aliases的字典
+
+        Raises:
+            ValueError: 条目缺少名称
+        """
+        compiled = []
+        forms = {}
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {'name': entry}
+            name = entry.get('name')
+            if not name:
+                raise ValueError(f"词典条目缺少名称: {entry}")
+            compiled_entry = MappingProxyType({
+                'name': name,
+                'tier': entry.get('tier'),
+                'aliases': tuple(entry.get('aliases', ()))
+            })
+            compiled.append(compiled_entry)
+            for form in (name,) + compiled_entry['aliases']:
+                # 同一写法出现在多个条目中时以先出现的条目为准
+                forms.setdefault(normalize_name(form), compiled_entry)
+        forms.pop('', None)
+
+        self.entries = tuple(compiled)
+        self.names = tuple(normalize_name(entry['name']) for entry in compiled)
+        self.tiers = tuple(dict.fromkeys(entry['tier'] for entry in compiled if entry['tier']))
+        # 全部规范化后的名称和别名，按长度从长到短排列，供调用方编译成正则
+        self.forms = tuple(sorted(forms, key=len, reverse=True))
+        self._forms = forms
+
+        trie = {}
+        for form, compiled_entry in forms.items():
+            node = trie
+            for char in form:
+                node = node.setdefault(char, {})
+            node[_END] = compiled_entry
+        self._trie = trie
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, name: str) -> Optional[Mapping[str, Any]]:
+        """按名称或别名精确查找条目
+
+        Args:
+            name: 名称或别名
+
+        Returns:
+            Optional[Mapping[str, Any]]: 条目，未找到时返回None
+        """
+        return self._forms.get(normalize_name(name))
+
+    def finditer(self, text: str) -> Iterator[Tuple[Mapping[str, Any], int, int]]:
+        """一次扫描找出文本中出现的条目，同一位置取最长的写法
+
+        Args:
+            text: 文本
+
+        Yields:
+            Tuple[Mapping[str, Any], int, int]: (条目, 起始位置, 结束位置)，位置相对于规范化后的文本
+        """
+        text = normalize_name(text)
+        trie = self._trie
+        length = len(text)
+        start = 0
+        while start < length:
+            node = trie.get(text[start])
+            # 英文名称不能从单词中间开始
+            if node is None or (start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1])):
+                start += 1
+                continue
+
+            best = None
+            end = start + 1
+            while node is not None:
+                entry = node.get(_END)
+                # 英文名称不能在单词中间结束
+                if entry is not None and not (end < length and _is_word_char(text[end - 1]) and _is_word_char(text[end])):
+                    best = (entry, end)
+                if end >= length:
+                    break
+                node = node.get(text[end])
+                end += 1
+
+            if best is None:
+                start += 1
+            else:
+                yield best[0], start, best[1]
+                start = best[1]
+
+    def find(self, text: str) -> Optional[Mapping[str, Any]]:
+        """查找文本中第一个出现的条目
+
+        Args:
+            text: 文本
+
+        Returns:
+            Optional[Mapping[str, Any]]: 条目，未找到时返回None
+        """
+        for entry, _, _ in self.finditer(text):
+            return entry
+        return None
+
+    def find_all(self, text: str) -> List[Mapping[str, Any]]:
+        """按出现顺序找出文本中的全部条目，每个条目只返回一次
+
+        Args:
+            text: 文本
+
+        Returns:
+            List[Mapping[str, Any]]: 条目列表
+        """
+        found = {}
+        for entry, _, _ in self.finditer(text):
+            found.setdefault(id(entry), entry)
+        return list(found.values())
+
+
+# 导出类和函数
+__all__ = ['Gazetteer', 'normalize_name']
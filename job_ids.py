@@ -0,0 +1,85 @@
+"""
+AI简历职位匹配系统 - 职位ID模块
+基于规范化URL和平台名称生成内容寻址的职位ID，跨进程稳定，可用于缓存、去重和增量匹配
+"""
+import hashlib
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 不影响职位身份的跟踪参数
+TRACKING_PARAMS = {
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'spm', 'from', 'ka', 'lid', 'ref', 'refer', 'source', 'sessionid', 'securityid', '_t', 't'
+}
+
+# 职位ID中保留的摘要长度（十六进制字符数），64位摘要在百万级职位下碰撞概率可忽略
+DIGEST_LENGTH = 16
+
+
+def normalize_job_url(url: str) -> str:
+    """规范化职位URL，使同一职位的不同链接形式得到相同结果
+
+    统一协议和主机名大小写，去掉www./m.前缀、锚点、跟踪参数和末尾斜杠，并对查询参数排序
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        str: 规范化后的URL，输入为空时返回空字符串
+    """
+    if not url:
+        return ""
+
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+
+    parts = urlsplit(url)
+    if not parts.netloc:
+        # 非绝对URL，只做基本清理
+        return url.split('#')[0].rstrip('/').lower()
+
+    host = parts.netloc.lower()
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=False)
+        if key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def make_job_id(platform: str, url: str = "", *parts: Any) -> str:
+    """生成稳定的职位ID
+
+    有URL时以"平台 + 规范化URL"为内容计算摘要；没有URL时（如模拟数据）以平台和
+    调用方提供的描述字段（关键词、公司、标题、序号等）计算摘要。
+
+    Args:
+        platform: 平台名称
+        url: 职位页面URL
+        *parts: 没有URL时用于区分职位的字段
+
+    Returns:
+        str: 形如job_0123456789abcdef的职位ID
+    """
+    normalized_url = normalize_job_url(url)
+    if normalized_url:
+        material = f"url\x1f{platform}\x1f{normalized_url}"
+    else:
+        fields = [str(part).strip().lower() for part in parts]
+        material = "content\x1f" + "\x1f".join([platform] + fields)
+
+    digest = hashlib.sha1(material.encode('utf-8')).hexdigest()
+    return f"job_{digest[:DIGEST_LENGTH]}"
+
+
+# 导出函数
+__all__ = ['normalize_job_url', 'make_job_id']
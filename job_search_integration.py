@@ -6,10 +6,16 @@ import os
 import sys
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Union
 
 # 导入网页抓取模块
 from web_scraper import JobScraper, search_jobs_with_mcp
+from query_normalizer import canonical_search_key
+from single_flight import SingleFlight
+from cache_codec import dump_results
+from resume_cache import get_resume_cache
+from resume_extractors import ExtractionError
 
 # 导入简历分析模块
 from resume_analyzer import (
@@ -20,6 +26,13 @@ from resume_analyzer import (
     generate_improvement_suggestions_enhanced
 )
 
+# 相同的并发搜索只启动一次MCP抓取。MCP搜索结果没有缓存，跨进程加文件锁只会让后到的进程等待后重复抓取，
+# 因此只做进程内合并
+_search_flight = SingleFlight(lock_dir=None)
+
+# 执行搜索分支的线程池，使简历解析分析与职位搜索并行
+_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="job-search")
+
 class JobSearchIntegration:
     """职位搜索抓取集成类，将MCP抓取功能集成到现有应用中"""
     
@@ -33,6 +46,8 @@ class JobSearchIntegration:
         self.api_key = api_key or os.environ.get("FIRECRAWL_API_KEY")
         self.job_scraper = JobScraper(self.api_key)
         self.resume_analyzer = ResumeAnalyzer()
+        # 按内容哈希缓存简历的解析和分析结果，重复提交同一份简历时直接复用
+        self.resume_cache = get_resume_cache()
         
     def search_jobs(self, keywords: str, location: str = "", limit: int = 10, platform: str = "MCP抓取") -> List[Dict[str, Any]]:
         """
@@ -47,8 +62,13 @@ class JobSearchIntegration:
         Returns:
             List[Dict[str, Any]]: 职位信息列表
         """
-        # 使用MCP抓取职位信息
-        return search_jobs_with_mcp(keywords, location, limit, platform)
+        # 使用MCP抓取职位信息，相同的并发搜索合并为一次
+        flight_key = f"{canonical_search_key(keywords, location, platform)}|{limit}"
+        jobs, _ = _search_flight.do(
+            flight_key,
+            lambda: search_jobs_with_mcp(keywords, location, limit, platform)
+        )
+        return [dict(job) for job in jobs]
     
     def parse_resume(self, file_path: str) -> Dict[str, Any]:
         """
@@ -62,18 +82,20 @@ class JobSearchIntegration:
         """
         return parse_resume_enhanced(file_path)
     
-    def match_resume_to_jobs(self, resume_data: Dict[str, Any], jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def match_resume_to_jobs(self, resume_data: Dict[str, Any], jobs: List[Dict[str, Any]],
+                             resume_analysis: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         计算简历与职位的匹配度，使用增强版匹配算法
         
         Args:
             resume_data: 简历数据
             jobs: 职位列表
+            resume_analysis: 已有的简历分析结果，为None时重新分析
             
         Returns:
             List[Dict[str, Any]]: 匹配结果列表
         """
-        return match_resume_to_jobs_enhanced(resume_data, jobs)
+        return match_resume_to_jobs_enhanced(resume_data, jobs, self.resume_analyzer, resume_analysis)
     
     def analyze_resume(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -113,17 +135,27 @@ class JobSearchIntegration:
         Returns:
             Dict[str, Any]: 处理结果，包含简历分析和职位匹配
         """
-        # 解析简历
-        resume_data = self.parse_resume(resume_file_path)
-        
-        # 分析简历
-        resume_analysis = self.analyze_resume(resume_data)
+        # 简历分支（解析和分析）与搜索分支互不依赖：搜索在线程池中执行，
+        # 简历分支在当前线程执行，两者只在匹配前汇合
+        search_future = _search_executor.submit(self.search_jobs, keywords, location, limit)
+        try:
+            # 内容相同的简历直接取缓存的解析和分析结果
+            try:
+                resume_data, resume_analysis = self.resume_cache.parse_file(resume_file_path, self.resume_analyzer)
+            except (OSError, ExtractionError):
+                # 文件不存在或无法提取时不缓存，由原解析流程给出带失败原因的简历数据
+                resume_data = parse_resume_enhanced(resume_file_path, self.resume_analyzer)
+                resume_analysis = self.resume_analyzer.analyze_resume(resume_data)
+        except BaseException:
+            # 简历分支失败或被中断时取消尚未开始的搜索，异常继续向上传递
+            search_future.cancel()
+            raise
         
-        # 搜索职位
-        jobs = self.search_jobs(keywords, location, limit)
+        # 等待搜索完成，搜索分支的异常或取消在这里抛出
+        jobs = search_future.result()
         
         # 计算匹配度
-        match_results = self.match_resume_to_jobs(resume_data, jobs)
+        match_results = self.match_resume_to_jobs(resume_data, jobs, resume_analysis)
         
         # 为每个职位生成改进建议
         for i, match in enumerate(match_results[:3]):  # 只为前3个最匹配的职位生成建议
@@ -143,14 +175,13 @@ class JobSearchIntegration:
     
     def save_results_to_file(self, results: Dict[str, Any], output_file: str) -> None:
         """
-        将处理结果保存到文件
+        将处理结果保存到文件，扩展名为.jobz时使用压缩格式，否则保存为可读的JSON
         
         Args:
             results: 处理结果
             output_file: 输出文件路径
         """
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        dump_results(results, output_file)
         
         print(f"结果已保存到: {output_file}")
 
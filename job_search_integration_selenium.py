@@ -4,8 +4,19 @@ AI简历职位匹配系统 - 集成模块 (Streamlit Cloud兼容版)
 """
 import os
 import json
+import queue
 import logging
-from typing import List, Dict, Any, Optional, Union, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable, Iterator
+
+from job_ids import make_job_id
+from cache_manager import get_results_budget
+from cache_codec import dump_results, load_results
+from query_normalizer import canonical_search_key
+from single_flight import SingleFlight
+from cache_warmer import get_cache_warmer
+from resume_cache import get_resume_cache
+from resume_extractors import ExtractionError
 
 # 尝试导入网页抓取模块，如果失败则使用备用方案
 try:
@@ -26,6 +37,22 @@ from resume_analyzer import (
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 进程内共享：多个会话同时发起的相同搜索只启动一次浏览器抓取，
+# 多个工作进程之间通过cache/locks下的文件锁串行化，后到者直接命中缓存
+_search_flight = SingleFlight(os.path.join("./cache", "locks"))
+
+# 执行搜索分支的线程池，使职位搜索与简历解析分析并行
+_pipeline_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="job-pipeline")
+# 简历分支使用单独的小线程池，解析不会排在耗时数十秒的浏览器抓取之后
+_resume_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="job-pipeline-resume")
+
+# 处理流水线的事件类型
+EVENT_RESUME_PARSED = "resume_parsed"  # 简历解析完成：resume_data
+EVENT_ANALYSIS_READY = "analysis_ready"  # 简历分析完成：resume_analysis
+EVENT_JOBS_BATCH = "jobs_batch"  # 新到一批职位：jobs（本批）、total（累计数量）
+EVENT_TOP_MATCHES = "top_matches"  # 当前最佳匹配更新：matches（前top_k个）、total（已匹配数量）
+EVENT_COMPLETE = "complete"  # 全部完成：results（与process_resume_and_search_jobs的返回值相同）
+
 class JobSearchIntegration:
     """职位搜索集成类，整合网页抓取和简历分析功能"""
     
@@ -33,6 +60,7 @@ class JobSearchIntegration:
         """初始化职位搜索集成类"""
         self.resume_analyzer = ResumeAnalyzer()
         self.job_scraper = None
+        self.last_search_meta = {}
         if SCRAPER_AVAILABLE:
             try:
                 self.job_scraper = JobScraper(headless=True)
@@ -44,8 +72,19 @@ class JobSearchIntegration:
         # 确保缓存目录存在
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        
+        # 匹配结果文件单独存放，并受字节预算约束
+        self.results_dir = os.path.join(self.cache_dir, "results")
+        self.results_budget = get_results_budget(self.results_dir)
+        
+        # 统计搜索频率，低峰时段预热热门搜索
+        self.cache_warmer = get_cache_warmer(self.cache_dir)
+        
+        # 按内容哈希缓存简历的解析和分析结果，重复提交同一份简历时直接复用
+        self.resume_cache = get_resume_cache(os.path.join(self.cache_dir, "resumes"))
     
-    def search_jobs(self, keywords: str, location: str = "北京", limit: int = 10, platform: str = "智联招聘") -> List[Dict[str, Any]]:
+    def search_jobs(self, keywords: str, location: str = "北京", limit: int = 10, platform: str = "智联招聘",
+                    on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> List[Dict[str, Any]]:
         """搜索职位
         
         Args:
@@ -53,25 +92,55 @@ class JobSearchIntegration:
             location: 地点
             limit: 结果数量限制
             platform: 平台
+            on_batch: 同步抓取时每抓到一批职位调用一次；命中缓存或共享其他请求的结果时不会调用
         
         Returns:
             List[Dict[str, Any]]: 职位列表
         """
+        jobs, self.last_search_meta = self.search_jobs_with_meta(keywords, location, limit, platform, on_batch)
+        return jobs
+    
+    def search_jobs_with_meta(self, keywords: str, location: str = "北京", limit: int = 10, platform: str = "智联招聘",
+                              on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """搜索职位，并返回结果的来源和新鲜度；不修改实例状态，可在多个线程中共用同一实例
+        
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            limit: 结果数量限制
+            platform: 平台
+            on_batch: 同步抓取时每抓到一批职位调用一次
+        
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, Any]]: (职位列表, 元数据)
+        """
+        # 搜索结果的来源和新鲜度，供界面显示数据年龄
+        mock_meta = {'source': 'mock', 'age_seconds': 0.0, 'stale': False, 'refreshing': False}
+        
         # 如果平台是"模拟数据"或者网页抓取模块不可用，使用模拟数据
         if platform == "模拟数据" or not SCRAPER_AVAILABLE or not self.job_scraper:
             logger.info("使用模拟数据生成职位")
-            return self._generate_mock_jobs(keywords, location, limit)
+            return self._generate_mock_jobs(keywords, location, limit), mock_meta
         
         try:
-            # 使用网页抓取模块搜索职位
-            jobs = self.job_scraper.search_jobs(keywords, location, platform, limit)
+            self.cache_warmer.record(keywords, location, platform, limit)
+            
+            # 使用网页抓取模块搜索职位，相同的并发搜索合并为一次
+            flight_key = f"{canonical_search_key(keywords, location, platform)}|{limit}"
+            (jobs, meta), shared = _search_flight.do(
+                flight_key,
+                lambda: self.job_scraper.search_jobs_with_meta(keywords, location, platform, limit, on_batch)
+            )
             if not jobs:
                 logger.warning("未找到职位，使用模拟数据")
-                return self._generate_mock_jobs(keywords, location, limit)
-            return jobs
+                return self._generate_mock_jobs(keywords, location, limit), mock_meta
+            if shared:
+                logger.info(f"复用进行中的相同搜索结果: {flight_key}")
+            # 共享结果时各调用方拿到独立的列表，避免互相修改
+            return [dict(job) for job in jobs], dict(meta, shared=shared)
         except Exception as e:
             logger.error(f"搜索职位失败: {str(e)}")
-            return self._generate_mock_jobs(keywords, location, limit)
+            return self._generate_mock_jobs(keywords, location, limit), mock_meta
     
     def _generate_mock_jobs(self, keywords: str, location: str, limit: int) -> List[Dict[str, Any]]:
         """生成模拟职位数据
@@ -126,7 +195,7 @@ class JobSearchIntegration:
             
             # 创建职位对象
             job = {
-                "id": f"mock_{i}",
+                "id": make_job_id("模拟数据", "", keywords, location, job_type, company, salary_range, i),
                 "title": f"{job_type}",
                 "company": company,
                 "location": location,
@@ -153,16 +222,34 @@ class JobSearchIntegration:
         Returns:
             Dict[str, Any]: 简历数据
         """
+        return self.parse_and_analyze_resume(file_path)[0]
+    
+    def parse_and_analyze_resume(self, file_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """解析并分析简历，内容相同的简历直接返回缓存的结果
+        
+        Args:
+            file_path: 简历文件路径
+        
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: (简历数据, 分析结果)
+        """
         try:
-            return parse_resume_enhanced(file_path)
+            return self.resume_cache.parse_file(file_path, self.resume_analyzer)
+        except FileNotFoundError:
+            summary = '文件不存在'
+        except ExtractionError as e:
+            summary = f'解析失败: {e}'
         except Exception as e:
             logger.error(f"解析简历失败: {str(e)}")
-            return {
-                'personal_info': {'name': '未知', 'summary': '解析失败'},
-                'education': [],
-                'experience': [],
-                'skills': []
-            }
+            summary = '解析失败'
+        # 失败结果不缓存
+        resume_data = {
+            'personal_info': {'name': '未知', 'summary': summary},
+            'education': [],
+            'experience': [],
+            'skills': []
+        }
+        return resume_data, self.analyze_resume(resume_data)
     
     def analyze_resume(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """分析简历
@@ -192,24 +279,32 @@ class JobSearchIntegration:
                 'overall_score': {'overall_score': 0, 'level': '初级', 'component_scores': {'skills': 0, 'education': 0, 'experience': 0}}
             }
     
-    def match_resume_to_jobs(self, resume_data: Dict[str, Any], jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def match_resume_to_jobs(self, resume_data: Dict[str, Any], jobs: List[Dict[str, Any]],
+                             resume_analysis: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """匹配简历与职位
         
         Args:
             resume_data: 简历数据
             jobs: 职位列表
+            resume_analysis: 已有的简历分析结果，为None时重新分析
         
         Returns:
             List[Dict[str, Any]]: 匹配结果
         """
         try:
-            return match_resume_to_jobs_enhanced(resume_data, jobs)
+            return match_resume_to_jobs_enhanced(resume_data, jobs, self.resume_analyzer, resume_analysis)
         except Exception as e:
             logger.error(f"匹配简历与职位失败: {str(e)}")
             return []
     
-    def process_resume_and_search_jobs(self, resume_file_path: str, keywords: str, location: str = "北京", limit: int = 10, platform: str = "智联招聘") -> Dict[str, Any]:
-        """处理简历并搜索职位
+    def iter_process_resume_and_search_jobs(self, resume_file_path: str, keywords: str, location: str = "北京",
+                                            limit: int = 10, platform: str = "智联招聘",
+                                            top_k: int = 5) -> Iterator[Dict[str, Any]]:
+        """处理简历并搜索职位，随着工作完成逐步产生事件
+        
+        简历分支（解析和分析）与搜索分支并行执行。每个事件是包含type字段的字典，
+        依次可能产生resume_parsed、analysis_ready、jobs_batch、top_matches，最后是complete。
+        任一分支抛出异常时在迭代中重新抛出；提前关闭生成器时取消尚未开始的分支。
         
         Args:
             resume_file_path: 简历文件路径
@@ -217,49 +312,145 @@ class JobSearchIntegration:
             location: 地点
             limit: 结果数量限制
             platform: 平台
+            top_k: top_matches事件中包含的匹配数量
         
-        Returns:
-            Dict[str, Any]: 处理结果
+        Yields:
+            Dict[str, Any]: 事件
         """
-        # 解析简历
-        resume_data = self.parse_resume(resume_file_path)
+        events = queue.Queue()
+        
+        def resume_branch():
+            try:
+                events.put(('resume', self.parse_and_analyze_resume(resume_file_path)))
+            except BaseException as e:
+                events.put(('error', e))
         
-        # 分析简历
-        resume_analysis = self.analyze_resume(resume_data)
+        def search_branch():
+            try:
+                jobs, meta = self.search_jobs_with_meta(keywords, location, limit, platform,
+                                                        on_batch=lambda batch: events.put(('batch', batch)))
+                events.put(('search_done', (jobs, meta)))
+            except BaseException as e:
+                events.put(('error', e))
+        
+        futures = [_pipeline_executor.submit(search_branch), _resume_executor.submit(resume_branch)]
+        
+        resume_data = None
+        resume_analysis = None
+        final_jobs = None
+        jobs_meta = {}
+        jobs = []
+        seen_ids = set()
+        matches = []
         
-        # 搜索职位
-        jobs = self.search_jobs(keywords, location, limit, platform)
+        def match_event(batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+            # 每个职位的匹配度互不影响，只需匹配新到的职位再合并排序（稳定排序保持职位顺序）
+            matches.extend(self.match_resume_to_jobs(resume_data, batch, resume_analysis))
+            matches.sort(key=lambda x: x['match_score'], reverse=True)
+            return {'type': EVENT_TOP_MATCHES, 'matches': matches[:top_k], 'total': len(matches)}
         
-        # 匹配简历与职位
-        match_results = self.match_resume_to_jobs(resume_data, jobs)
+        try:
+            while final_jobs is None or resume_analysis is None:
+                kind, payload = events.get()
+                if kind == 'error':
+                    raise payload
+                
+                if kind == 'resume':
+                    # 解析和分析一同完成（或一同命中缓存），分析结果直接用于匹配
+                    resume_data, resume_analysis = payload
+                    yield {'type': EVENT_RESUME_PARSED, 'resume_data': resume_data}
+                    yield {'type': EVENT_ANALYSIS_READY, 'resume_analysis': resume_analysis}
+                    if jobs:
+                        yield match_event(jobs)
+                else:
+                    if kind == 'search_done':
+                        payload, jobs_meta = payload
+                        final_jobs = payload
+                    # 命中缓存或共享结果时没有逐批回调，最终结果中未出现过的职位作为最后一批
+                    batch = [job for job in payload if job.get('id') not in seen_ids]
+                    if not batch:
+                        continue
+                    seen_ids.update(job.get('id') for job in batch)
+                    jobs.extend(batch)
+                    yield {'type': EVENT_JOBS_BATCH, 'jobs': batch, 'total': len(jobs)}
+                    if resume_data is not None:
+                        yield match_event(batch)
+        finally:
+            # 出错或提前关闭时取消尚未开始的分支，已在运行的分支结束后结果写入缓存
+            for future in futures:
+                future.cancel()
         
-        # 返回结果
-        return {
-            'resume_data': resume_data,
-            'resume_analysis': resume_analysis,
-            'jobs': jobs,
-            'match_results': match_results
+        final_ids = {job.get('id') for job in final_jobs}
+        yield {
+            'type': EVENT_COMPLETE,
+            'results': {
+                'resume_data': resume_data,
+                'resume_analysis': resume_analysis,
+                'jobs': final_jobs,
+                'jobs_meta': dict(jobs_meta),
+                'match_results': [m for m in matches if m['job_id'] in final_ids]
+            }
         }
     
-    def save_results(self, results: Dict[str, Any], file_name: str = "match_results.json") -> str:
+    def process_resume_and_search_jobs(self, resume_file_path: str, keywords: str, location: str = "北京", limit: int = 10, platform: str = "智联招聘",
+                                       on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """处理简历并搜索职位
+        
+        Args:
+            resume_file_path: 简历文件路径
+            keywords: 搜索关键词
+            location: 地点
+            limit: 结果数量限制
+            platform: 平台
+            on_event: 可选的事件回调，参见iter_process_resume_and_search_jobs
+        
+        Returns:
+            Dict[str, Any]: 处理结果
+        """
+        results = {}
+        for event in self.iter_process_resume_and_search_jobs(resume_file_path, keywords, location, limit, platform):
+            if on_event is not None:
+                on_event(event)
+            if event['type'] == EVENT_COMPLETE:
+                results = event['results']
+        return results
+    
+    def save_results(self, results: Dict[str, Any], file_name: str = "match_results.jobz",
+                     codec: Optional[str] = None) -> str:
         """保存结果
         
         Args:
             results: 处理结果
             file_name: 文件名
+            codec: 编码方式（json或jobz），为None时根据扩展名选择
         
         Returns:
             str: 文件路径
         """
-        file_path = os.path.join(self.cache_dir, file_name)
+        file_path = os.path.join(self.results_dir, file_name)
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            dump_results(results, file_path, codec)
+            self.results_budget.enforce()
             return file_path
         except Exception as e:
             logger.error(f"保存结果失败: {str(e)}")
             return ""
+    
+    def load_results(self, file_name: str) -> Optional[Dict[str, Any]]:
+        """读取保存的结果，自动识别编码方式
+        
+        Args:
+            file_name: 文件名
+        
+        Returns:
+            Optional[Dict[str, Any]]: 处理结果，读取失败时返回None
+        """
+        try:
+            return load_results(os.path.join(self.results_dir, file_name))
+        except Exception as e:
+            logger.error(f"读取结果失败: {str(e)}")
+            return None
 
 def get_enhanced_functions():
     """获取增强版函数
@@ -270,4 +461,6 @@ def get_enhanced_functions():
     return parse_resume_enhanced, match_resume_to_jobs_enhanced
 
 # 导出函数
-__all__ = ['JobSearchIntegration', 'get_enhanced_functions']
+__all__ = ['JobSearchIntegration', 'get_enhanced_functions',
+           'EVENT_RESUME_PARSED', 'EVENT_ANALYSIS_READY', 'EVENT_JOBS_BATCH',
+           'EVENT_TOP_MATCHES', 'EVENT_COMPLETE']
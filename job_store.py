@@ -0,0 +1,583 @@
+"""
+AI简历职位匹配系统 - 职位存储模块
+基于SQLite的本地职位库：每个职位只存一行，搜索与职位通过映射表关联，
+缓存查询和去重都走索引，不再扫描和整体解析JSON缓存文件
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Iterable
+
+from cache_codec import CODEC_JOBZ, compress_record, decompress_record
+
+logger = logging.getLogger(__name__)
+
+# 学历从高到低排列，用于规范化职位的学历要求
+EDUCATION_LEVELS = ["博士", "硕士", "本科", "大专", "高中"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    platform TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    education_level TEXT NOT NULL DEFAULT '',
+    experience_years INTEGER NOT NULL DEFAULT 0,
+    scraped_at REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_platform ON jobs(platform);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location);
+CREATE INDEX IF NOT EXISTS idx_jobs_scraped_at ON jobs(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_education ON jobs(education_level);
+CREATE INDEX IF NOT EXISTS idx_jobs_experience ON jobs(experience_years);
+
+CREATE TABLE IF NOT EXISTS searches (
+    search_key TEXT PRIMARY KEY,
+    platform TEXT NOT NULL DEFAULT '',
+    query TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    result_count INTEGER NOT NULL DEFAULT 0,
+    request_limit INTEGER NOT NULL DEFAULT 0,
+    exhausted INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_searches_created_at ON searches(created_at);
+
+CREATE TABLE IF NOT EXISTS search_jobs (
+    search_key TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    job_id TEXT NOT NULL,
+    PRIMARY KEY (search_key, rank)
+);
+CREATE INDEX IF NOT EXISTS idx_search_jobs_job ON search_jobs(job_id);
+
+CREATE TABLE IF NOT EXISTS query_stats (
+    search_key TEXT PRIMARY KEY,
+    platform TEXT NOT NULL DEFAULT '',
+    keywords TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    request_limit INTEGER NOT NULL DEFAULT 0,
+    query_count INTEGER NOT NULL DEFAULT 0,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_query_stats_count ON query_stats(query_count);
+"""
+
+
+def normalize_education(text: str) -> str:
+    """将学历要求规范化为博士/硕士/本科/大专/高中，无法识别时返回"不限"
+
+    Args:
+        text: 原始学历要求
+
+    Returns:
+        str: 规范化后的学历
+    """
+    text = str(text or '')
+    for level in EDUCATION_LEVELS:
+        if level in text:
+            return level
+    # 常见别名
+    if "研究生" in text:
+        return "硕士"
+    if "学士" in text:
+        return "本科"
+    if "专科" in text:
+        return "大专"
+    return "不限"
+
+
+def normalize_experience_years(job: Dict[str, Any]) -> int:
+    """从职位中取得经验年限（整数）
+
+    优先使用experience_years字段，否则从experience_requirement中取第一个数字
+
+    Args:
+        job: 职位信息
+
+    Returns:
+        int: 经验年限，无法识别时返回0
+    """
+    years = job.get('experience_years')
+    if isinstance(years, int):
+        return years
+
+    requirement = job.get('experience_requirement', 0)
+    if isinstance(requirement, int):
+        return requirement
+    match = re.search(r'\d+', str(requirement or ''))
+    return int(match.group(0)) if match else 0
+
+
+class JobStore:
+    """SQLite职位库"""
+
+    def __init__(self, db_path: str = "./cache/jobs.db", codec: str = CODEC_JOBZ):
+        """初始化职位库
+
+        Args:
+            db_path: 数据库文件路径
+            codec: 职位数据的编码方式，jobz为逐条压缩，json为紧凑JSON文本；读取时两种都能识别
+        """
+        self.db_path = db_path
+        self.codec = codec
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # 每个线程使用独立连接，写操作串行化
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        conn = self._connect()
+        with self._write_lock:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            conn.commit()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """为旧版本的库补齐缺失的列"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(searches)")}
+        if 'last_access' not in columns:
+            conn.execute("ALTER TABLE searches ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+        if 'hit_count' not in columns:
+            conn.execute("ALTER TABLE searches ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 0")
+        if 'request_limit' not in columns:
+            conn.execute("ALTER TABLE searches ADD COLUMN request_limit INTEGER NOT NULL DEFAULT 0")
+        if 'exhausted' not in columns:
+            conn.execute("ALTER TABLE searches ADD COLUMN exhausted INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            # 新建的库启用增量回收，淘汰后可以归还磁盘空间（必须在建表之前设置）
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _encode(self, job: Dict[str, Any]) -> Any:
+        if self.codec == CODEC_JOBZ:
+            return sqlite3.Binary(compress_record(job))
+        return json.dumps(job, ensure_ascii=False, separators=(',', ':'))
+
+    def _job_row(self, job: Dict[str, Any], scraped_at: float) -> tuple:
+        """将职位字典转换为jobs表的一行"""
+        return (
+            job['id'],
+            job.get('platform', '') or '',
+            job.get('title', '') or '',
+            job.get('company', '') or '',
+            job.get('location', '') or '',
+            normalize_education(job.get('education_requirement', '')),
+            normalize_experience_years(job),
+            scraped_at,
+            self._encode(job)
+        )
+
+    def _upsert_jobs(self, conn: sqlite3.Connection, jobs: Iterable[Dict[str, Any]], scraped_at: float,
+                     keep_existing: bool = False) -> int:
+        rows = [self._job_row(job, scraped_at) for job in jobs if job.get('id')]
+        if keep_existing:
+            # 已有的行保持原样，包括抓取时间
+            conn.executemany(
+                """
+                INSERT INTO jobs (job_id, platform, title, company, location, education_level,
+                                  experience_years, scraped_at, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO NOTHING
+                """,
+                rows
+            )
+            return len(rows)
+        conn.executemany(
+            """
+            INSERT INTO jobs (job_id, platform, title, company, location, education_level,
+                              experience_years, scraped_at, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_id) DO UPDATE SET
+                platform = excluded.platform,
+                title = excluded.title,
+                company = excluded.company,
+                location = excluded.location,
+                education_level = excluded.education_level,
+                experience_years = excluded.experience_years,
+                scraped_at = excluded.scraped_at,
+                data = excluded.data
+            """,
+            rows
+        )
+        return len(rows)
+
+    def upsert_jobs(self, jobs: List[Dict[str, Any]], scraped_at: Optional[float] = None) -> int:
+        """批量写入或更新职位
+
+        Args:
+            jobs: 职位列表，每个职位必须带有id
+            scraped_at: 抓取时间戳，默认为当前时间
+
+        Returns:
+            int: 写入的职位数
+        """
+        scraped_at = scraped_at if scraped_at is not None else time.time()
+        conn = self._connect()
+        with self._write_lock, conn:
+            return self._upsert_jobs(conn, jobs, scraped_at)
+
+    def save_search(self, search_key: str, jobs: List[Dict[str, Any]], platform: str = "",
+                    query: str = "", location: str = "", created_at: Optional[float] = None,
+                    request_limit: int = 0, reused_ids: Iterable[str] = (), exhausted: bool = False) -> None:
+        """保存一次搜索的结果：写入职位并替换该搜索的职位映射
+
+        Args:
+            search_key: 搜索键
+            jobs: 职位列表（按排名顺序）
+            platform: 平台
+            query: 搜索关键词
+            location: 地点
+            created_at: 搜索时间戳，默认为当前时间
+            request_limit: 搜索时请求的结果数量
+            reused_ids: 直接复用职位库中已有数据、没有重新抓取详情的职位ID，
+                这些职位保留原来的抓取时间，不会因为反复出现在搜索结果中而永不过期
+            exhausted: 结果是否已经完整：列表页的职位少于请求数量，且每个职位都抓取成功
+        """
+        created_at = created_at if created_at is not None else time.time()
+        jobs = [job for job in jobs if job.get('id')]
+        reused_ids = set(reused_ids)
+        conn = self._connect()
+        with self._write_lock, conn:
+            self._upsert_jobs(conn, [job for job in jobs if job['id'] not in reused_ids], created_at)
+            self._upsert_jobs(conn, [job for job in jobs if job['id'] in reused_ids], created_at, keep_existing=True)
+            conn.execute("DELETE FROM search_jobs WHERE search_key = ?", (search_key,))
+            conn.executemany(
+                "INSERT INTO search_jobs (search_key, rank, job_id) VALUES (?, ?, ?)",
+                [(search_key, rank, job['id']) for rank, job in enumerate(jobs)]
+            )
+            conn.execute(
+                """
+                INSERT INTO searches (search_key, platform, query, location, result_count,
+                                      request_limit, exhausted, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(search_key) DO UPDATE SET
+                    platform = excluded.platform,
+                    query = excluded.query,
+                    location = excluded.location,
+                    result_count = excluded.result_count,
+                    request_limit = excluded.request_limit,
+                    exhausted = excluded.exhausted,
+                    created_at = excluded.created_at,
+                    last_access = excluded.last_access
+                """,
+                (search_key, platform, query, location, len(jobs), request_limit, int(exhausted), created_at, created_at)
+            )
+
+    def get_search_info(self, search_key: str) -> Optional[Dict[str, Any]]:
+        """获取一次搜索的元数据
+
+        Args:
+            search_key: 搜索键
+
+        Returns:
+            Optional[Dict[str, Any]]: 包含created_at、result_count、request_limit和exhausted，搜索不存在时返回None
+        """
+        row = self._connect().execute(
+            "SELECT created_at, result_count, request_limit, exhausted FROM searches WHERE search_key = ?",
+            (search_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        info = dict(row)
+        info['exhausted'] = bool(info['exhausted'])
+        return info
+
+    def record_access(self, accesses: Dict[str, tuple]) -> None:
+        """批量记录搜索的访问情况，供LRU/LFU淘汰使用
+
+        Args:
+            accesses: 搜索键到(访问次数, 最后访问时间)的映射
+        """
+        if not accesses:
+            return
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executemany(
+                """
+                UPDATE searches SET hit_count = hit_count + ?, last_access = MAX(last_access, ?)
+                WHERE search_key = ?
+                """,
+                [(hits, last_access, key) for key, (hits, last_access) in accesses.items()]
+            )
+
+    def record_query(self, search_key: str, keywords: str, location: str, platform: str,
+                     request_limit: int = 0, seen_at: Optional[float] = None) -> None:
+        """记录一次用户发起的搜索，供缓存预热统计热门查询
+
+        Args:
+            search_key: 规范化的搜索键
+            keywords: 原始搜索关键词
+            location: 原始地点
+            platform: 平台
+            request_limit: 请求的结果数量
+            seen_at: 搜索时间，默认为当前时间
+        """
+        seen_at = time.time() if seen_at is None else seen_at
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute(
+                """
+                INSERT INTO query_stats (search_key, platform, keywords, location,
+                                         request_limit, query_count, last_seen)
+                VALUES (?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT(search_key) DO UPDATE SET
+                    keywords = excluded.keywords,
+                    location = excluded.location,
+                    request_limit = MAX(query_stats.request_limit, excluded.request_limit),
+                    query_count = query_stats.query_count + 1,
+                    last_seen = MAX(query_stats.last_seen, excluded.last_seen)
+                """,
+                (search_key, platform, keywords, location, request_limit, seen_at)
+            )
+
+    def top_queries(self, limit: int = 20, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """获取搜索次数最多的查询
+
+        Args:
+            limit: 返回数量
+            since: 只统计最后一次搜索晚于该时间的查询
+
+        Returns:
+            List[Dict[str, Any]]: 包含search_key、platform、keywords、location、request_limit和query_count
+        """
+        rows = self._connect().execute(
+            """
+            SELECT search_key, platform, keywords, location, request_limit, query_count
+            FROM query_stats WHERE last_seen >= ?
+            ORDER BY query_count DESC, last_seen DESC LIMIT ?
+            """,
+            (since or 0, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def size_bytes(self) -> int:
+        """获取库中实际使用的字节数（不含空闲页）"""
+        conn = self._connect()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+    def _delete_orphan_jobs(self, conn: sqlite3.Connection, cutoff: Optional[float] = None) -> int:
+        """删除不再被任何搜索引用的职位，cutoff不为None时只删除早于该时间抓取的职位"""
+        sql = """
+            DELETE FROM jobs WHERE NOT EXISTS
+            (SELECT 1 FROM search_jobs WHERE search_jobs.job_id = jobs.job_id)
+        """
+        params = ()
+        if cutoff is not None:
+            sql += " AND scraped_at < ?"
+            params = (cutoff,)
+        return conn.execute(sql, params).rowcount
+
+    def _reclaim(self, conn: sqlite3.Connection) -> None:
+        """回收空闲页并截断WAL文件，把删除的数据真正归还给磁盘"""
+        with self._write_lock:
+            # executescript会把语句执行完毕，execute只会回收一页
+            conn.executescript("PRAGMA incremental_vacuum;")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    def _delete_searches(self, conn: sqlite3.Connection, search_keys: List[str]) -> None:
+        conn.executemany("DELETE FROM search_jobs WHERE search_key = ?", [(key,) for key in search_keys])
+        conn.executemany("DELETE FROM searches WHERE search_key = ?", [(key,) for key in search_keys])
+
+    def evict_to_budget(self, max_bytes: int, policy: str = "lru", batch_size: int = 10) -> int:
+        """按LRU或LFU策略淘汰搜索结果，直到库的大小不超过预算
+
+        Args:
+            max_bytes: 磁盘字节预算
+            policy: 淘汰策略，"lru"按最后访问时间，"lfu"按访问次数
+            batch_size: 每轮淘汰的搜索数
+
+        Returns:
+            int: 淘汰的搜索数
+        """
+        if policy == "lfu":
+            order = "hit_count ASC, last_access ASC"
+        else:
+            order = "last_access ASC"
+
+        evicted = 0
+        conn = self._connect()
+        while self.size_bytes() > max_bytes:
+            with self._write_lock, conn:
+                keys = [row['search_key'] for row in conn.execute(
+                    f"SELECT search_key FROM searches ORDER BY {order} LIMIT ?", (batch_size,)
+                )]
+                if keys:
+                    self._delete_searches(conn, keys)
+                deleted_jobs = self._delete_orphan_jobs(conn)
+            if not keys and not deleted_jobs:
+                break
+            evicted += len(keys)
+            self._reclaim(conn)
+
+        if evicted:
+            logger.info(f"职位库超出磁盘预算，已淘汰{evicted}个搜索结果")
+        return evicted
+
+    def load_search(self, search_key: str, max_age: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """读取一次搜索的结果
+
+        Args:
+            search_key: 搜索键
+            max_age: 最大缓存时间（秒），None表示不检查过期
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 按排名排序的职位列表，不存在或已过期时返回None
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT created_at FROM searches WHERE search_key = ?", (search_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if max_age is not None and time.time() - row['created_at'] > max_age:
+            return None
+
+        rows = conn.execute(
+            """
+            SELECT jobs.data FROM search_jobs
+            JOIN jobs ON jobs.job_id = search_jobs.job_id
+            WHERE search_jobs.search_key = ?
+            ORDER BY search_jobs.rank
+            """,
+            (search_key,)
+        ).fetchall()
+        return [decompress_record(r['data']) for r in rows]
+
+    def get_jobs(self, job_ids: List[str], max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """按ID批量读取职位，用于去重
+
+        Args:
+            job_ids: 职位ID列表
+            max_age: 最大缓存时间（秒），超过的职位视为不存在
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 职位ID到职位信息的映射
+        """
+        if not job_ids:
+            return {}
+
+        conn = self._connect()
+        min_scraped_at = time.time() - max_age if max_age is not None else 0
+        found = {}
+        # SQLite对参数个数有限制，分批查询
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT job_id, data FROM jobs WHERE job_id IN ({placeholders}) AND scraped_at >= ?",
+                (*chunk, min_scraped_at)
+            ).fetchall()
+            for r in rows:
+                found[r['job_id']] = decompress_record(r['data'])
+        return found
+
+    def find_jobs(self, platform: Optional[str] = None, location: Optional[str] = None,
+                  education: Optional[str] = None, max_experience: Optional[int] = None,
+                  max_age: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """按条件查询职位
+
+        Args:
+            platform: 平台
+            location: 地点（前缀匹配，如"北京"可匹配"北京-海淀区"）
+            education: 规范化的学历要求
+            max_experience: 经验年限上限
+            max_age: 最大缓存时间（秒）
+            limit: 结果数量限制
+
+        Returns:
+            List[Dict[str, Any]]: 按抓取时间倒序排列的职位列表
+        """
+        conditions = []
+        params = []
+        if platform:
+            conditions.append("platform = ?")
+            params.append(platform)
+        if location:
+            conditions.append("location >= ? AND location < ?")
+            params.extend([location, location + "\uffff"])
+        if education:
+            conditions.append("education_level = ?")
+            params.append(education)
+        if max_experience is not None:
+            conditions.append("experience_years <= ?")
+            params.append(max_experience)
+        if max_age is not None:
+            conditions.append("scraped_at >= ?")
+            params.append(time.time() - max_age)
+
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        params.append(limit)
+        rows = self._connect().execute(
+            f"SELECT data FROM jobs {where} ORDER BY scraped_at DESC LIMIT ?", params
+        ).fetchall()
+        return [decompress_record(r['data']) for r in rows]
+
+    def purge_expired(self, max_age: float) -> int:
+        """删除过期的搜索记录以及不再被任何搜索引用的过期职位
+
+        Args:
+            max_age: 最大缓存时间（秒）
+
+        Returns:
+            int: 删除的职位数
+        """
+        cutoff = time.time() - max_age
+        conn = self._connect()
+        with self._write_lock, conn:
+            keys = [row['search_key'] for row in conn.execute(
+                "SELECT search_key FROM searches WHERE created_at < ?", (cutoff,)
+            )]
+            self._delete_searches(conn, keys)
+            deleted = self._delete_orphan_jobs(conn, cutoff)
+        if keys or deleted:
+            self._reclaim(conn)
+        return deleted
+
+    def purge_query_stats(self, max_age: float) -> int:
+        """删除长时间没有再搜索的查询统计
+
+        Args:
+            max_age: 最长保留时间（秒）
+
+        Returns:
+            int: 删除的查询数
+        """
+        conn = self._connect()
+        with self._write_lock, conn:
+            cursor = conn.execute("DELETE FROM query_stats WHERE last_seen < ?", (time.time() - max_age,))
+        return cursor.rowcount
+
+
+# 导出类和函数
+__all__ = ['JobStore', 'normalize_education', 'normalize_experience_years']
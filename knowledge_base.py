@@ -0,0 +1,396 @@
+"""
+AI简历职位匹配系统 - 知识库模块
+技能别名、技能类别、职业方向、学历等级、知名院校和公司等分析用的数据，从带版本号的
+knowledge_base.json加载。数据在进程内只编译一次，编译出的查找结构（反向映射、小写关键词元组、
+frozenset、多词技能的正则自动机、院校/公司/城市的名称词典、职业方向×技能关联矩阵）只读，所有ResumeAnalyzer共享同一个实例。
+后台线程发现数据文件变化时在旁边编译新版本，完成后原子替换，请求路径上不会等待重新编译。
+alias_signature按简历的规范化词集合摘要出其中出现的别名和停用词，词典变化后摘要不变的简历缓存仍然有效
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple, List, Iterable, Sequence
+
+import numpy as np
+
+from gazetteer import Gazetteer
+
+# 英文停用词来自NLTK语料，不可用时只使用中文停用词
+try:
+    from nltk.corpus import stopwords as nltk_stopwords
+    NLTK_STOPWORDS_AVAILABLE = True
+except ImportError:
+    NLTK_STOPWORDS_AVAILABLE = False
+
+# 批量计算职业方向分数时用稀疏矩阵保存(简历, 技能)关联，不可用时使用稠密矩阵
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过环境变量覆盖
+DEFAULT_KB_PATH = os.environ.get(
+    "JOBMATCH_KB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge_base.json")
+)
+DEFAULT_KB_RELOAD_INTERVAL = float(os.environ.get("JOBMATCH_KB_RELOAD_INTERVAL", 30))  # 检查数据文件变化的间隔（秒），0表示不检查
+
+# 数据文件必须包含的表
+REQUIRED_TABLES = ('skill_aliases', 'skill_categories', 'career_directions', 'education_levels',
+                   'top_universities', 'top_companies', 'cs_related_keywords', 'stopwords')
+
+# 规范化词：小写后的连续字母、数字和汉字
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """把文本转换为排序去重的规范化词列表
+
+    Args:
+        text: 文本
+
+    Returns:
+        List[str]: 规范化词
+    """
+    return sorted(set(_TOKEN_PATTERN.findall(text.lower()))) if text else []
+
+
+class KnowledgeBase:
+    """编译后的只读知识库"""
+
+    def __init__(self, data: Dict[str, Any]):
+        """编译知识库
+
+        Args:
+            data: 原始数据，包含version和REQUIRED_TABLES中的各表
+
+        Raises:
+            ValueError: 缺少必需的表
+        """
+        missing = [table for table in REQUIRED_TABLES if table not in data]
+        if missing:
+            raise ValueError(f"知识库缺少数据表: {', '.join(missing)}")
+
+        # 版本由数据文件声明的版本号和内容摘要组成，忘记递增版本号时内容变化也会产生新版本
+        digest = hashlib.sha1(json.dumps(data, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+        self.version = f"{data.get('version', '0')}+{digest[:8]}"
+
+        # 技能别名：单词别名按分词结果O(1)查找，含空格的别名合并为一个正则，一次扫描全部匹配。
+        # 多词别名两端要求词边界，与单词别名一样只匹配完整的词：匹配到的别名的各个规范化词都是简历中的完整词，
+        # alias_signature按词集合计算的片段因此包含所有可能匹配的别名
+        self.skill_mapping = MappingProxyType({alias.lower(): skill for alias, skill in data['skill_aliases'].items()})
+        self.multiword_skills = tuple((alias, skill) for alias, skill in self.skill_mapping.items() if ' ' in alias)
+        self.multiword_pattern = re.compile(
+            r'(?<!\w)(?:'
+            + '|'.join(re.escape(alias) for alias, _ in sorted(self.multiword_skills, key=lambda x: -len(x[0])))
+            + r')(?!\w)'
+        ) if self.multiword_skills else None
+        # 按别名的第一个规范化词索引别名及其全部规范化词，用于从简历词集合找出其中出现的别名
+        alias_index = {}
+        for alias in self.skill_mapping:
+            parts = tuple(normalize_tokens(alias))
+            alias_index.setdefault(parts[0] if parts else '', []).append((alias, parts))
+        self.alias_index = MappingProxyType({part: tuple(aliases) for part, aliases in alias_index.items()})
+
+        # 技能类别及技能到类别的反向映射
+        self.skill_categories = MappingProxyType({
+            category: frozenset(skills) for category, skills in data['skill_categories'].items()
+        })
+        skill_to_categories = {}
+        for category, skills in data['skill_categories'].items():
+            for skill in skills:
+                skill_to_categories.setdefault(skill, []).append(category)
+        self.skill_to_categories = MappingProxyType({skill: tuple(c) for skill, c in skill_to_categories.items()})
+
+        # 职业方向：代表技能保持原顺序的元组、集合和小写关键词元组
+        self.career_directions = MappingProxyType({
+            key: MappingProxyType({'name': info['name'], 'skills': tuple(info['skills'])})
+            for key, info in data['career_directions'].items()
+        })
+        self.direction_skill_sets = MappingProxyType({
+            key: frozenset(info['skills']) for key, info in data['career_directions'].items()
+        })
+        # 职业方向×技能的0/1关联矩阵：技能计数向量乘以矩阵转置即得各方向命中的代表技能数
+        self.direction_keys = tuple(self.career_directions)
+        self.direction_names = tuple(info['name'] for info in self.career_directions.values())
+        self.direction_sizes = np.array([len(info['skills']) for info in self.career_directions.values()], dtype=float)
+        # 没有代表技能的方向除以无穷大得0，避免每次计算分数时做条件判断
+        self._direction_divisors = np.where(self.direction_sizes > 0, self.direction_sizes, np.inf)
+        direction_columns = {}
+        for skills in self.direction_skill_sets.values():
+            for skill in sorted(skills):
+                direction_columns.setdefault(skill, len(direction_columns))
+        self.direction_columns = MappingProxyType(direction_columns)
+        self.direction_matrix = np.zeros((len(self.direction_keys), len(direction_columns)), dtype=np.int64)
+        for row, skills in enumerate(self.direction_skill_sets.values()):
+            self.direction_matrix[row, [direction_columns[skill] for skill in skills]] = 1
+        self.direction_matrix.setflags(write=False)
+        # 按技能取行的转置副本，单份简历计数时读取连续内存
+        self._skill_directions = np.ascontiguousarray(self.direction_matrix.T)
+        self._skill_directions.setflags(write=False)
+        self.direction_keywords = MappingProxyType({
+            info['name']: tuple(skill.lower() for skill in info['skills'])
+            for info in data['career_directions'].values()
+        })
+
+        self.education_levels = MappingProxyType({name.lower(): level for name, level in data['education_levels'].items()})
+        # 院校、公司和城市编译为名称词典；top_university_tiers为空时词典中的全部院校都视为知名院校
+        self.universities = Gazetteer(data['top_universities'])
+        self.top_university_tiers = frozenset(data.get('top_university_tiers', ()))
+        self.companies = Gazetteer(data['top_companies'])
+        self.cities = Gazetteer(data.get('cities', ()))
+        self.top_universities = self.universities.names
+        self.top_companies = self.companies.names
+        self.cs_related_keywords = tuple(keyword.lower() for keyword in data['cs_related_keywords'])
+        self.stopwords = frozenset(data['stopwords']) | _english_stopwords()
+
+    def alias_signature(self, tokens: Iterable[str]) -> str:
+        """计算简历词集合涉及的词典片段的摘要
+
+        片段包括全部规范化词都出现在集合中的别名及其映射的技能、集合中的停用词。
+        两个知识库版本对同一词集合的摘要相同时，从该简历提取的技能也相同
+
+        Args:
+            tokens: normalize_tokens得到的规范化词
+
+        Returns:
+            str: 摘要
+        """
+        tokens = set(tokens)
+        aliases = sorted(
+            (alias, self.skill_mapping[alias])
+            for token in tokens | {''}
+            for alias, parts in self.alias_index.get(token, ())
+            if tokens.issuperset(parts)
+        )
+        stopwords = sorted(self.stopwords & tokens)
+        payload = json.dumps([aliases, stopwords], ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+    def direction_matches(self, skills: Iterable[str]) -> np.ndarray:
+        """计算一份简历在各职业方向上命中的代表技能数
+
+        Args:
+            skills: 技能列表，重复的技能重复计数
+
+        Returns:
+            np.ndarray: 长度为方向数的计数
+        """
+        columns = [self.direction_columns[skill] for skill in skills if skill in self.direction_columns]
+        return self._skill_directions[columns].sum(axis=0)
+
+    def batch_direction_matches(self, skill_lists: Sequence[Iterable[str]]) -> np.ndarray:
+        """计算一批简历或职位在各职业方向上命中的代表技能数：一次稀疏矩阵乘法
+
+        Args:
+            skill_lists: 每份简历或职位的技能列表
+
+        Returns:
+            np.ndarray: 形状为(数量, 方向数)的计数
+        """
+        columns = self.direction_columns
+        rows = []
+        cols = []
+        for row, skills in enumerate(skill_lists):
+            for skill in skills or ():
+                column = columns.get(skill)
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+        shape = (len(skill_lists), len(columns))
+        if SCIPY_AVAILABLE:
+            # 重复的(行, 列)在构造时累加，与逐份计数时重复技能重复计数一致
+            incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=shape)
+            return np.asarray(incidence @ self.direction_matrix.T)
+        incidence = np.zeros(shape, dtype=np.int64)
+        np.add.at(incidence, (rows, cols), 1)
+        return incidence @ self.direction_matrix.T
+
+    def direction_scores(self, matches: np.ndarray) -> np.ndarray:
+        """把命中数换算为方向分数：命中数除以该方向代表技能数再乘100，没有代表技能的方向为0
+
+        Args:
+            matches: direction_matches或batch_direction_matches的结果
+
+        Returns:
+            np.ndarray: 与matches形状相同的分数
+        """
+        return matches / self._direction_divisors * 100
+
+
+def top_two(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """按行选出分数最高的两列，不做完整排序；同分时取靠前的列，与稳定排序的结果一致
+
+    Args:
+        scores: 形状为(数量, 列数)的分数或一维分数，列数至少为2
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 每行第一和第二的列下标，一维输入时为两个标量下标
+    """
+    primary = np.argmax(scores, axis=-1)
+    remaining = np.array(scores, dtype=float)
+    if remaining.ndim == 1:
+        remaining[primary] = -np.inf
+    else:
+        remaining[np.arange(len(remaining)), primary] = -np.inf
+    return primary, np.argmax(remaining, axis=-1)
+
+
+def _english_stopwords() -> frozenset:
+    if not NLTK_STOPWORDS_AVAILABLE:
+        return frozenset()
+    try:
+        return frozenset(nltk_stopwords.words('english'))
+    except LookupError:
+        return frozenset()
+
+
+def load_knowledge_base(path: str = DEFAULT_KB_PATH) -> KnowledgeBase:
+    """从数据文件加载并编译知识库
+
+    Args:
+        path: JSON数据文件路径
+
+    Returns:
+        KnowledgeBase: 知识库
+
+    Raises:
+        OSError: 文件无法读取
+        ValueError: 文件格式错误或缺少必需的表
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"知识库数据文件格式错误: {path}")
+    return KnowledgeBase(data)
+
+
+class KnowledgeBaseLoader:
+    """持有当前知识库，数据文件变化时在后台重新加载并原子替换"""
+
+    def __init__(self, path: str = DEFAULT_KB_PATH, check_interval: float = DEFAULT_KB_RELOAD_INTERVAL):
+        """初始化加载器并立即加载数据文件
+
+        Args:
+            path: JSON数据文件路径
+            check_interval: 检查数据文件变化的间隔（秒），0表示不检查
+
+        Raises:
+            OSError: 首次加载时文件无法读取
+            ValueError: 首次加载时文件格式错误
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._signature = self._stat()
+        self._current = load_knowledge_base(path)
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def current(self) -> KnowledgeBase:
+        """当前知识库；替换只是一次引用赋值，读取方不需要加锁"""
+        return self._current
+
+    def _stat(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """重新加载数据文件，新版本编译完成后再替换；加载失败时保留当前版本
+
+        Returns:
+            bool: 是否替换为新版本
+        """
+        with self._reload_lock:
+            signature = self._stat()
+            try:
+                knowledge_base = load_knowledge_base(self.path)
+            except (OSError, ValueError) as e:
+                logger.error(f"重新加载知识库失败，继续使用版本{self._current.version}: {str(e)}")
+                return False
+            finally:
+                self._signature = signature
+
+            previous = self._current
+            if knowledge_base.version == previous.version:
+                return False
+            self._current = knowledge_base
+
+        logger.info(f"知识库已从版本{previous.version}更新为{knowledge_base.version}")
+        return True
+
+    def check(self) -> bool:
+        """数据文件的修改时间或大小变化时重新加载
+
+        Returns:
+            bool: 是否替换为新版本
+        """
+        if self._stat() == self._signature:
+            return False
+        return self.reload()
+
+    def start(self) -> None:
+        """启动后台检查线程"""
+        with self._reload_lock:
+            if self._thread is None and self.check_interval > 0:
+                self._thread = threading.Thread(target=self._run, name="kb-reloader", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.check_interval):
+            self.check()
+
+    def stop(self) -> None:
+        """停止后台检查线程"""
+        self._stop_event.set()
+
+
+# 进程级共享实例
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def get_knowledge_base_loader() -> KnowledgeBaseLoader:
+    """获取进程级知识库加载器，首次调用时加载数据文件并启动后台检查线程"""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                loader = KnowledgeBaseLoader()
+                loader.start()
+                _loader = loader
+    return _loader
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """获取进程级当前知识库
+
+    Returns:
+        KnowledgeBase: 知识库
+    """
+    return get_knowledge_base_loader().current
+
+
+def reload_knowledge_base() -> bool:
+    """立即重新加载进程级知识库
+
+    Returns:
+        bool: 是否替换为新版本
+    """
+    return get_knowledge_base_loader().reload()
+
+
+# 导出类和函数
+__all__ = ['KnowledgeBase', 'KnowledgeBaseLoader', 'load_knowledge_base', 'get_knowledge_base',
+           'get_knowledge_base_loader', 'reload_knowledge_base', 'normalize_tokens', 'top_two']
@@ -0,0 +1,465 @@
+"""
+AI简历职位匹配系统 - HTTP匹配服务
+在JobSearchIntegration外包装一个本地JSON HTTP服务，供其他后端服务直接调用：
+请求带超时，/health报告排队情况。
+解析、分析和匹配在工作进程池中执行，多个请求的匹配计算可以在多核上并行；每个工作进程启动时
+加载一次知识库、简历分析器和职位索引。进程池之前的有界线程池是准入队列，限制同时处理和排队的请求数
+
+接口（POST，请求和响应均为JSON）：
+    /parse    {"text": "..."} 或 {"path": "..."}                  -> {"resume_data": {...}}
+    /analyze  简历输入                                             -> {"resume_data": {...}, "resume_analysis": {...}}
+    /search   {"keywords", "location", "limit", "platform"}        -> {"jobs": [...], "meta": {...}}
+    /match    简历输入 + {"jobs": [...]}                           -> {"match_results": [...]}
+    /topk     简历输入 + {"k", "location", "platform"}             -> {"matches": [...], "candidates": n}
+其中简历输入为{"resume_data": {...}}（可附带/analyze返回的"resume_analysis"）、{"text": "..."}或{"path": "..."}之一。
+path只在配置了上传目录（--upload-dir或JOBMATCH_SERVICE_UPLOAD_DIR）时可用，且必须位于该目录内
+"""
+import os
+import json
+import time
+import argparse
+import logging
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from cache_manager import get_janitor, DEFAULT_HARD_TTL
+from job_store import JobStore
+from query_normalizer import normalize_city
+from resume_cache import ResumeCache
+from resume_analyzer import ResumeAnalyzer, match_resume_to_jobs_enhanced
+from resume_extractors import ExtractionError
+from job_search_integration_selenium import JobSearchIntegration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MATCH_WORKERS = os.cpu_count() or 4  # 匹配工作进程数，也是同时执行的匹配请求数上限
+DEFAULT_SEARCH_WORKERS = 2
+DEFAULT_MAX_PENDING = 64  # 排队和执行中的请求总数上限，超过时返回503
+DEFAULT_REQUEST_TIMEOUT = 30.0
+DEFAULT_INDEX_SIZE = 5000
+DEFAULT_UPLOAD_DIR = os.environ.get("JOBMATCH_SERVICE_UPLOAD_DIR") or None
+
+
+class ServiceBusy(Exception):
+    """工作池已满"""
+
+
+class JobIndex:
+    """内存中的职位索引，从职位库加载近期职位并按城市分组"""
+
+    def __init__(self, store: JobStore, max_jobs: int = DEFAULT_INDEX_SIZE, max_age: float = DEFAULT_HARD_TTL):
+        """初始化职位索引
+
+        Args:
+            store: 职位库
+            max_jobs: 最多加载的职位数
+            max_age: 只加载该时间内抓取的职位（秒）
+        """
+        self.store = store
+        self.max_jobs = max_jobs
+        self.max_age = max_age
+        self.loaded_at = 0.0
+        self._jobs = []
+        self._by_city = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """从职位库重新加载职位
+
+        Returns:
+            int: 加载的职位数
+        """
+        jobs = self.store.find_jobs(max_age=self.max_age, limit=self.max_jobs)
+        by_city = {}
+        for job in jobs:
+            by_city.setdefault(normalize_city(job.get('location', '')), []).append(job)
+        with self._lock:
+            self._jobs = jobs
+            self._by_city = by_city
+            self.loaded_at = time.time()
+        return len(jobs)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def candidates(self, location: str = "", platform: str = "") -> List[Dict[str, Any]]:
+        """获取候选职位
+
+        Args:
+            location: 地点，为空时不限
+            platform: 平台，为空时不限
+
+        Returns:
+            List[Dict[str, Any]]: 候选职位
+        """
+        city = normalize_city(location)
+        with self._lock:
+            jobs = self._by_city.get(city, []) if city else self._jobs
+        if platform:
+            jobs = [job for job in jobs if job.get('platform') == platform]
+        return jobs
+
+
+# 匹配工作进程内的全局状态：每个进程只加载一次知识库、简历分析器和职位索引
+_worker_analyzer = None
+_worker_resume_cache = None
+_worker_index = None
+
+
+def _init_match_worker(db_path: str, index_size: int, resume_cache_dir: str) -> None:
+    global _worker_analyzer, _worker_resume_cache, _worker_index
+    _worker_analyzer = ResumeAnalyzer()
+    # 与服务进程共用磁盘缓存目录，磁盘缓存的清理由服务进程负责
+    _worker_resume_cache = ResumeCache(resume_cache_dir)
+    _worker_index = JobIndex(JobStore(db_path), index_size)
+    _worker_index.refresh()
+    get_janitor().register(_worker_index.refresh)
+
+
+def _worker_ready() -> bool:
+    return _worker_index is not None
+
+
+def _worker_resume_from(body: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """从请求中取得简历数据和分析结果，text和path按内容哈希命中简历缓存；path已由服务进程校验"""
+    if isinstance(body.get('resume_data'), dict):
+        resume_analysis = body.get('resume_analysis')
+        return body['resume_data'], resume_analysis if isinstance(resume_analysis, dict) else None
+    if body.get('text'):
+        return _worker_resume_cache.parse_text(str(body['text']), _worker_analyzer)
+    if body.get('path'):
+        try:
+            return _worker_resume_cache.parse_file(str(body['path']), _worker_analyzer)
+        except FileNotFoundError:
+            raise ValueError("简历文件不存在")
+        except ExtractionError as e:
+            raise ValueError(f"解析简历失败: {e}")
+    raise ValueError("需要resume_data、text或path之一")
+
+
+def _worker_parse(body: Dict[str, Any]) -> Dict[str, Any]:
+    return {'resume_data': _worker_resume_from(body)[0]}
+
+
+def _worker_analyze(body: Dict[str, Any]) -> Dict[str, Any]:
+    resume_data, resume_analysis = _worker_resume_from(body)
+    if resume_analysis is None:
+        resume_analysis = _worker_analyzer.analyze_resume(resume_data)
+    return {'resume_data': resume_data, 'resume_analysis': resume_analysis}
+
+
+def _worker_match(body: Dict[str, Any]) -> Dict[str, Any]:
+    jobs = body.get('jobs')
+    if not isinstance(jobs, list):
+        raise ValueError("需要jobs列表")
+    resume_data, resume_analysis = _worker_resume_from(body)
+    return {'match_results': match_resume_to_jobs_enhanced(resume_data, jobs, _worker_analyzer, resume_analysis)}
+
+
+def _worker_topk(body: Dict[str, Any]) -> Dict[str, Any]:
+    k = int(body.get('k', 10))
+    candidates = _worker_index.candidates(str(body.get('location', '')), str(body.get('platform', '')))
+    resume_data, resume_analysis = _worker_resume_from(body)
+    match_results = match_resume_to_jobs_enhanced(resume_data, candidates, _worker_analyzer, resume_analysis)
+    jobs_by_id = {job.get('id'): job for job in candidates}
+    matches = [dict(match, job=jobs_by_id.get(match['job_id'], {})) for match in match_results[:k]]
+    return {'matches': matches, 'candidates': len(candidates)}
+
+
+_WORKER_HANDLERS = {
+    'parse': _worker_parse,
+    'analyze': _worker_analyze,
+    'match': _worker_match,
+    'topk': _worker_topk,
+}
+
+
+def _run_in_worker(name: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return _WORKER_HANDLERS[name](body)
+
+
+class MatchingService:
+    """HTTP匹配服务，在后台线程中运行"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8790,
+                 match_workers: int = DEFAULT_MATCH_WORKERS, search_workers: int = DEFAULT_SEARCH_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING, request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 index_size: int = DEFAULT_INDEX_SIZE, upload_dir: Optional[str] = DEFAULT_UPLOAD_DIR,
+                 integration: Optional[JobSearchIntegration] = None):
+        """初始化匹配服务，启动匹配工作进程并等待其加载知识库和职位索引
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示由系统分配空闲端口
+            match_workers: 解析、分析和匹配的工作进程数，也是同时执行的请求数上限
+            search_workers: 职位搜索使用的线程数
+            max_pending: 每个工作池排队和执行中的请求总数上限
+            request_timeout: 单个请求的超时时间（秒）
+            index_size: 职位索引最多加载的职位数
+            upload_dir: 请求中的path必须位于该目录内，为None时不接受path
+            integration: 集成实例，为None时新建
+        """
+        self.integration = integration or JobSearchIntegration()
+        self.analyzer = self.integration.resume_analyzer
+        self.request_timeout = request_timeout
+        self.max_pending = max_pending
+        self.upload_dir = os.path.realpath(upload_dir) if upload_dir else None
+        self.started_at = time.time()
+
+        store = self.integration.job_scraper.job_store if self.integration.job_scraper else JobStore()
+        self.job_index = JobIndex(store, index_size)
+        self.job_index.refresh()
+        get_janitor().register(self.job_index.refresh)
+
+        # spawn启动的子进程不继承服务进程的线程和锁
+        self._match_processes = ProcessPoolExecutor(
+            max_workers=match_workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_match_worker,
+            initargs=(store.db_path, index_size, self.integration.resume_cache.cache_dir)
+        )
+        for future in [self._match_processes.submit(_worker_ready) for _ in range(match_workers)]:
+            future.result()
+
+        # 线程池是准入队列：限制同时执行和排队的请求数，匹配请求的计算在工作进程中执行
+        self._pools = {
+            'match': ThreadPoolExecutor(max_workers=match_workers, thread_name_prefix="service-match"),
+            'search': ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix="service-search"),
+        }
+        self._pending = {'match': 0, 'search': 0}
+        self._running = {'match': 0, 'search': 0}
+        self._workers = {'match': match_workers, 'search': search_workers}
+        self._stats_lock = threading.Lock()
+
+        self.routes = {
+            '/parse': ('match', self.handle_parse),
+            '/analyze': ('match', self.handle_analyze),
+            '/search': ('search', self.handle_search),
+            '/match': ('match', self.handle_match),
+            '/topk': ('match', self.handle_topk),
+        }
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """服务根地址"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MatchingService':
+        """在后台线程中启动服务"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务并释放端口"""
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+        self._match_processes.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> 'MatchingService':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def health(self) -> Dict[str, Any]:
+        """服务状态，包括各工作池的排队数和执行数"""
+        with self._stats_lock:
+            pools = {
+                name: {
+                    'workers': self._workers[name],
+                    'running': self._running[name],
+                    'queue_depth': self._pending[name] - self._running[name],
+                }
+                for name in self._pools
+            }
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'queue_depth': sum(pool['queue_depth'] for pool in pools.values()),
+            'pools': pools,
+            'index_size': len(self.job_index),
+            'index_age_seconds': round(time.time() - self.job_index.loaded_at, 1),
+        }
+
+    def submit(self, pool: str, handler: Callable[[Dict[str, Any]], Dict[str, Any]], body: Dict[str, Any]) -> Dict[str, Any]:
+        """在工作池中执行请求并等待结果
+
+        Args:
+            pool: 工作池名称
+            handler: 请求处理函数
+            body: 请求内容
+
+        Returns:
+            Dict[str, Any]: 响应内容
+
+        Raises:
+            ServiceBusy: 工作池已满
+            concurrent.futures.TimeoutError: 请求超时
+        """
+        with self._stats_lock:
+            if self._pending[pool] >= self.max_pending:
+                raise ServiceBusy(pool)
+            self._pending[pool] += 1
+
+        def run():
+            with self._stats_lock:
+                self._running[pool] += 1
+            try:
+                return handler(body)
+            finally:
+                with self._stats_lock:
+                    self._running[pool] -= 1
+                    self._pending[pool] -= 1
+
+        future = self._pools[pool].submit(run)
+        try:
+            return future.result(timeout=self.request_timeout)
+        except FutureTimeoutError:
+            # 尚未开始的请求直接取消；已在执行的请求完成后结果丢弃
+            if future.cancel():
+                with self._stats_lock:
+                    self._pending[pool] -= 1
+            raise
+
+    def _in_worker(self, name: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """在匹配工作进程中执行请求；path先在服务进程中校验并解析为上传目录内的路径"""
+        if not isinstance(body.get('resume_data'), dict) and not body.get('text') and body.get('path'):
+            body = dict(body, path=self._upload_path(str(body['path'])))
+        return self._match_processes.submit(_run_in_worker, name, body).result()
+
+    def _upload_path(self, path: str) -> str:
+        """将请求中的path解析为上传目录内的文件路径
+
+        Raises:
+            ValueError: 未配置上传目录，或路径（解析符号链接后）不在上传目录内
+        """
+        if self.upload_dir is None:
+            raise ValueError("服务未配置上传目录，不接受path")
+        resolved = os.path.realpath(os.path.join(self.upload_dir, path))
+        if os.path.commonpath([resolved, self.upload_dir]) != self.upload_dir or resolved == self.upload_dir:
+            raise ValueError("path必须位于上传目录内")
+        return resolved
+
+    def handle_parse(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._in_worker('parse', body)
+
+    def handle_analyze(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._in_worker('analyze', body)
+
+    def handle_search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if not body.get('keywords'):
+            raise ValueError("需要keywords")
+        jobs, meta = self.integration.search_jobs_with_meta(
+            str(body['keywords']), str(body.get('location', '北京')),
+            int(body.get('limit', 10)), str(body.get('platform', '智联招聘'))
+        )
+        return {'jobs': jobs, 'meta': meta}
+
+    def handle_match(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._in_worker('match', body)
+
+    def handle_topk(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._in_worker('topk', body)
+
+    def _make_handler(self):
+        """创建绑定到当前服务实例的请求处理类"""
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == '/health':
+                    self._send_json(200, service.health())
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                route = service.routes.get(self.path)
+                if route is None:
+                    self._send_json(404, {'error': 'not found'})
+                    return
+
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    self._send_json(400, {'error': 'invalid json'})
+                    return
+                if not isinstance(body, dict):
+                    self._send_json(400, {'error': 'request body must be an object'})
+                    return
+
+                pool, handler = route
+                try:
+                    self._send_json(200, service.submit(pool, handler, body))
+                except ServiceBusy:
+                    self._send_json(503, {'error': 'busy', 'pool': pool})
+                except FutureTimeoutError:
+                    self._send_json(504, {'error': 'timeout'})
+                except (ValueError, TypeError) as e:
+                    self._send_json(400, {'error': str(e)})
+                except Exception as e:
+                    logger.error(f"处理请求失败 {self.path}: {str(e)}")
+                    self._send_json(500, {'error': str(e)})
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+def main():
+    """命令行入口：在前台运行匹配服务"""
+    parser = argparse.ArgumentParser(description="简历职位匹配HTTP服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8790, help="监听端口")
+    parser.add_argument("--match-workers", type=int, default=DEFAULT_MATCH_WORKERS, help="解析、分析和匹配的工作进程数")
+    parser.add_argument("--search-workers", type=int, default=DEFAULT_SEARCH_WORKERS, help="职位搜索的线程数")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING, help="每个工作池的排队上限")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT, help="请求超时时间（秒）")
+    parser.add_argument("--index-size", type=int, default=DEFAULT_INDEX_SIZE, help="职位索引最多加载的职位数")
+    parser.add_argument("--upload-dir", default=DEFAULT_UPLOAD_DIR, help="允许通过path读取简历的目录，不设置时不接受path")
+    args = parser.parse_args()
+
+    service = MatchingService(
+        args.host, args.port,
+        match_workers=args.match_workers,
+        search_workers=args.search_workers,
+        max_pending=args.max_pending,
+        request_timeout=args.timeout,
+        index_size=args.index_size,
+        upload_dir=args.upload_dir
+    )
+    print(f"匹配服务已启动: {service.url}（职位索引{len(service.job_index)}个职位）")
+    try:
+        service.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        print("匹配服务已停止")
+
+
+if __name__ == "__main__":
+    main()
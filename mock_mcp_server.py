@@ -0,0 +1,377 @@
+"""
+AI简历职位匹配系统 - Firecrawl MCP本地替身服务器
+实现web_scraper.JobScraper使用的/health和/mcp工具调用，返回预置的职位页面，
+支持延迟、错误率和响应体大小注入，用于在没有firecrawl-mcp和API密钥的情况下离线压测
+"""
+import json
+import time
+import random
+import argparse
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+
+# 预置职位页面（Markdown格式，字段标识与JobScraper._parse_job_content的解析规则一致）
+CANNED_PAGES = [
+    {
+        'title': 'Python开发工程师',
+        'company': '北京智联科技有限公司',
+        'location': '北京',
+        'salary': '20k-35k',
+        'education': '本科',
+        'experience': '3-5年',
+        'skills': ['Python', 'Django', 'MySQL', 'Redis', 'Docker', 'Linux']
+    },
+    {
+        'title': 'Java后端开发工程师',
+        'company': '上海云端信息技术有限公司',
+        'location': '上海',
+        'salary': '25k-40k',
+        'education': '本科',
+        'experience': '5年以上',
+        'skills': ['Java', 'Spring Boot', 'MySQL', 'Redis', 'Kubernetes', '微服务']
+    },
+    {
+        'title': '前端开发工程师',
+        'company': '深圳前海互联网有限公司',
+        'location': '深圳',
+        'salary': '18k-30k',
+        'education': '大专',
+        'experience': '1-3年',
+        'skills': ['JavaScript', 'TypeScript', 'React', 'Vue', 'HTML', 'CSS']
+    },
+    {
+        'title': '数据分析师',
+        'company': '杭州数智科技有限公司',
+        'location': '杭州',
+        'salary': '15k-25k',
+        'education': '硕士',
+        'experience': '2-4年',
+        'skills': ['Python', '数据分析', 'MySQL', '机器学习']
+    },
+    {
+        'title': '算法工程师',
+        'company': '广州人工智能研究院',
+        'location': '广州',
+        'salary': '30k-50k',
+        'education': '博士',
+        'experience': '3-5年',
+        'skills': ['Python', 'PyTorch', 'TensorFlow', '深度学习', '机器学习']
+    }
+]
+
+# 模拟的招聘平台域名，覆盖JobScraper._extract_platform_from_url的各个分支
+PLATFORM_DOMAINS = [
+    'jobs.zhaopin.com',
+    'jobs.51job.com',
+    'www.liepin.com',
+    'www.lagou.com',
+    'www.zhipin.com'
+]
+
+
+class MockMCPConfig:
+    """替身服务器的故障与负载注入配置"""
+
+    def __init__(self, latency_ms: float = 50.0, latency_jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, payload_size: int = 0,
+                 batch_delay_ms: float = 0.0, seed: Optional[int] = None):
+        """初始化配置
+
+        Args:
+            latency_ms: 每个/mcp请求的基础延迟（毫秒）
+            latency_jitter_ms: 在基础延迟上叠加的随机抖动上限（毫秒）
+            error_rate: 返回HTTP 500的概率，取值0~1
+            payload_size: 每个职位页面正文的目标字节数，0表示不填充
+            batch_delay_ms: 批量抓取任务从提交到完成所需的时间（毫秒）
+            seed: 随机数种子，便于复现基准结果
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.payload_size = payload_size
+        self.batch_delay_ms = batch_delay_ms
+        self.seed = seed
+
+
+def render_job_page(index: int, payload_size: int = 0) -> str:
+    """生成第index个预置职位页面的Markdown正文
+
+    Args:
+        index: 页面序号
+        payload_size: 目标字节数，不足时用职位描述段落填充
+
+    Returns:
+        str: Markdown正文
+    """
+    page = CANNED_PAGES[index % len(CANNED_PAGES)]
+    lines = [
+        page['title'],
+        f"公司：{page['company']}",
+        f"工作地点：{page['location']}",
+        f"薪资：{page['salary']}",
+        f"学历要求：{page['education']}",
+        f"经验要求：{page['experience']}",
+        "",
+        "职位描述",
+        f"负责{page['title']}相关的研发工作，参与系统设计与核心模块开发。",
+        "",
+        "任职要求",
+    ]
+    lines.extend(f"- 熟悉{skill}" for skill in page['skills'])
+    text = "\n".join(lines) + "\n"
+
+    if payload_size > 0:
+        filler = "岗位职责补充说明：与产品、测试团队紧密协作，持续优化系统性能与稳定性。\n"
+        current_size = len(text.encode('utf-8'))
+        if current_size < payload_size:
+            repeat = (payload_size - current_size) // len(filler.encode('utf-8')) + 1
+            text += filler * repeat
+
+    return text
+
+
+def job_url(index: int) -> str:
+    """生成第index个预置职位页面的URL"""
+    domain = PLATFORM_DOMAINS[index % len(PLATFORM_DOMAINS)]
+    return f"https://{domain}/mock/job_{index}.htm"
+
+
+def _index_from_url(url: str) -> int:
+    """从URL中解析页面序号，无法解析时按URL内容取一个确定的序号"""
+    try:
+        return int(url.rsplit('job_', 1)[1].split('.')[0])
+    except (IndexError, ValueError):
+        return sum(url.encode('utf-8')) % len(CANNED_PAGES)
+
+
+class MockMCPServer:
+    """Firecrawl MCP替身服务器，在后台线程中运行"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8787, config: Optional[MockMCPConfig] = None):
+        """初始化替身服务器
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示由系统分配空闲端口
+            config: 故障与负载注入配置
+        """
+        self.config = config or MockMCPConfig()
+        self.rng = random.Random(self.config.seed)
+        self.rng_lock = threading.Lock()
+        self.batches = {}  # batch_id -> (完成时间, URL列表)
+        self.batches_lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors_injected': 0}
+        self.stats_lock = threading.Lock()
+
+        handler = self._make_handler()
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """服务器根地址"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockMCPServer':
+        """在后台线程中启动服务器"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务器并释放端口"""
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'MockMCPServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _random(self) -> float:
+        with self.rng_lock:
+            return self.rng.random()
+
+    def _inject_latency(self) -> None:
+        """按配置注入延迟"""
+        delay = self.config.latency_ms
+        if self.config.latency_jitter_ms > 0:
+            delay += self._random() * self.config.latency_jitter_ms
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _should_fail(self) -> bool:
+        """按配置的错误率决定本次请求是否失败"""
+        return self.config.error_rate > 0 and self._random() < self.config.error_rate
+
+    def handle_tool_call(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """处理一次MCP工具调用
+
+        Args:
+            name: 工具名称
+            arguments: 工具参数
+
+        Returns:
+            Dict[str, Any]: 工具调用结果
+
+        Raises:
+            ValueError: 工具名称未知
+        """
+        if name == "firecrawl_search":
+            return self._tool_search(arguments)
+        elif name == "firecrawl_scrape":
+            return self._tool_scrape(arguments)
+        elif name == "firecrawl_batch_scrape":
+            return self._tool_batch_scrape(arguments)
+        elif name == "firecrawl_check_batch_status":
+            return self._tool_check_batch_status(arguments)
+        raise ValueError(f"未知的工具: {name}")
+
+    def _tool_search(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        limit = int(arguments.get('limit', 10))
+        # 同一查询返回固定的起始页面，保证结果可复现
+        query = arguments.get('query', '')
+        offset = sum(query.encode('utf-8')) % len(CANNED_PAGES)
+        content = []
+        for i in range(limit):
+            index = offset + i
+            page = CANNED_PAGES[index % len(CANNED_PAGES)]
+            content.append({
+                'type': 'text',
+                'url': job_url(index),
+                'text': f"{page['title']} - {page['company']} - {page['location']}"
+            })
+        return {'content': content}
+
+    def _tool_scrape(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        index = _index_from_url(arguments.get('url', ''))
+        return {'content': [{'type': 'text', 'text': render_job_page(index, self.config.payload_size)}]}
+
+    def _tool_batch_scrape(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        urls = list(arguments.get('urls', []))
+        batch_id = uuid.uuid4().hex[:12]
+        ready_at = time.time() + self.config.batch_delay_ms / 1000.0
+        with self.batches_lock:
+            self.batches[batch_id] = (ready_at, urls)
+        return {'content': [{
+            'type': 'text',
+            'text': f"Batch operation queued with ID: batch_{batch_id}. Use firecrawl_check_batch_status to check progress."
+        }]}
+
+    def _tool_check_batch_status(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        batch_id = str(arguments.get('id', '')).replace('batch_', '', 1)
+        with self.batches_lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            return {'status': 'failed', 'error': f"未知的批量任务: {batch_id}"}
+
+        ready_at, urls = batch
+        if time.time() < ready_at:
+            return {'status': 'processing', 'completed': 0, 'total': len(urls)}
+
+        with self.batches_lock:
+            self.batches.pop(batch_id, None)
+        results = [
+            {'content': [{'type': 'text', 'text': render_job_page(_index_from_url(url), self.config.payload_size)}]}
+            for url in urls
+        ]
+        return {'status': 'completed', 'completed': len(urls), 'total': len(urls), 'results': results}
+
+    def _make_handler(self):
+        """创建绑定到当前服务器实例的请求处理类"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == '/health':
+                    self._send_json(200, {'status': 'ok'})
+                else:
+                    self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path != '/mcp':
+                    self._send_json(404, {'error': 'not found'})
+                    return
+
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    self._send_json(400, {'error': 'invalid json'})
+                    return
+
+                with server.stats_lock:
+                    server.stats['requests'] += 1
+                server._inject_latency()
+
+                if server._should_fail():
+                    with server.stats_lock:
+                        server.stats['errors_injected'] += 1
+                    self._send_json(500, {'error': 'injected failure'})
+                    return
+
+                try:
+                    result = server.handle_tool_call(request.get('name', ''), request.get('arguments', {}))
+                except ValueError as e:
+                    self._send_json(400, {'error': str(e)})
+                    return
+                self._send_json(200, result)
+
+            def log_message(self, format, *args):
+                # 压测时关闭逐请求的访问日志
+                pass
+
+        return Handler
+
+
+def main():
+    """命令行入口：在前台运行替身服务器"""
+    parser = argparse.ArgumentParser(description="Firecrawl MCP本地替身服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8787, help="监听端口")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="每个请求的基础延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="延迟抖动上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="注入HTTP 500的概率")
+    parser.add_argument("--payload-size", type=int, default=0, help="每个页面正文的目标字节数")
+    parser.add_argument("--batch-delay-ms", type=float, default=0.0, help="批量抓取完成所需时间（毫秒）")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子")
+    args = parser.parse_args()
+
+    config = MockMCPConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        payload_size=args.payload_size,
+        batch_delay_ms=args.batch_delay_ms,
+        seed=args.seed
+    )
+    server = MockMCPServer(args.host, args.port, config)
+    print(f"MCP替身服务器已启动: {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print("MCP替身服务器已停止")
+
+
+if __name__ == "__main__":
+    main()
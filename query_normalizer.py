@@ -0,0 +1,134 @@
+"""
+AI简历职位匹配系统 - 搜索查询规范化模块
+将搜索关键词和城市转换为规范形式，使"Python 开发工程师"、"python开发工程师"和
+"开发工程师 Python"等近似重复的搜索共用同一份缓存
+"""
+import re
+import unicodedata
+from typing import List, Dict, Any
+
+# 城市别名（拼音、英文、简称）到标准城市名
+CITY_ALIASES = {
+    'beijing': '北京', 'bj': '北京', '京': '北京',
+    'shanghai': '上海', 'sh': '上海', '沪': '上海',
+    'guangzhou': '广州', 'gz': '广州', '穗': '广州',
+    'shenzhen': '深圳', 'sz': '深圳',
+    'hangzhou': '杭州', 'hz': '杭州',
+    'nanjing': '南京', 'nj': '南京',
+    'chengdu': '成都', 'cd': '成都',
+    'wuhan': '武汉', 'wh': '武汉',
+    "xi'an": '西安', 'xian': '西安',
+    'suzhou': '苏州',
+    'tianjin': '天津', 'tj': '天津',
+    'chongqing': '重庆', 'cq': '重庆',
+}
+
+# 表示不限地点的写法
+NATIONWIDE = {'', '全国', '不限', '全部', 'china', '中国', 'all'}
+
+# 行政区划后缀，规范化时去掉
+CITY_SUFFIXES = ('特别行政区', '自治州', '地区', '市', '省')
+
+_CJK_RANGE = '\u4e00-\u9fa5'
+_TOKEN_PATTERN = re.compile(rf'[{_CJK_RANGE}]+|[a-z0-9+#.]+')
+
+
+def _normalize_text(text: str) -> str:
+    """统一全角/半角和大小写"""
+    return unicodedata.normalize('NFKC', text or '').lower().strip()
+
+
+def tokenize_query(keywords: str) -> List[str]:
+    """将搜索关键词切分为排序去重后的词项
+
+    中文和英文数字连写时在边界处切分，例如"python开发工程师"切分为["python", "开发工程师"]
+
+    Args:
+        keywords: 搜索关键词
+
+    Returns:
+        List[str]: 排序后的词项
+    """
+    tokens = set()
+    for token in _TOKEN_PATTERN.findall(_normalize_text(keywords)):
+        token = token.strip('.')
+        if token:
+            tokens.add(token)
+    return sorted(tokens)
+
+
+def canonical_query(keywords: str) -> str:
+    """获取搜索关键词的规范形式
+
+    Args:
+        keywords: 搜索关键词
+
+    Returns:
+        str: 以空格连接的排序词项
+    """
+    return ' '.join(tokenize_query(keywords))
+
+
+def normalize_city(location: str) -> str:
+    """获取城市的规范形式
+
+    去掉"市"、"省"等后缀和区县部分，别名转换为标准城市名，不限地点返回空字符串
+
+    Args:
+        location: 地点，如"北京市海淀区"、"Beijing"、"全国"
+
+    Returns:
+        str: 标准城市名
+    """
+    text = _normalize_text(location)
+    if text in NATIONWIDE:
+        return ''
+    if text in CITY_ALIASES:
+        return CITY_ALIASES[text]
+
+    # 只保留第一个城市：去掉"-海淀区"、"·朝阳"等区县部分
+    text = re.split(r'[\s\-·/,，]', text)[0]
+    # "广东省深圳市"取城市部分，"北京市海淀区"取"北京"
+    match = re.match(rf'(?:[{_CJK_RANGE}]+?省)?([{_CJK_RANGE}]+?)市', text)
+    if match:
+        text = match.group(1)
+    else:
+        for suffix in CITY_SUFFIXES:
+            if text.endswith(suffix) and len(text) > len(suffix):
+                text = text[:-len(suffix)]
+                break
+    return CITY_ALIASES.get(text, text)
+
+
+def canonical_search_key(keywords: str, location: str, platform: str) -> str:
+    """获取搜索的规范缓存键
+
+    Args:
+        keywords: 搜索关键词
+        location: 地点
+        platform: 平台
+
+    Returns:
+        str: 缓存键
+    """
+    return f"jobs|{_normalize_text(platform)}|{canonical_query(keywords)}|{normalize_city(location)}"
+
+
+def filter_jobs_by_city(jobs: List[Dict[str, Any]], city: str) -> List[Dict[str, Any]]:
+    """从职位列表中筛选位于指定城市的职位
+
+    Args:
+        jobs: 职位列表
+        city: 标准城市名，为空时不筛选
+
+    Returns:
+        List[Dict[str, Any]]: 筛选后的职位列表
+    """
+    if not city:
+        return list(jobs)
+    return [job for job in jobs if normalize_city(job.get('location', '')) == city]
+
+
+# 导出函数
+__all__ = ['tokenize_query', 'canonical_query', 'normalize_city',
+           'canonical_search_key', 'filter_jobs_by_city']
@@ -5,9 +5,14 @@ AI简历职位匹配系统 - 简历分析增强模块 (Streamlit Cloud兼容版)
 import os
 import re
 import json
-from typing import List, Dict, Any, Optional, Union, Set, Tuple
+import datetime
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Union, Set, Tuple, Mapping
 from collections import Counter
 
+from resume_extractors import extract_resume_text, ExtractionError, SECTION_HEADERS, SECTION_PATTERN
+from knowledge_base import KnowledgeBase, get_knowledge_base, top_two
+
 # 尝试导入nltk，如果失败则使用备用方案
 try:
     import nltk
@@ -26,264 +31,218 @@ except ImportError:
     print("NLTK库不可用，将使用备用方案")
     NLTK_AVAILABLE = False
 
+# 解析和分析逻辑的版本，修改提取规则后递增，使磁盘上缓存的解析结果失效
+PARSER_VERSION = 4
+
+# 简历分节标题（SECTION_HEADERS）和合并后的行首标题正则与PDF提前停止共用，定义在resume_extractors中
+# 第一个分节标题之前的部分（姓名和联系方式）
+HEADER_SECTION = 'header'
+
+def segment_resume(content: str) -> Dict[str, List[Tuple[int, int]]]:
+    """一次线性扫描找出简历的所有分节
+
+    每个分节从标题之后开始，到下一个分节标题为止；同名分节出现多次时保留全部区间
+
+    Args:
+        content: 简历文本
+
+    Returns:
+        Dict[str, List[Tuple[int, int]]]: 分节名称到(开始, 结束)区间列表的映射，header为第一个标题之前的部分
+    """
+    headers = [(match.lastgroup, match.start(), match.end()) for match in SECTION_PATTERN.finditer(content)]
+    sections = {HEADER_SECTION: [(0, headers[0][1] if headers else len(content))]}
+    for index, (name, _, body_start) in enumerate(headers):
+        body_end = headers[index + 1][1] if index + 1 < len(headers) else len(content)
+        sections.setdefault(name, []).append((body_start, body_end))
+    return sections
+
+def section_text(content: str, sections: Dict[str, List[Tuple[int, int]]], *names: str) -> str:
+    """拼接指定分节的文本
+
+    Args:
+        content: 简历文本
+        sections: segment_resume的结果
+        names: 分节名称
+
+    Returns:
+        str: 分节文本，分节不存在时为空字符串
+    """
+    return "\n".join(content[start:end] for name in names for start, end in sections.get(name, []))
+
+# 教育和工作经历的扫描器：每个字段是一个命名分组，一次finditer按出现顺序产生带位置的字段
+_DATE_TOKEN = r'(?P<date>(?<!\d)\d{4}(?:[-/年.](?:1[0-2]|0?[1-9])(?!\d)月?|[-/年]?)(?!\d))'
+# 紧跟在日期或区间分隔符之后的"至今"等，作为仍在进行的条目的结束日期
+_OPEN_END_TOKEN = (r'|(?P<open_end>(?<=[-–—~～至到\d年月])[ \t]*'
+                   r'(?:至今|现在|目前|(?<![A-Za-z])(?i:present|now|current)(?![A-Za-z])))')
+_CJK = r'\u4e00-\u9fa5'
+_DEGREE_WORDS = r'博士|硕士|本科|大专|高中'
+_DEGREE_WORDS_EN = (r'ph\.d\.?|phd|doctoral|doctor|master|m\.sc\.|m\.s\.|msc|ms|bachelor|b\.sc\.|b\.s\.|bsc|bs'
+                    r'|undergraduate|associate|college|diploma|high[ \t]+school|secondary')
+_MAJOR_WORDS_EN = (r'computer|software|information|communication|electronic|automation|artificial[ \t]+intelligence|'
+                   r'data|network|mechanical|civil|architecture|electrical|energy|material|chemical|physics|mathematics|'
+                   r'statistics|finance|economics|management|marketing|human[ \t]+resource|law|medicine|biology|'
+                   r'environment|food|agriculture|art|design|music|literature|history|philosophy|psychology|education|sports')
+# 英文校名中"of"之后的1到3个首字母大写的词，遇到学位或专业词即停止
+_NAME_WORDS = (r'(?:[ \t]+(?!(?i:' + _DEGREE_WORDS_EN + r'|' + _MAJOR_WORDS_EN + r')(?![A-Za-z]))'
+               r'[A-Z][A-Za-z]*){1,3}')
+_EDUCATION_SCANNER = re.compile(
+    _DATE_TOKEN + _OPEN_END_TOKEN +
+    r'|(?P<school>[' + _CJK + r'A-Za-z]+(?:大学|学院)'
+    r'|(?i:university[ \t]+of)' + _NAME_WORDS +
+    r'|(?:[A-Z][A-Za-z]*[ \t]+){1,4}(?i:university|college|institute[ \t]+of' + _NAME_WORDS + r'))'
+    r'|(?P<degree>' + _DEGREE_WORDS +
+    r'|(?<![A-Za-z])(?i:' + _DEGREE_WORDS_EN + r')(?![A-Za-z]))'
+    r'|(?P<major>(?:计算机|软件|信息|通信|电子|自动化|人工智能|数据|网络|机械|土木|建筑|电气|能源|材料|化学|物理|数学|统计|'
+    r'金融|经济|管理|市场|人力资源|法律|医学|生物|环境|食品|农业|艺术|设计|音乐|文学|历史|哲学|心理|教育|体育)'
+    r'(?:(?!' + _DEGREE_WORDS + r')[' + _CJK + r'])*'
+    r'|(?<![A-Za-z])(?i:' + _MAJOR_WORDS_EN + r')(?![A-Za-z]))'
+)
+_EXPERIENCE_COMPANY = (
+    # 中文公司名后紧跟汉字时多半是描述（如"负责公司内部平台"），不作为公司
+    r'|(?P<company>[' + _CJK + r'A-Za-z]+(?:公司|集团|有限)(?![' + _CJK + r'])'
+    r'|(?:[A-Z][A-Za-z&\-]*[ \t]+){1,4}(?i:inc|corporation|ltd|limited|co)(?![A-Za-z])\.?)'
+)
+# 职位前缀可以包含英文技术词（如"高级Java开发工程师"）
+_EXPERIENCE_POSITION = (
+    r'|(?P<position>[' + _CJK + r'A-Za-z+#]*(?:工程师|开发|架构|设计|测试|运维|产品|项目|经理|主管|总监|专员|助理|顾问|分析师|研究员|实习生|实习)'
+    r'|(?:[A-Z][A-Za-z]*[ \t]+){0,3}(?i:engineer|developer|architect|designer|tester|operations|product|project|manager|'
+    r'supervisor|director|specialist|assistant|consultant|analyst|researcher|intern)(?![A-Za-z]))'
+)
+_EXPERIENCE_SCANNER = re.compile(_DATE_TOKEN + _OPEN_END_TOKEN + _EXPERIENCE_COMPANY + _EXPERIENCE_POSITION)
+
+@lru_cache(maxsize=4)
+def _experience_scanner(knowledge_base: KnowledgeBase):
+    """工作经历扫描器：在通用公司规则之后加入公司词典中的名称和别名（如没有"公司"后缀的"阿里巴巴"）
+
+    词典随知识库热更新变化，按知识库对象缓存编译结果
+    """
+    forms = []
+    for form in knowledge_base.companies.forms:
+        escaped = re.escape(form)
+        forms.append(f'(?<![A-Za-z]){escaped}(?![A-Za-z])' if form.isascii() else escaped)
+    if not forms:
+        return _EXPERIENCE_SCANNER
+    known_company = r'|(?P<known_company>(?i:' + '|'.join(forms) + r'))'
+    return re.compile(_DATE_TOKEN + _OPEN_END_TOKEN + _EXPERIENCE_COMPANY + known_company + _EXPERIENCE_POSITION)
+
+_BLANK_LINE = re.compile(r'\n[ \t]*\n')
+# 行首在字段之前只能出现的内容：空白、列表符号和日期
+_LINE_HEAD = re.compile(r'(?:[\s\d\-–—~～/.,、|•·*年月]|至今|现在|目前|(?i:present|now|current|to))*')
+# 只在行首（前面只有日期）识别的字段及其对应的条目字段：词典中的公司名也常出现在描述中（如"与腾讯合作"）
+_LINE_HEAD_KINDS = {'known_company': 'company'}
+
+def _line_start(text: str, position: int) -> int:
+    return text.rfind('\n', 0, position) + 1
+
+def _scan_entries(text: str, scanner, anchor: str, fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """单次扫描文本，按位置远近把字段归并为条目
+
+    遇到空行、已填的锚点字段（学校/公司）、已有结束日期时的日期，或已有开始日期时位于行首的日期时开始新条目；
+    "至今"等作为结束日期。同一条目中重复的其他字段被忽略，职位例外：与已有职位在同一行时追加（如"高级工程师 项目经理"）
+
+    Args:
+        text: 分节文本
+        scanner: 带命名分组的扫描器
+        anchor: 每个条目必须有的字段
+        fields: 条目的字段（日期之外）
+
+    Returns:
+        List[Dict[str, Any]]: 含锚点字段的条目
+    """
+    entries = []
+    current = None
+    last_end = 0
+    position_end = 0
+    for match in scanner.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind).strip()
+        if kind in _LINE_HEAD_KINDS:
+            if not _LINE_HEAD.fullmatch(text, _line_start(text, match.start()), match.start()):
+                continue
+            kind = _LINE_HEAD_KINDS[kind]
+        if kind == 'open_end':
+            if current is not None and current['start_date'] and not current['end_date'] \
+                    and not _BLANK_LINE.search(text, last_end, match.start()):
+                current['end_date'] = value
+                last_end = match.end()
+            continue
+
+        if current is None or _BLANK_LINE.search(text, last_end, match.start()):
+            new_entry = True
+        elif kind == 'date':
+            line_leading = not text[_line_start(text, match.start()):match.start()].strip()
+            new_entry = bool(current['end_date']) or (bool(current['start_date']) and line_leading)
+        else:
+            new_entry = kind == anchor and bool(current[anchor])
+
+        if new_entry:
+            current = dict.fromkeys(fields + ('start_date', 'end_date'), '')
+            entries.append(current)
+
+        if kind == 'date':
+            current['start_date' if not current['start_date'] else 'end_date'] = value
+        elif not current[kind]:
+            current[kind] = value
+            position_end = match.end()
+        elif kind == 'position' and '\n' not in text[position_end:match.start()]:
+            current[kind] += ' ' + value
+            position_end = match.end()
+        last_end = match.end()
+    return [entry for entry in entries if entry[anchor]]
+
+# 职位级别关键词
+MANAGEMENT_KEYWORDS = ('经理', '主管', '总监', '负责人', '管理', 'manager', 'supervisor', 'director', 'lead', 'management')
+SENIOR_KEYWORDS = ('高级', '资深', '专家', 'senior', 'expert', 'staff', 'principal')
+
 class ResumeAnalyzer:
     """增强版简历分析器"""
     
-    def __init__(self):
-        """初始化简历分析器"""
-        self.stopwords = set()
-        # 添加中文停用词
-        self.chinese_stopwords = {'的', '了', '和', '是', '就', '都', '而', '及', '与', '这', '那', '有', '在', '中', '为'}
-        self.stopwords.update(self.chinese_stopwords)
-        
-        # 如果nltk可用，添加英文停用词
-        if NLTK_AVAILABLE:
-            try:
-                self.stopwords.update(set(nltk.corpus.stopwords.words('english')))
-            except:
-                pass
-        
-        # 技能关键词映射，用于标准化技能名称
-        self.skill_mapping = {
-            # 编程语言
-            'python': 'Python',
-            'java': 'Java',
-            'javascript': 'JavaScript',
-            'js': 'JavaScript',
-            'typescript': 'TypeScript',
-            'ts': 'TypeScript',
-            'c++': 'C++',
-            'c#': 'C#',
-            'golang': 'Go',
-            'go': 'Go',
-            'rust': 'Rust',
-            'php': 'PHP',
-            'ruby': 'Ruby',
-            'swift': 'Swift',
-            'kotlin': 'Kotlin',
-            'objective-c': 'Objective-C',
-            'scala': 'Scala',
-            'r': 'R',
-            'shell': 'Shell',
-            'bash': 'Bash',
-            
-            # 前端技术
-            'react': 'React',
-            'reactjs': 'React',
-            'vue': 'Vue.js',
-            'vuejs': 'Vue.js',
-            'angular': 'Angular',
-            'angularjs': 'Angular',
-            'jquery': 'jQuery',
-            'html': 'HTML',
-            'html5': 'HTML',
-            'css': 'CSS',
-            'css3': 'CSS',
-            'sass': 'SASS',
-            'less': 'LESS',
-            'bootstrap': 'Bootstrap',
-            'tailwind': 'Tailwind CSS',
-            'webpack': 'Webpack',
-            'vite': 'Vite',
-            
-            # 后端技术
-            'node': 'Node.js',
-            'nodejs': 'Node.js',
-            'express': 'Express',
-            'django': 'Django',
-            'flask': 'Flask',
-            'spring': 'Spring',
-            'spring boot': 'Spring Boot',
-            'springboot': 'Spring Boot',
-            'laravel': 'Laravel',
-            'asp.net': 'ASP.NET',
-            'aspnet': 'ASP.NET',
-            
-            # 数据库
-            'mysql': 'MySQL',
-            'postgresql': 'PostgreSQL',
-            'postgres': 'PostgreSQL',
-            'mongodb': 'MongoDB',
-            'mongo': 'MongoDB',
-            'redis': 'Redis',
-            'elasticsearch': 'Elasticsearch',
-            'oracle': 'Oracle',
-            'sql server': 'SQL Server',
-            'sqlserver': 'SQL Server',
-            'sqlite': 'SQLite',
-            
-            # 云服务和DevOps
-            'aws': 'AWS',
-            'azure': 'Azure',
-            'gcp': 'GCP',
-            'docker': 'Docker',
-            'kubernetes': 'Kubernetes',
-            'k8s': 'Kubernetes',
-            'jenkins': 'Jenkins',
-            'git': 'Git',
-            'github': 'GitHub',
-            'gitlab': 'GitLab',
-            'terraform': 'Terraform',
-            'ansible': 'Ansible',
-            
-            # 数据科学和AI
-            'machine learning': '机器学习',
-            'ml': '机器学习',
-            'deep learning': '深度学习',
-            'dl': '深度学习',
-            'artificial intelligence': '人工智能',
-            'ai': '人工智能',
-            'tensorflow': 'TensorFlow',
-            'pytorch': 'PyTorch',
-            'keras': 'Keras',
-            'scikit-learn': 'Scikit-learn',
-            'sklearn': 'Scikit-learn',
-            'pandas': 'Pandas',
-            'numpy': 'NumPy',
-            'scipy': 'SciPy',
-            'matplotlib': 'Matplotlib',
-            
-            # 移动开发
-            'android': 'Android',
-            'ios': 'iOS',
-            'react native': 'React Native',
-            'reactnative': 'React Native',
-            'flutter': 'Flutter',
-            'xamarin': 'Xamarin',
-            
-            # 其他技术
-            'restful': 'RESTful API',
-            'rest': 'RESTful API',
-            'graphql': 'GraphQL',
-            'websocket': 'WebSocket',
-            'oauth': 'OAuth',
-            'jwt': 'JWT',
-            'microservices': '微服务',
-            'serverless': 'Serverless',
-            'ci/cd': 'CI/CD',
-            'cicd': 'CI/CD',
-        }
-        
-        # 技能类别映射
-        self.skill_categories = {
-            'programming_languages': [
-                'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'Go', 'Rust', 
-                'PHP', 'Ruby', 'Swift', 'Kotlin', 'Objective-C', 'Scala', 'R', 'Shell', 'Bash'
-            ],
-            'frontend': [
-                'React', 'Vue.js', 'Angular', 'jQuery', 'HTML', 'CSS', 'SASS', 'LESS', 
-                'Bootstrap', 'Tailwind CSS', 'Webpack', 'Vite'
-            ],
-            'backend': [
-                'Node.js', 'Express', 'Django', 'Flask', 'Spring', 'Spring Boot', 
-                'Laravel', 'ASP.NET'
-            ],
-            'database': [
-                'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Elasticsearch', 'Oracle', 
-                'SQL Server', 'SQLite'
-            ],
-            'devops': [
-                'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins', 'Git', 'GitHub', 
-                'GitLab', 'Terraform', 'Ansible', 'CI/CD'
-            ],
-            'data_science': [
-                '机器学习', '深度学习', '人工智能', 'TensorFlow', 'PyTorch', 'Keras', 
-                'Scikit-learn', 'Pandas', 'NumPy', 'SciPy', 'Matplotlib'
-            ],
-            'mobile': [
-                'Android', 'iOS', 'React Native', 'Flutter', 'Xamarin'
-            ],
-            'other': [
-                'RESTful API', 'GraphQL', 'WebSocket', 'OAuth', 'JWT', '微服务', 'Serverless'
-            ]
-        }
-        
-        # 职业方向映射
-        self.career_directions = {
-            'frontend_developer': {
-                'name': '前端开发工程师',
-                'skills': ['JavaScript', 'HTML', 'CSS', 'React', 'Vue.js', 'Angular', 'TypeScript', 'Webpack']
-            },
-            'backend_developer': {
-                'name': '后端开发工程师',
-                'skills': ['Java', 'Python', 'Go', 'C#', 'Node.js', 'Spring', 'Django', 'Express']
-            },
-            'fullstack_developer': {
-                'name': '全栈开发工程师',
-                'skills': ['JavaScript', 'TypeScript', 'Python', 'Java', 'React', 'Vue.js', 'Node.js', 'Express', 'Django', 'Spring']
-            },
-            'data_scientist': {
-                'name': '数据科学家',
-                'skills': ['Python', 'R', '机器学习', '深度学习', 'TensorFlow', 'PyTorch', 'Pandas', 'NumPy', 'SciPy']
-            },
-            'data_engineer': {
-                'name': '数据工程师',
-                'skills': ['Python', 'Spark', 'Hadoop', 'SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'ETL']
-            },
-            'devops_engineer': {
-                'name': 'DevOps工程师',
-                'skills': ['Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'Jenkins', 'Terraform', 'Ansible', 'CI/CD']
-            },
-            'mobile_developer': {
-                'name': '移动开发工程师',
-                'skills': ['Android', 'iOS', 'Swift', 'Kotlin', 'React Native', 'Flutter']
-            },
-            'ai_engineer': {
-                'name': 'AI工程师',
-                'skills': ['Python', '机器学习', '深度学习', '人工智能', 'TensorFlow', 'PyTorch', 'NLP', '计算机视觉']
-            },
-            'security_engineer': {
-                'name': '安全工程师',
-                'skills': ['网络安全', '渗透测试', '安全审计', '密码学', 'OWASP', '风险评估']
-            },
-            'product_manager': {
-                'name': '产品经理',
-                'skills': ['产品设计', '用户研究', '需求分析', '产品规划', '市场分析', '用户体验']
-            },
-            'project_manager': {
-                'name': '项目经理',
-                'skills': ['项目管理', '敏捷开发', 'Scrum', 'Kanban', '风险管理', '资源规划']
-            }
-        }
-        
-        # 教育水平映射
-        self.education_levels = {
-            '博士': 5,
-            '硕士': 4,
-            '本科': 3,
-            '大专': 2,
-            '高中': 1,
-            'phd': 5,
-            'ph.d': 5,
-            'ph.d.': 5,
-            'doctor': 5,
-            'doctoral': 5,
-            'master': 4,
-            'ms': 4,
-            'msc': 4,
-            'm.s.': 4,
-            'm.sc.': 4,
-            'bachelor': 3,
-            'bs': 3,
-            'bsc': 3,
-            'b.s.': 3,
-            'b.sc.': 3,
-            'undergraduate': 3,
-            'associate': 2,
-            'college': 2,
-            'diploma': 2,
-            'high school': 1,
-            'secondary': 1
-        }
+    def __init__(self, knowledge_base: Optional[KnowledgeBase] = None):
+        """初始化简历分析器
         
-        # 知名大学列表
-        self.top_universities = [
-            '清华大学', '北京大学', '复旦大学', '上海交通大学', '浙江大学', '南京大学', 
-            '中国科学技术大学', '哈尔滨工业大学', '西安交通大学', '武汉大学',
-            'harvard', 'stanford', 'mit', 'cambridge', 'oxford', 'caltech', 'princeton', 
-            'yale', 'columbia', 'chicago', 'berkeley', 'ucla', 'michigan', 'toronto', 
-            'eth zurich', 'imperial college', 'ucl', 'tsinghua', 'peking', 'tokyo'
-        ]
+        Args:
+            knowledge_base: 固定使用的知识库，为None时始终使用进程级当前知识库（随热更新变化）
+        """
+        self._knowledge_base = knowledge_base
+    
+    @property
+    def knowledge_base(self) -> KnowledgeBase:
+        return self._knowledge_base or get_knowledge_base()
+    
+    def snapshot(self) -> 'ResumeAnalyzer':
+        """获取固定在当前知识库版本上的分析器，保证一次解析或分析内不会遇到知识库替换"""
+        if self._knowledge_base is not None:
+            return self
+        return ResumeAnalyzer(get_knowledge_base())
+    
+    # 以下属性保持原有的访问方式，数据均来自共享的只读知识库
+    @property
+    def kb_version(self) -> str:
+        return self.knowledge_base.version
+    
+    @property
+    def stopwords(self) -> frozenset:
+        return self.knowledge_base.stopwords
+    
+    @property
+    def skill_mapping(self) -> Mapping[str, str]:
+        return self.knowledge_base.skill_mapping
+    
+    @property
+    def skill_categories(self) -> Mapping[str, frozenset]:
+        return self.knowledge_base.skill_categories
+    
+    @property
+    def career_directions(self) -> Mapping[str, Mapping[str, Any]]:
+        return self.knowledge_base.career_directions
+    
+    @property
+    def education_levels(self) -> Mapping[str, int]:
+        return self.knowledge_base.education_levels
+    
+    @property
+    def top_universities(self) -> Tuple[str, ...]:
+        return self.knowledge_base.top_universities
     
     def tokenize_text(self, text: str) -> List[str]:
         """分词函数，支持中英文"""
@@ -319,22 +278,23 @@ class ResumeAnalyzer:
             if token in self.skill_mapping:
                 skills.append(self.skill_mapping[token])
         
-        # 使用正则表达式匹配多词技能
-        for skill_key, skill_value in self.skill_mapping.items():
-            if ' ' in skill_key and skill_key.lower() in text.lower():
-                skills.append(skill_value)
+        # 匹配多词技能，所有多词别名编译在一个正则中，一次扫描完成
+        pattern = self.knowledge_base.multiword_pattern
+        if pattern is not None:
+            skill_mapping = self.skill_mapping
+            skills.extend(skill_mapping[match.group(0)] for match in pattern.finditer(text.lower()))
         
         # 去重
         return list(set(skills))
     
     def categorize_skills(self, skills: List[str]) -> Dict[str, int]:
         """对技能进行分类"""
-        categories = {}
-        for category, category_skills in self.skill_categories.items():
-            count = sum(1 for skill in skills if skill in category_skills)
-            if count > 0:
-                categories[category] = count
-        return categories
+        counts = Counter()
+        skill_to_categories = self.knowledge_base.skill_to_categories
+        for skill in skills:
+            counts.update(skill_to_categories.get(skill, ()))
+        # 保持知识库中的类别顺序
+        return {category: counts[category] for category in self.skill_categories if counts[category] > 0}
     
     def analyze_skills(self, skills: List[str]) -> Dict[str, Any]:
         """分析技能"""
@@ -377,36 +337,7 @@ class ResumeAnalyzer:
         if not text:
             return []
         
-        education = []
-        
-        # 提取学校名称
-        school_pattern = r'([\u4e00-\u9fa5a-zA-Z]+大学|[\u4e00-\u9fa5a-zA-Z]+学院|university\s+of\s+[\w\s]+|[\w\s]+\s+university|[\w\s]+\s+college|[\w\s]+\s+institute\s+of\s+[\w\s]+)'
-        schools = re.findall(school_pattern, text, re.IGNORECASE)
-        
-        # 提取学位
-        degree_pattern = r'(博士|硕士|本科|大专|高中|phd|ph\.d|doctor|doctoral|master|ms|msc|m\.s\.|m\.sc\.|bachelor|bs|bsc|b\.s\.|b\.sc\.|undergraduate|associate|college|diploma|high\s+school|secondary)'
-        degrees = re.findall(degree_pattern, text, re.IGNORECASE)
-        
-        # 提取专业
-        major_pattern = r'(计算机|软件|信息|通信|电子|自动化|人工智能|数据|网络|机械|土木|建筑|电气|能源|材料|化学|物理|数学|统计|金融|经济|管理|市场|人力资源|法律|医学|生物|环境|食品|农业|艺术|设计|音乐|文学|历史|哲学|心理|教育|体育|computer|software|information|communication|electronic|automation|artificial\s+intelligence|data|network|mechanical|civil|architecture|electrical|energy|material|chemical|physics|mathematics|statistics|finance|economics|management|marketing|human\s+resource|law|medicine|biology|environment|food|agriculture|art|design|music|literature|history|philosophy|psychology|education|sports)'
-        majors = re.findall(major_pattern, text, re.IGNORECASE)
-        
-        # 提取日期
-        date_pattern = r'(\d{4}[-/年]\d{1,2}[-/月]|\d{4}[-/年]|\d{4})'
-        dates = re.findall(date_pattern, text)
-        
-        # 组合结果
-        for i in range(min(len(schools), len(degrees) if degrees else 1)):
-            edu = {
-                'school': schools[i] if i < len(schools) else '',
-                'degree': degrees[i] if i < len(degrees) else '',
-                'major': majors[i] if i < len(majors) else '',
-                'start_date': dates[i*2] if i*2 < len(dates) else '',
-                'end_date': dates[i*2+1] if i*2+1 < len(dates) else ''
-            }
-            education.append(edu)
-        
-        return education
+        return _scan_entries(text, _EDUCATION_SCANNER, 'school', ('school', 'degree', 'major'))
     
     def analyze_education(self, education: List[Dict[str, Any]]) -> Dict[str, Any]:
         """分析教育经历"""
@@ -414,7 +345,8 @@ class ResumeAnalyzer:
             return {
                 'education_level': '未知',
                 'is_cs_related': False,
-                'top_university': False
+                'top_university': False,
+                'university_tier': '未知'
             }
         
         # 获取最高学历
@@ -438,9 +370,7 @@ class ResumeAnalyzer:
                             highest_degree = '高中'
         
         # 判断是否计算机相关专业
-        cs_related_keywords = ['计算机', '软件', '信息', '通信', '电子', '自动化', '人工智能', '数据', '网络',
-                              'computer', 'software', 'information', 'communication', 'electronic', 
-                              'automation', 'artificial intelligence', 'data', 'network']
+        cs_related_keywords = self.knowledge_base.cs_related_keywords
         is_cs_related = False
         for edu in education:
             major = edu.get('major', '').lower()
@@ -448,18 +378,27 @@ class ResumeAnalyzer:
                 is_cs_related = True
                 break
         
-        # 判断是否知名大学
+        # 判断是否知名大学：院校词典一次扫描，层级在top_university_tiers中（未配置时为任意层级）即为知名
+        universities = self.knowledge_base.universities
+        top_tiers = self.knowledge_base.top_university_tiers
         top_university = False
+        university_tier = '未知'
         for edu in education:
-            school = edu.get('school', '').lower()
-            if any(univ.lower() in school for univ in self.top_universities):
-                top_university = True
+            university = universities.find(edu.get('school', ''))
+            if university is None:
+                continue
+            tier = university['tier'] or '未知'
+            if not top_tiers or university['tier'] in top_tiers:
+                top_university, university_tier = True, tier
                 break
+            if university_tier == '未知':
+                university_tier = tier
         
         return {
             'education_level': highest_degree,
             'is_cs_related': is_cs_related,
-            'top_university': top_university
+            'top_university': top_university,
+            'university_tier': university_tier
         }
     
     def extract_experience(self, text: str) -> List[Dict[str, Any]]:
@@ -467,31 +406,7 @@ class ResumeAnalyzer:
         if not text:
             return []
         
-        experience = []
-        
-        # 提取公司名称
-        company_pattern = r'([\u4e00-\u9fa5a-zA-Z]+公司|[\u4e00-\u9fa5a-zA-Z]+集团|[\u4e00-\u9fa5a-zA-Z]+有限|[\w\s]+\s+inc|[\w\s]+\s+corporation|[\w\s]+\s+ltd|[\w\s]+\s+limited|[\w\s]+\s+co)'
-        companies = re.findall(company_pattern, text, re.IGNORECASE)
-        
-        # 提取职位
-        position_pattern = r'(工程师|开发|架构|设计|测试|运维|产品|项目|经理|主管|总监|专员|助理|顾问|分析师|工程师|研究员|实习|engineer|developer|architect|designer|tester|operations|product|project|manager|supervisor|director|specialist|assistant|consultant|analyst|engineer|researcher|intern)'
-        positions = re.findall(position_pattern, text, re.IGNORECASE)
-        
-        # 提取日期
-        date_pattern = r'(\d{4}[-/年]\d{1,2}[-/月]|\d{4}[-/年]|\d{4})'
-        dates = re.findall(date_pattern, text)
-        
-        # 组合结果
-        for i in range(min(len(companies), len(positions) if positions else 1)):
-            exp = {
-                'company': companies[i] if i < len(companies) else '',
-                'position': positions[i] if i < len(positions) else '',
-                'start_date': dates[i*2] if i*2 < len(dates) else '',
-                'end_date': dates[i*2+1] if i*2+1 < len(dates) else ''
-            }
-            experience.append(exp)
-        
-        return experience
+        return _scan_entries(text, _experience_scanner(self.knowledge_base), 'company', ('company', 'position'))
     
     def analyze_experience(self, experience: List[Dict[str, Any]]) -> Dict[str, Any]:
         """分析工作经验"""
@@ -499,6 +414,7 @@ class ResumeAnalyzer:
             return {
                 'years': 0,
                 'company_tier': '未知',
+                'employer_tier': '未知',
                 'position_level': '初级',
                 'has_management_experience': False
             }
@@ -513,44 +429,40 @@ class ResumeAnalyzer:
                 start_year = int(re.search(r'\d{4}', start_date).group(0))
                 end_year = 0
                 
-                if end_date:
-                    end_match = re.search(r'\d{4}', end_date)
-                    if end_match:
-                        end_year = int(end_match.group(0))
+                end_match = re.search(r'\d{4}', end_date)
+                if end_match:
+                    end_year = int(end_match.group(0))
                 else:
-                    # 如果没有结束日期，假设工作至今
-                    import datetime
+                    # 没有结束日期或结束日期为"至今"等，假设工作至今
                     end_year = datetime.datetime.now().year
                 
                 if end_year > start_year:
                     years += (end_year - start_year)
         
-        # 判断公司层级
-        top_companies = ['阿里', '腾讯', '百度', '华为', '字节', '美团', '京东', '滴滴', '小米', '网易',
-                        'alibaba', 'tencent', 'baidu', 'huawei', 'bytedance', 'meituan', 'jd', 'didi', 'xiaomi', 'netease',
-                        'google', 'microsoft', 'amazon', 'apple', 'facebook', 'meta', 'netflix', 'tesla', 'uber', 'airbnb']
+        # 判断公司层级：公司词典一次扫描
+        companies = self.knowledge_base.companies
         
         company_tier = '普通'
+        employer_tier = '未知'
         for exp in experience:
-            company = exp.get('company', '').lower()
-            if any(top_company in company for top_company in top_companies):
+            employer = companies.find(exp.get('company', ''))
+            if employer is not None:
                 company_tier = '知名'
+                employer_tier = employer['tier'] or '未知'
                 break
         
         # 判断职位级别
         position_level = '初级'
-        management_keywords = ['经理', '主管', '总监', '负责人', '管理', 'manager', 'supervisor', 'director', 'lead', 'management']
-        senior_keywords = ['高级', '资深', '专家', 'senior', 'expert', 'staff', 'principal']
         
         has_management_experience = False
         for exp in experience:
             position = exp.get('position', '').lower()
             
-            if any(keyword in position for keyword in management_keywords):
+            if any(keyword in position for keyword in MANAGEMENT_KEYWORDS):
                 position_level = '管理'
                 has_management_experience = True
                 break
-            elif any(keyword in position for keyword in senior_keywords):
+            elif any(keyword in position for keyword in SENIOR_KEYWORDS):
                 position_level = '高级'
         
         # 如果工作年限大于5年但职位级别仍为初级，则调整为中级
@@ -563,6 +475,7 @@ class ResumeAnalyzer:
         return {
             'years': years,
             'company_tier': company_tier,
+            'employer_tier': employer_tier,
             'position_level': position_level,
             'has_management_experience': has_management_experience
         }
@@ -578,23 +491,18 @@ class ResumeAnalyzer:
                 'direction_confidence': 'low'
             }
         
-        # 计算每个职业方向的匹配分数
-        direction_scores = {}
-        for direction_key, direction_info in self.career_directions.items():
-            direction_skills = direction_info['skills']
-            matched_skills = [skill for skill in skills if skill in direction_skills]
-            score = len(matched_skills) / len(direction_skills) * 100 if direction_skills else 0
-            direction_scores[direction_key] = score
+        # 技能计数向量与职业方向×技能关联矩阵相乘得到各方向的分数，再选出分数最高的两个方向（同分时按知识库顺序）
+        knowledge_base = self.knowledge_base
+        scores = knowledge_base.direction_scores(knowledge_base.direction_matches(skills))
         
-        # 按分数排序
-        sorted_directions = sorted(direction_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        # 获取主要和次要方向
-        primary_direction = self.career_directions[sorted_directions[0][0]]['name'] if sorted_directions else '未知'
-        primary_score = sorted_directions[0][1] if sorted_directions else 0
-        
-        secondary_direction = self.career_directions[sorted_directions[1][0]]['name'] if len(sorted_directions) > 1 else '未知'
-        secondary_score = sorted_directions[1][1] if len(sorted_directions) > 1 else 0
+        primary_direction, primary_score = '未知', 0
+        secondary_direction, secondary_score = '未知', 0
+        if len(scores) > 1:
+            primary, secondary = top_two(scores)
+            primary_direction, primary_score = knowledge_base.direction_names[primary], float(scores[primary])
+            secondary_direction, secondary_score = knowledge_base.direction_names[secondary], float(scores[secondary])
+        elif len(scores) == 1:
+            primary_direction, primary_score = knowledge_base.direction_names[0], float(scores[0])
         
         # 确定方向确定性
         direction_confidence = 'low'
@@ -699,7 +607,10 @@ class ResumeAnalyzer:
         }
     
     def analyze_resume(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
-        """分析简历"""
+        """分析简历，结果中的kb_version为分析时使用的知识库版本"""
+        if self._knowledge_base is None:
+            return self.snapshot().analyze_resume(resume_data)
+        
         # 提取技能
         skills = resume_data.get('skills', [])
         
@@ -739,10 +650,11 @@ class ResumeAnalyzer:
             'education_analysis': education_analysis,
             'experience_analysis': experience_analysis,
             'career_direction': career_direction,
-            'overall_score': overall_score
+            'overall_score': overall_score,
+            'kb_version': self.kb_version
         }
 
-def parse_resume_enhanced(file_path: str) -> Dict[str, Any]:
+def parse_resume_enhanced(file_path: str, analyzer: Optional[ResumeAnalyzer] = None) -> Dict[str, Any]:
     """增强版简历解析函数"""
     # 检查文件是否存在
     if not os.path.exists(file_path):
@@ -753,54 +665,59 @@ def parse_resume_enhanced(file_path: str) -> Dict[str, Any]:
             'skills': []
         }
     
-    # 读取文件内容
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # 按格式提取文件内容，PDF和DOCX在独立的工作进程中提取
+    try:
+        content = extract_resume_text(file_path)
+    except ExtractionError as e:
+        return {
+            'personal_info': {'name': '未知', 'summary': f'解析失败: {e}'},
+            'education': [],
+            'experience': [],
+            'skills': []
+        }
+    
+    return parse_resume_text(content, analyzer)
+
+_NAME_PATTERN = re.compile(r'^([\u4e00-\u9fa5a-zA-Z]+)')
+_PHONE_PATTERN = re.compile(r'电话[：:]\s*(\d{11}|\d{3}[-\s]\d{4}[-\s]\d{4})')
+_EMAIL_PATTERN = re.compile(r'邮箱[：:]\s*([\w.-]+@[\w.-]+\.\w+)')
+_LOCATION_PATTERN = re.compile(r'([\u4e00-\u9fa5]+市[\u4e00-\u9fa5]+区|[\u4e00-\u9fa5]+市|[\u4e00-\u9fa5]+省[\u4e00-\u9fa5]+市)')
+
+def parse_resume_text(content: str, analyzer: Optional[ResumeAnalyzer] = None) -> Dict[str, Any]:
+    """从简历文本解析简历，analyzer为None时新建分析器"""
+    # 创建简历分析器，整个解析过程使用同一版本的知识库
+    analyzer = (analyzer or ResumeAnalyzer()).snapshot()
     
-    # 创建简历分析器
-    analyzer = ResumeAnalyzer()
+    # 一次扫描划分分节，之后每个提取器只处理自己的分节
+    sections = segment_resume(content)
     
     # 提取个人信息
-    name_pattern = r'^([\u4e00-\u9fa5a-zA-Z]+)'
-    name_match = re.search(name_pattern, content)
+    name_match = _NAME_PATTERN.search(content)
     name = name_match.group(1) if name_match else '未知'
     
-    # 提取联系方式
-    phone_pattern = r'电话[：:]\s*(\d{11}|\d{3}[-\s]\d{4}[-\s]\d{4})'
-    phone_match = re.search(phone_pattern, content)
+    # 联系方式和地点只在标题区和联系方式分节中查找
+    contact_text = section_text(content, sections, HEADER_SECTION, 'contact')
+    phone_match = _PHONE_PATTERN.search(contact_text)
     phone = phone_match.group(1) if phone_match else '未知'
     
-    email_pattern = r'邮箱[：:]\s*([\w.-]+@[\w.-]+\.\w+)'
-    email_match = re.search(email_pattern, content)
+    email_match = _EMAIL_PATTERN.search(contact_text)
     email = email_match.group(1) if email_match else '未知'
     
-    # 提取地点
-    location_pattern = r'([\u4e00-\u9fa5]+市[\u4e00-\u9fa5]+区|[\u4e00-\u9fa5]+市|[\u4e00-\u9fa5]+省[\u4e00-\u9fa5]+市)'
-    location_match = re.search(location_pattern, content)
+    location_match = _LOCATION_PATTERN.search(contact_text)
     location = location_match.group(1) if location_match else '未知'
     
     # 提取个人简介
-    summary_pattern = r'个人简介[：:]\s*(.*?)(?=\n\n|\n教育|\n工作|\n技能|$)'
-    summary_match = re.search(summary_pattern, content, re.DOTALL)
-    summary = summary_match.group(1).strip() if summary_match else ''
+    summary = section_text(content, sections, 'summary').strip()
     
     # 提取教育经历
-    education_pattern = r'教育经[历验].*?(?=\n\n|\n工作|\n技能|$)'
-    education_match = re.search(education_pattern, content, re.DOTALL)
-    education_text = education_match.group(0) if education_match else ''
-    education = analyzer.extract_education(education_text)
+    education = analyzer.extract_education(section_text(content, sections, 'education'))
     
     # 提取工作经验
-    experience_pattern = r'工作经[历验].*?(?=\n\n|\n教育|\n技能|$)'
-    experience_match = re.search(experience_pattern, content, re.DOTALL)
-    experience_text = experience_match.group(0) if experience_match else ''
-    experience = analyzer.extract_experience(experience_text)
+    experience = analyzer.extract_experience(section_text(content, sections, 'experience'))
     
-    # 提取技能
-    skills_pattern = r'技能.*?(?=\n\n|\n教育|\n工作|$)'
-    skills_match = re.search(skills_pattern, content, re.DOTALL)
-    skills_text = skills_match.group(0) if skills_match else ''
-    skills = analyzer.extract_skills(content)
+    # 提取技能，没有技能分节时退回到全文
+    skills_text = section_text(content, sections, 'skills') if 'skills' in sections else content
+    skills = analyzer.extract_skills(skills_text)
     
     # 构建简历数据
     resume_data = {
@@ -818,16 +735,19 @@ def parse_resume_enhanced(file_path: str) -> Dict[str, Any]:
     
     return resume_data
 
-def match_resume_to_jobs_enhanced(resume_data: Dict[str, Any], jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """增强版简历与职位匹配函数"""
+def match_resume_to_jobs_enhanced(resume_data: Dict[str, Any], jobs: List[Dict[str, Any]],
+                                  analyzer: Optional[ResumeAnalyzer] = None,
+                                  resume_analysis: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """增强版简历与职位匹配函数，analyzer为None时新建分析器，传入resume_analysis时不再重新分析简历"""
     if not resume_data or not jobs:
         return []
     
     # 创建简历分析器
-    analyzer = ResumeAnalyzer()
+    analyzer = analyzer or ResumeAnalyzer()
     
     # 分析简历
-    resume_analysis = analyzer.analyze_resume(resume_data)
+    if resume_analysis is None:
+        resume_analysis = analyzer.analyze_resume(resume_data)
     
     # 获取简历技能
     resume_skills = set(resume_data.get('skills', []))
@@ -846,6 +766,9 @@ def match_resume_to_jobs_enhanced(resume_data: Dict[str, Any], jobs: List[Dict[s
     career_direction = resume_analysis.get('career_direction', {})
     resume_primary_direction = career_direction.get('primary_direction', '未知')
     
+    # 主要职业方向的小写关键词，所有职位共用
+    direction_keywords = analyzer.knowledge_base.direction_keywords.get(resume_primary_direction, ())
+    
     # 匹配结果
     match_results = []
     
@@ -897,13 +820,8 @@ def match_resume_to_jobs_enhanced(resume_data: Dict[str, Any], jobs: List[Dict[s
         job_title = job.get('title', '').lower()
         direction_match = 0
         
-        for direction_key, direction_info in analyzer.career_directions.items():
-            direction_name = direction_info['name']
-            if direction_name == resume_primary_direction:
-                direction_keywords = [keyword.lower() for keyword in direction_info['skills']]
-                if any(keyword in job_title for keyword in direction_keywords):
-                    direction_match = 100
-                    break
+        if any(keyword in job_title for keyword in direction_keywords):
+            direction_match = 100
         
         if direction_match == 0:
             # 如果没有直接匹配，使用技能相似度作为方向匹配度
@@ -949,4 +867,5 @@ def match_resume_to_jobs_enhanced(resume_data: Dict[str, Any], jobs: List[Dict[s
     return match_results
 
 # 导出函数
-__all__ = ['ResumeAnalyzer', 'parse_resume_enhanced', 'match_resume_to_jobs_enhanced']
+__all__ = ['ResumeAnalyzer', 'parse_resume_enhanced', 'parse_resume_text', 'match_resume_to_jobs_enhanced',
+           'segment_resume', 'section_text', 'SECTION_HEADERS', 'PARSER_VERSION', 'MANAGEMENT_KEYWORDS', 'SENIOR_KEYWORDS']
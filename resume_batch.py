@@ -0,0 +1,280 @@
+"""
+AI简历职位匹配系统 - 批量简历分析模块
+把大量已解析的简历一次分析为pandas DataFrame，每份简历一行，用于人群统计分析。
+技能和类别通过(简历, 技能)下标数组和np.bincount整批计数，职业方向分数为一次稀疏矩阵乘法；教育和工作经历展开为长表，
+用pandas字符串向量运算匹配关键词，再按简历行号聚合；院校和公司按不同取值查询名称词典，评分和级别用np.select计算。
+结果与逐份调用ResumeAnalyzer.analyze_resume一致
+"""
+import re
+import datetime
+from typing import Dict, Any, List, Optional, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from resume_analyzer import ResumeAnalyzer, MANAGEMENT_KEYWORDS, SENIOR_KEYWORDS
+from knowledge_base import top_two
+
+# 学历等级对应的名称，与ResumeAnalyzer.analyze_education一致
+EDUCATION_LEVEL_NAMES = {5: '博士', 4: '硕士', 3: '本科', 2: '大专', 1: '高中', 0: '未知'}
+
+_YEAR_PATTERN = re.compile(r'\d{4}')
+
+
+def _keyword_pattern(keywords: Iterable[str]) -> Optional[str]:
+    """把关键词编译为子串匹配的正则，没有关键词时返回None"""
+    keywords = [re.escape(keyword) for keyword in keywords]
+    return '|'.join(sorted(keywords, key=len, reverse=True)) if keywords else None
+
+
+def _contains(values: pd.Series, pattern: Optional[str]) -> np.ndarray:
+    """按不同取值小写后做子串匹配，再映射回每一行"""
+    if pattern is None or values.empty:
+        return np.zeros(len(values), dtype=bool)
+    codes, uniques = pd.factorize(values)
+    compiled = re.compile(pattern)
+    return np.array([compiled.search(value.lower()) is not None for value in uniques], dtype=bool)[codes]
+
+
+def _years(values: pd.Series) -> np.ndarray:
+    """按不同取值提取日期中的第一个四位年份，没有年份时为NaN"""
+    codes, uniques = pd.factorize(values)
+    years = np.full(len(uniques), np.nan)
+    for position, value in enumerate(uniques):
+        match = _YEAR_PATTERN.search(value)
+        if match:
+            years[position] = int(match.group(0))
+    return years[codes]
+
+
+def _explode(resumes: List[Dict[str, Any]], key: str, fields: Iterable[str]) -> pd.DataFrame:
+    """把每份简历的教育或工作经历列表展开为长表，row列为简历行号"""
+    rows = [row for row, resume in enumerate(resumes) for _ in resume.get(key) or ()]
+    entries = [entry for resume in resumes for entry in resume.get(key) or ()]
+    frame = pd.DataFrame({field: [entry.get(field) or '' for entry in entries] for field in fields}, dtype=object)
+    frame.insert(0, 'row', np.asarray(rows, dtype=np.int64))
+    return frame
+
+
+def _first_per_row(rows: np.ndarray, values: np.ndarray, mask: np.ndarray, count: int, default: Any) -> np.ndarray:
+    """每份简历中满足mask的第一个值，长表按简历和条目顺序排列"""
+    result = np.full(count, default, dtype=object)
+    selected_rows = rows[mask]
+    if selected_rows.size:
+        unique_rows, first = np.unique(selected_rows, return_index=True)
+        result[unique_rows] = values[mask][first]
+    return result
+
+
+def _any_per_row(rows: np.ndarray, mask: np.ndarray, count: int) -> np.ndarray:
+    return np.bincount(rows[mask], minlength=count) > 0
+
+
+def _lookup_tiers(values: pd.Series, gazetteer) -> tuple:
+    """按不同取值查询名称词典，返回(是否命中, 层级)数组"""
+    if values.empty:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=object)
+    found = {value: gazetteer.find(value) for value in pd.unique(values)}
+    entries = values.map(found)
+    matched = entries.notna().to_numpy(dtype=bool)
+    tiers = entries.map(lambda entry: (entry['tier'] or '未知') if entry is not None else None).to_numpy(dtype=object)
+    return matched, tiers
+
+
+def _rank_directions(knowledge_base, scores: np.ndarray, has_skills: np.ndarray) -> Dict[str, np.ndarray]:
+    """按行选出主要和次要职业方向，没有技能或方向不足两个时用'未知'和0补齐"""
+    count = len(scores)
+    # 补两列负无穷参与选择，方向不足两个时选中补齐列
+    primary, secondary = top_two(np.hstack([scores, np.full((count, 2), -np.inf)]))
+    values = np.hstack([scores, np.zeros((count, 2))])
+    names = np.array(list(knowledge_base.direction_names) + ['未知', '未知'], dtype=object)
+    rows = np.arange(count)
+    primary_score = np.where(has_skills, values[rows, primary], 0)
+    return {
+        'primary_direction': np.where(has_skills, names[primary], '未知'),
+        'primary_score': primary_score,
+        'secondary_direction': np.where(has_skills, names[secondary], '未知'),
+        'secondary_score': np.where(has_skills, values[rows, secondary], 0),
+        'direction_confidence': np.select([primary_score >= 70, primary_score >= 40], ['high', 'medium'], 'low'),
+    }
+
+
+def classify_directions(skill_lists: Sequence[Iterable[str]], analyzer: Optional[ResumeAnalyzer] = None,
+                        index: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+    """批量确定职业方向，例如在职位入库时按required_skills给整批职位分类
+
+    Args:
+        skill_lists: 每份简历或职位的技能列表
+        analyzer: 简历分析器，整批固定使用同一个知识库版本
+        index: DataFrame的行索引（如职位ID），默认为0开始的行号
+
+    Returns:
+        pd.DataFrame: 每行包含primary_direction、primary_score、secondary_direction、secondary_score和
+            direction_confidence，与determine_career_direction的结果一致
+    """
+    knowledge_base = (analyzer or ResumeAnalyzer()).snapshot().knowledge_base
+    skill_lists = [list(skills or ()) for skills in skill_lists]
+    scores = knowledge_base.direction_scores(knowledge_base.batch_direction_matches(skill_lists))
+    has_skills = np.array([bool(skills) for skills in skill_lists], dtype=bool)
+    frame = pd.DataFrame(_rank_directions(knowledge_base, scores, has_skills),
+                         index=pd.Index(list(index)) if index is not None else None)
+    frame.attrs['kb_version'] = knowledge_base.version
+    return frame
+
+
+def analyze_resumes(resumes: Iterable[Dict[str, Any]], analyzer: Optional[ResumeAnalyzer] = None,
+                    index: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+    """批量分析已解析的简历
+
+    Args:
+        resumes: parse_resume_text等函数返回的简历数据
+        analyzer: 简历分析器，整批固定使用同一个知识库版本
+        index: DataFrame的行索引（如简历ID），默认为0开始的行号
+
+    Returns:
+        pd.DataFrame: 每份简历一行，包含技能、类别计数（category_前缀）、职业方向分数（direction_前缀）、
+            教育、经验和综合评分各列，与analyze_resume结果中的同名字段一致
+    """
+    analyzer = (analyzer or ResumeAnalyzer()).snapshot()
+    knowledge_base = analyzer.knowledge_base
+    resumes = list(resumes)
+    count = len(resumes)
+
+    # 技能：(简历, 技能)下标数组，技能编号在整批内分配
+    skill_ids = {}
+    skill_rows = []
+    skill_cols = []
+    for row, resume in enumerate(resumes):
+        for skill in resume.get('skills') or ():
+            skill_rows.append(row)
+            skill_cols.append(skill_ids.setdefault(skill, len(skill_ids)))
+    skill_rows = np.asarray(skill_rows, dtype=np.int64)
+    skill_cols = np.asarray(skill_cols, dtype=np.int64)
+    skills = list(skill_ids)
+
+    skill_count = np.bincount(skill_rows, minlength=count)
+    skill_level = np.select([skill_count >= 15, skill_count >= 8], ['高级', '中级'], '初级')
+
+    def incidence_counts(groups: List[Any], members: Mapping[Any, Iterable[Any]]) -> np.ndarray:
+        """每份简历落在各组中的技能数：技能到组的对应关系展开后用bincount计数"""
+        group_ids = {group: position for position, group in enumerate(groups)}
+        pair_skills = []
+        pair_groups = []
+        for skill_id, skill in enumerate(skills):
+            for group in members.get(skill, ()):
+                pair_skills.append(skill_id)
+                pair_groups.append(group_ids[group])
+        counts = np.zeros((count, len(groups)), dtype=np.int64)
+        if not pair_skills or not skill_cols.size:
+            return counts
+        # 每个技能对应的组以CSR形式保存，按技能出现次数重复后得到(简历, 组)对
+        order = np.argsort(pair_skills, kind='stable')
+        pair_skills = np.asarray(pair_skills)[order]
+        pair_groups = np.asarray(pair_groups)[order]
+        offsets = np.searchsorted(pair_skills, np.arange(len(skills) + 1))
+        lengths = np.diff(offsets)[skill_cols]
+        rows = np.repeat(skill_rows, lengths)
+        starts = np.repeat(offsets[skill_cols], lengths)
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        flat = rows * len(groups) + pair_groups[starts + within]
+        return np.bincount(flat, minlength=count * len(groups)).reshape(count, len(groups))
+
+    # 技能类别
+    categories = list(knowledge_base.skill_categories)
+    category_counts = incidence_counts(categories, knowledge_base.skill_to_categories)
+
+    # 职业方向：(简历, 技能)稀疏矩阵与方向×技能关联矩阵相乘，再按行选出前两个方向
+    skill_lists = [resume.get('skills') or () for resume in resumes]
+    direction_scores = knowledge_base.direction_scores(knowledge_base.batch_direction_matches(skill_lists))
+    directions = _rank_directions(knowledge_base, direction_scores, skill_count > 0)
+
+    # 教育经历
+    education = _explode(resumes, 'education', ('school', 'degree', 'major'))
+    education_rows = education['row'].to_numpy()
+    degree_levels = np.zeros(len(education), dtype=np.int64)
+    for level in sorted(set(knowledge_base.education_levels.values())):
+        names = [name for name, value in knowledge_base.education_levels.items() if value == level]
+        degree_levels[_contains(education['degree'], _keyword_pattern(names))] = level
+    highest_level = np.zeros(count, dtype=np.int64)
+    np.maximum.at(highest_level, education_rows, degree_levels)
+    education_level = pd.Series(highest_level).map(EDUCATION_LEVEL_NAMES).fillna('高中').to_numpy(dtype=object)
+
+    is_cs_related = _any_per_row(education_rows, _contains(education['major'],
+                                 _keyword_pattern(knowledge_base.cs_related_keywords)), count)
+
+    university_matched, university_tiers = _lookup_tiers(education['school'], knowledge_base.universities)
+    top_tiers = knowledge_base.top_university_tiers
+    university_top = university_matched & (np.isin(university_tiers, list(top_tiers)) if top_tiers else True)
+    top_university = _any_per_row(education_rows, university_top, count)
+    university_tier = np.where(
+        top_university,
+        _first_per_row(education_rows, university_tiers, university_top, count, '未知'),
+        _first_per_row(education_rows, university_tiers, university_matched, count, '未知'))
+
+    # 工作经验：起止年份取日期中的第一个四位数字，结束日期没有年份（为空或"至今"等）时视为至今
+    experience = _explode(resumes, 'experience', ('company', 'position', 'start_date', 'end_date'))
+    experience_rows = experience['row'].to_numpy()
+    start_year = _years(experience['start_date'])
+    end_year = _years(experience['end_date'])
+    end_year = np.where(np.isnan(end_year), datetime.datetime.now().year, end_year)
+    spans = np.where(~np.isnan(start_year) & (end_year > start_year), end_year - start_year, 0)
+    years = np.bincount(experience_rows, weights=spans, minlength=count).astype(np.int64)
+
+    company_matched, company_tiers = _lookup_tiers(experience['company'], knowledge_base.companies)
+    company_tier = np.where(_any_per_row(experience_rows, company_matched, count), '知名', '普通')
+    employer_tier = _first_per_row(experience_rows, company_tiers, company_matched, count, '未知')
+
+    positions = experience['position']
+    has_management = _any_per_row(experience_rows, _contains(positions, _keyword_pattern(MANAGEMENT_KEYWORDS)), count)
+    has_senior = _any_per_row(experience_rows, _contains(positions, _keyword_pattern(SENIOR_KEYWORDS)), count)
+    position_level = np.select([has_management, has_senior, years >= 5], ['管理', '高级', '中级'], '初级')
+
+    has_experience = np.bincount(experience_rows, minlength=count) > 0
+    company_tier = np.where(has_experience, company_tier, '未知')
+
+    # 综合评分，规则与ResumeAnalyzer.calculate_overall_score一致
+    skill_score = np.select([skill_count >= 15, skill_count >= 10, skill_count >= 5, skill_count > 0],
+                            [100, 80, 60, 40], 0)
+    education_score = np.select([highest_level == 5, highest_level == 4, highest_level == 3, highest_level == 2],
+                                [100, 80, 60, 40], 20)
+    education_score = np.minimum(100, education_score + 10 * is_cs_related + 10 * top_university)
+    experience_score = np.select([years >= 10, years >= 5, years >= 3, years >= 1], [100, 80, 60, 40], 20)
+    experience_score = experience_score + 10 * (company_tier == '知名')
+    experience_score = experience_score + np.select([position_level == '管理', position_level == '高级'], [20, 10], 0)
+    experience_score = np.minimum(100, experience_score)
+    overall_score = (skill_score * 0.4 + education_score * 0.3 + experience_score * 0.3).astype(np.int64)
+    level = np.select([overall_score >= 85, overall_score >= 70, overall_score >= 50], ['专家', '高级', '中级'], '初级')
+
+    columns = {
+        'name': [(resume.get('personal_info') or {}).get('name', '未知') for resume in resumes],
+        'skill_count': skill_count,
+        'skill_level': skill_level,
+    }
+    for position, category in enumerate(categories):
+        columns[f'category_{category}'] = category_counts[:, position]
+    for position, direction in enumerate(knowledge_base.direction_keys):
+        columns[f'direction_{direction}'] = direction_scores[:, position]
+    columns.update(directions)
+    columns.update({
+        'education_level': education_level,
+        'is_cs_related': is_cs_related,
+        'top_university': top_university,
+        'university_tier': university_tier,
+        'years': years,
+        'company_tier': company_tier,
+        'employer_tier': employer_tier,
+        'position_level': position_level,
+        'has_management_experience': has_management,
+        'skill_score': skill_score,
+        'education_score': education_score,
+        'experience_score': experience_score,
+        'overall_score': overall_score,
+        'level': level,
+    })
+    frame = pd.DataFrame(columns, index=pd.Index(list(index)) if index is not None else None)
+    frame.attrs['kb_version'] = analyzer.kb_version
+    return frame
+
+
+# 导出函数
+__all__ = ['analyze_resumes', 'classify_directions', 'EDUCATION_LEVEL_NAMES']
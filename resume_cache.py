@@ -0,0 +1,245 @@
+"""
+AI简历职位匹配系统 - 简历解析缓存模块
+按简历内容哈希缓存解析结果和分析结果：键由文件字节的SHA-256和解析器版本组成，
+同一份简历重复提交时跳过文本提取、解析和分析。每个条目记录简历的规范化词和其中出现的词典片段摘要，
+知识库更新后只有摘要变化（新增、删除或修改了简历中出现的别名）的简历重新解析，
+其余条目保留解析结果，仅用新知识库重新计算分析结果。进程内LRU层位于磁盘JSON文件层之前，
+磁盘层受字节预算约束，由后台清理线程淘汰
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple, Callable
+
+from cache_manager import LRUCache, DirectoryBudget, get_janitor, get_results_budget
+from resume_analyzer import ResumeAnalyzer, PARSER_VERSION, parse_resume_text
+from resume_extractors import extract_resume_text
+from knowledge_base import normalize_tokens
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过环境变量覆盖
+DEFAULT_RESUME_MEMORY_ENTRIES = int(os.environ.get("JOBMATCH_RESUME_CACHE_ENTRIES", 128))
+DEFAULT_RESUME_DISK_BUDGET = int(os.environ.get("JOBMATCH_RESUME_CACHE_BYTES", 20 * 1024 * 1024))
+DEFAULT_RESUME_TTL = 30 * 24 * 60 * 60  # 磁盘缓存过期时间（秒）
+
+
+class ResumeCache:
+    """简历解析和分析结果的两级缓存：内存LRU + 磁盘JSON文件"""
+
+    def __init__(self, cache_dir: str = "./cache/resumes", memory_entries: int = DEFAULT_RESUME_MEMORY_ENTRIES,
+                 disk_budget: int = DEFAULT_RESUME_DISK_BUDGET, ttl: float = DEFAULT_RESUME_TTL):
+        """初始化简历缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录
+            memory_entries: 内存层最多保存的简历数
+            disk_budget: 磁盘层字节预算
+            ttl: 磁盘缓存过期时间（秒）
+        """
+        self.cache_dir = cache_dir
+        # 内存层保存JSON字符串，每次读取得到新的字典，调用方修改结果不会污染缓存
+        self.memory = LRUCache(memory_entries)
+        self.budget = DirectoryBudget(cache_dir, disk_budget, ttl)
+
+    @staticmethod
+    def make_key(data: bytes, kind: str = "file") -> str:
+        """计算缓存键，知识库版本不计入键，由条目中的kb_version和kb_signature判断是否有效
+
+        Args:
+            data: 简历文件字节或文本的UTF-8编码
+            kind: file表示文件字节（需要提取文本），text表示纯文本
+
+        Returns:
+            str: 缓存键
+        """
+        digest = hashlib.sha256(f"{PARSER_VERSION}|{kind}|".encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，内存层未命中时读取磁盘层
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict[str, Any]]: 包含resume_data、resume_analysis、kb_version、kb_signature和tokens的条目，未命中时返回None
+        """
+        payload = self.memory.get(key)
+        if payload is not None:
+            return json.loads(payload)
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                payload = f.read()
+            entry = json.loads(payload)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取简历缓存失败: {key} - {str(e)}")
+            return None
+        self.memory.set(key, payload)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """写入缓存条目，磁盘文件先写临时文件再原子替换
+
+        Args:
+            key: 缓存键
+            entry: 缓存条目
+        """
+        payload = json.dumps(entry, ensure_ascii=False)
+        self.memory.set(key, payload)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入简历缓存失败: {key} - {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _revalidate(self, key: str, entry: Dict[str, Any], analyzer: ResumeAnalyzer) -> bool:
+        """条目由其他知识库版本生成时，检查简历中出现的词典片段是否变化
+
+        片段未变化时解析结果仍然有效，用当前知识库重新计算分析结果并写回缓存
+
+        Returns:
+            bool: 条目是否仍然有效
+        """
+        knowledge_base = analyzer.knowledge_base
+        tokens = entry.get('tokens')
+        if tokens is None or knowledge_base.alias_signature(tokens) != entry.get('kb_signature'):
+            logger.info(f"简历中出现的技能词典已变化，重新解析: {key[:12]}")
+            return False
+
+        entry['resume_analysis'] = analyzer.analyze_resume(entry['resume_data'])
+        entry['kb_version'] = analyzer.kb_version
+        self.put(key, entry)
+        return True
+
+    def _parse(self, key: str, analyzer: ResumeAnalyzer, read_text: Callable[[], str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        entry = self.get(key)
+        if entry is not None and (entry.get('kb_version') == analyzer.kb_version
+                                  or self._revalidate(key, entry, analyzer)):
+            return entry['resume_data'], entry['resume_analysis']
+
+        text = read_text()
+        tokens = normalize_tokens(text)
+        resume_data = parse_resume_text(text, analyzer)
+        resume_analysis = analyzer.analyze_resume(resume_data)
+        self.put(key, {
+            'resume_data': resume_data,
+            'resume_analysis': resume_analysis,
+            'kb_version': analyzer.kb_version,
+            'kb_signature': analyzer.knowledge_base.alias_signature(tokens),
+            'tokens': tokens
+        })
+        # 写入的是序列化副本，返回对象可以安全地交给调用方
+        return resume_data, resume_analysis
+
+    def parse_file(self, file_path: str, analyzer: ResumeAnalyzer) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """解析并分析简历文件，相同内容的简历直接返回缓存结果
+
+        Args:
+            file_path: 简历文件路径
+            analyzer: 简历分析器
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: (简历数据, 分析结果)
+
+        Raises:
+            OSError: 文件无法读取
+            ExtractionError: 提取简历文本失败，失败结果不会被缓存
+        """
+        # 固定知识库版本，有效性检查和解析使用同一个知识库
+        analyzer = analyzer.snapshot()
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # 扩展名决定提取方式，一并计入键
+        kind = "file" + os.path.splitext(file_path)[1].lower()
+        key = self.make_key(data, kind)
+        return self._parse(key, analyzer, lambda: extract_resume_text(file_path))
+
+    def parse_text(self, content: str, analyzer: ResumeAnalyzer) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """解析并分析简历文本，相同文本直接返回缓存结果
+
+        Args:
+            content: 简历文本
+            analyzer: 简历分析器
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: (简历数据, 分析结果)
+        """
+        analyzer = analyzer.snapshot()
+        key = self.make_key(content.encode('utf-8'), "text")
+        return self._parse(key, analyzer, lambda: content)
+
+    def cleanup(self) -> None:
+        """供后台线程调用的清理入口"""
+        removed = self.budget.enforce()
+        if removed:
+            logger.info(f"已清理{removed}个简历缓存文件")
+
+
+# 进程级共享实例
+_resume_caches = {}
+_registry_lock = threading.Lock()
+
+
+def get_resume_cache(cache_dir: str = "./cache/resumes") -> ResumeCache:
+    """获取缓存目录对应的进程级简历缓存
+
+    Args:
+        cache_dir: 磁盘缓存目录
+
+    Returns:
+        ResumeCache: 简历缓存
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    with _registry_lock:
+        cache = _resume_caches.get(cache_dir)
+        if cache is None:
+            cache = ResumeCache(cache_dir)
+            _resume_caches[cache_dir] = cache
+            get_janitor().register(cache.cleanup)
+    return cache
+
+
+def store_upload(data: bytes, file_name: str, upload_dir: str = "./cache/uploads") -> str:
+    """按内容哈希保存上传的简历文件
+
+    文件名由内容的SHA-256和原扩展名组成，多个会话上传同名的不同简历时互不覆盖，
+    相同内容只保存一份。目录受字节预算约束，由后台清理线程淘汰
+
+    Args:
+        data: 简历文件字节
+        file_name: 上传时的文件名，只使用其扩展名
+        upload_dir: 保存目录
+
+    Returns:
+        str: 保存后的文件路径
+    """
+    budget = get_results_budget(upload_dir)
+    ext = os.path.splitext(file_name)[1].lower()
+    path = os.path.join(budget.directory, hashlib.sha256(data).hexdigest() + ext)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+
+# 导出类和函数
+__all__ = ['ResumeCache', 'get_resume_cache', 'store_upload']
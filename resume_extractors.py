@@ -0,0 +1,360 @@
+"""
+AI简历职位匹配系统 - 简历文本提取模块
+按格式提取简历文本：PDF逐页提取，需要的简历分节全部读完后提前停止；DOCX流式解析document.xml；
+TXT自动识别UTF-8/GBK编码。PDF和DOCX在独立的工作进程中提取，每个文件有时间和内存上限，
+异常文件只会拖垮自己的工作进程，不会阻塞Streamlit的其他会话
+"""
+import os
+import re
+import zipfile
+import logging
+import threading
+import multiprocessing
+import xml.etree.ElementTree as ET
+from typing import List, Optional
+
+# PDF解析为可选依赖，优先使用pypdf，其次是PyPDF2
+try:
+    from pypdf import PdfReader
+    PDF_AVAILABLE = True
+except ImportError:
+    try:
+        from PyPDF2 import PdfReader
+        PDF_AVAILABLE = True
+    except ImportError:
+        PDF_AVAILABLE = False
+
+# 内存上限依赖resource模块，仅在类Unix系统上可用
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过环境变量覆盖
+DEFAULT_EXTRACT_WORKERS = int(os.environ.get("JOBMATCH_EXTRACT_WORKERS", 2))
+DEFAULT_EXTRACT_TIMEOUT = float(os.environ.get("JOBMATCH_EXTRACT_TIMEOUT", 20))
+DEFAULT_EXTRACT_MEMORY_MB = int(os.environ.get("JOBMATCH_EXTRACT_MEMORY_MB", 512))
+
+# 简历分节标题，只在行首识别；other中的分节不提取内容，只用于划定其他分节的边界
+SECTION_HEADERS = {
+    'summary': r'个人简介|自我介绍|个人总结',
+    'contact': r'联系方式|个人信息|基本信息',
+    'education': r'教育经[历验]|教育背景',
+    'experience': r'工作经[历验]|实习经[历验]',
+    'skills': r'(?:专业|核心|技术)?技能(?:特长|清单)?',
+    'other': r'项目经[历验]|自我评价|获奖(?:情况|经历)?|证书|语言能力|兴趣爱好',
+}
+# 所有标题合并为一个正则，一次扫描找出全部分节；标题前可有"一、"或"【"等编号，后须为冒号、空白或行尾
+SECTION_PATTERN = re.compile(
+    r'^[ \t]*(?:[一二三四五六七八九十]+[、.．]|\d+[、.．)]|[【\[])?[ \t]*(?:' +
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SECTION_HEADERS.items()) +
+    r')[】\]]?(?=[：:\s]|$)[ \t]*[：:]?',
+    re.MULTILINE
+)
+# PDF提前停止需要读完的分节：这些分节全部出现、且最后出现的分节之后又出现任一分节标题时停止
+WANTED_SECTIONS = frozenset({'education', 'experience', 'skills'})
+
+_WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(Exception):
+    """简历文本提取失败（格式不支持、超时或超出内存上限）"""
+
+
+def find_sections(text: str) -> List[str]:
+    """按出现顺序获取文本中行首分节标题对应的分节
+
+    Args:
+        text: 简历文本
+
+    Returns:
+        List[str]: 分节名称，同一分节出现多次时重复
+    """
+    return [match.lastgroup for match in SECTION_PATTERN.finditer(text)]
+
+
+def extract_pdf_text(path: str, max_pages: Optional[int] = None) -> str:
+    """逐页提取PDF文本，需要的分节全部出现、且最后一个分节之后出现下一个分节标题时提前停止
+
+    Args:
+        path: PDF文件路径
+        max_pages: 最多读取的页数
+
+    Returns:
+        str: 文本
+
+    Raises:
+        ExtractionError: PDF解析依赖不可用
+    """
+    if not PDF_AVAILABLE:
+        raise ExtractionError("读取PDF简历需要安装pypdf或PyPDF2")
+
+    reader = PdfReader(path)
+    pages = []
+    found = set()
+    for index, page in enumerate(reader.pages):
+        if max_pages is not None and index >= max_pages:
+            break
+        text = page.extract_text() or ''
+        pages.append(text)
+
+        # 各页以换行拼接，每页单独扫描与扫描拼接后的文本结果相同
+        for name in find_sections(text):
+            if found >= WANTED_SECTIONS:
+                # 最后一个需要的分节已被下一个标题结束
+                return "\n".join(pages)
+            if name in WANTED_SECTIONS:
+                found.add(name)
+    return "\n".join(pages)
+
+
+def extract_docx_text(path: str) -> str:
+    """流式解析DOCX的document.xml提取文本，不把整个文档树载入内存
+
+    Args:
+        path: DOCX文件路径
+
+    Returns:
+        str: 文本，每个段落一行
+
+    Raises:
+        ExtractionError: 文件不是有效的DOCX
+    """
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise ExtractionError(f"无效的DOCX文件: {e}")
+
+    paragraphs = []
+    current = []
+    with archive, archive.open('word/document.xml') as document:
+        for event, element in ET.iterparse(document, events=('end',)):
+            tag = element.tag
+            if tag == _WORD_NAMESPACE + 't':
+                current.append(element.text or '')
+            elif tag == _WORD_NAMESPACE + 'tab':
+                current.append('\t')
+            elif tag in (_WORD_NAMESPACE + 'br', _WORD_NAMESPACE + 'cr'):
+                current.append('\n')
+            elif tag == _WORD_NAMESPACE + 'p':
+                paragraphs.append(''.join(current))
+                current = []
+                # 段落处理完即释放，内存占用与文档长度无关
+                element.clear()
+    if current:
+        paragraphs.append(''.join(current))
+    return "\n".join(paragraphs)
+
+
+def extract_plain_text(path: str) -> str:
+    """读取文本简历，依次尝试UTF-8和GBK编码
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 文本
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    for encoding in ('utf-8-sig', 'gbk'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('utf-8', errors='replace')
+
+
+def extract_text(path: str) -> str:
+    """在当前进程中按扩展名提取简历文本
+
+    Args:
+        path: 简历文件路径
+
+    Returns:
+        str: 文本
+
+    Raises:
+        ExtractionError: 格式不支持或解析失败
+    """
+    lower = path.lower()
+    if lower.endswith('.pdf'):
+        return extract_pdf_text(path)
+    if lower.endswith('.docx'):
+        return extract_docx_text(path)
+    if lower.endswith('.doc'):
+        raise ExtractionError("不支持旧版Word格式(.doc)，请另存为.docx或PDF")
+    return extract_plain_text(path)
+
+
+def _worker_main(connection, memory_mb: int) -> None:
+    """提取工作进程：设置内存上限后循环处理父进程发来的文件路径"""
+    if RESOURCE_AVAILABLE and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            path = connection.recv()
+        except EOFError:
+            return
+        if path is None:
+            return
+        try:
+            connection.send(('ok', extract_text(path)))
+        except MemoryError:
+            connection.send(('error', "提取简历文本超出内存上限"))
+        except ExtractionError as e:
+            connection.send(('error', str(e)))
+        except Exception as e:
+            connection.send(('error', f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """一个可单独终止的提取工作进程"""
+
+    def __init__(self, context, memory_mb: int):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_connection, memory_mb), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class ExtractionPool:
+    """提取工作进程池，工作进程常驻复用，超时或崩溃的工作进程会被终止并替换"""
+
+    def __init__(self, workers: int = DEFAULT_EXTRACT_WORKERS, timeout: float = DEFAULT_EXTRACT_TIMEOUT,
+                 memory_mb: int = DEFAULT_EXTRACT_MEMORY_MB):
+        """初始化提取进程池，工作进程在首次使用时启动
+
+        Args:
+            workers: 工作进程数
+            timeout: 单个文件的提取时间上限（秒）
+            memory_mb: 每个工作进程的内存上限（MB），0表示不限制
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        # spawn启动的子进程不继承父进程的线程和锁，在多线程的Streamlit中更安全
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = []
+        self._started = 0
+        self._condition = threading.Condition()
+
+    def _acquire(self) -> _Worker:
+        with self._condition:
+            while not self._idle and self._started >= self.workers:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return _Worker(self._context, self.memory_mb)
+        except Exception:
+            with self._condition:
+                self._started -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker: Optional[_Worker]) -> None:
+        with self._condition:
+            if worker is None:
+                self._started -= 1
+            else:
+                self._idle.append(worker)
+            self._condition.notify()
+
+    def extract(self, path: str, timeout: Optional[float] = None) -> str:
+        """在工作进程中提取简历文本
+
+        Args:
+            path: 简历文件路径
+            timeout: 提取时间上限（秒），默认使用进程池配置
+
+        Returns:
+            str: 文本
+
+        Raises:
+            ExtractionError: 提取失败、超时或超出内存上限
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        try:
+            worker.connection.send(os.path.abspath(path))
+            if not worker.connection.poll(timeout):
+                raise TimeoutError
+            status, payload = worker.connection.recv()
+        except TimeoutError:
+            worker.kill()
+            self._release(None)
+            raise ExtractionError(f"提取简历文本超时（{timeout:.0f}秒）: {os.path.basename(path)}")
+        except (EOFError, OSError):
+            # 工作进程异常退出（例如被系统因内存不足终止）
+            worker.kill()
+            self._release(None)
+            raise ExtractionError(f"提取简历文本的工作进程异常退出: {os.path.basename(path)}")
+
+        self._release(worker)
+        if status != 'ok':
+            raise ExtractionError(payload)
+        return payload
+
+    def close(self) -> None:
+        """停止所有空闲的工作进程"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+        for worker in idle:
+            try:
+                worker.connection.send(None)
+            except OSError:
+                pass
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.kill()
+
+
+# 进程级共享实例
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """获取进程级提取进程池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+        return _pool
+
+
+def extract_resume_text(path: str, timeout: Optional[float] = None) -> str:
+    """提取简历文本：TXT在当前进程直接读取，PDF和DOCX交给提取进程池
+
+    Args:
+        path: 简历文件路径
+        timeout: 提取时间上限（秒）
+
+    Returns:
+        str: 文本
+
+    Raises:
+        ExtractionError: 提取失败、超时或超出内存上限
+    """
+    if path.lower().endswith(('.pdf', '.docx', '.doc')):
+        return get_extraction_pool().extract(path, timeout)
+    return extract_plain_text(path)
+
+
+# 导出类和函数
+__all__ = ['ExtractionError', 'ExtractionPool', 'extract_text', 'extract_pdf_text', 'extract_docx_text',
+           'extract_plain_text', 'extract_resume_text', 'get_extraction_pool', 'find_sections',
+           'SECTION_HEADERS', 'SECTION_PATTERN']
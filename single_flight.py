@@ -0,0 +1,142 @@
+"""
+AI简历职位匹配系统 - 单飞（single-flight）合并模块
+相同的并发请求只执行一次：同一进程内的线程等待同一个进行中的结果，
+不同工作进程之间通过文件锁串行化，后到的进程可以直接命中先到进程写入的缓存
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+# 文件锁仅在类Unix系统上可用，其他平台只做进程内合并
+try:
+    import fcntl
+    FILE_LOCK_AVAILABLE = True
+except ImportError:
+    FILE_LOCK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """按键合并并发调用"""
+
+    def __init__(self, lock_dir: str = "./cache/locks", timeout: float = 300.0):
+        """初始化单飞合并器
+
+        Args:
+            lock_dir: 跨进程文件锁所在目录，为空时只做进程内合并
+            timeout: 等待进行中的调用或文件锁的最长时间（秒），超时后自行执行
+        """
+        self.lock_dir = lock_dir
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """执行fn，同一键的并发调用共享同一次执行的结果
+
+        Args:
+            key: 合并键，相同键的调用视为相同请求
+            fn: 实际执行的函数
+
+        Returns:
+            Tuple[Any, bool]: (fn的结果, 是否共享了其他调用的结果)
+
+        Raises:
+            Exception: fn抛出的异常会传递给所有等待该结果的调用方
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            if call.done.wait(self.timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            logger.warning(f"等待进行中的请求超时，自行执行: {key}")
+            return fn(), False
+
+        try:
+            with self._file_lock(key):
+                call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self) -> Dict[str, int]:
+        """获取当前进行中的调用及其等待者数量"""
+        with self._lock:
+            return {key: call.waiters for key, call in self._calls.items()}
+
+    def _file_lock(self, key: str) -> '_FileLock':
+        if not self.lock_dir or not FILE_LOCK_AVAILABLE:
+            return _FileLock(None, self.timeout)
+        if not os.path.exists(self.lock_dir):
+            os.makedirs(self.lock_dir, exist_ok=True)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return _FileLock(os.path.join(self.lock_dir, f"{digest}.lock"), self.timeout)
+
+
+class _FileLock:
+    """基于fcntl.flock的跨进程排他锁，获取超时后不加锁继续执行"""
+
+    def __init__(self, path, timeout: float):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def __enter__(self) -> '_FileLock':
+        if self.path is None:
+            return self
+
+        self._file = open(self.path, 'a')
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except OSError:
+                if time.time() >= deadline:
+                    logger.warning(f"获取文件锁超时，不加锁继续执行: {self.path}")
+                    self._file.close()
+                    self._file = None
+                    return self
+                time.sleep(0.1)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._file is not None:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            finally:
+                self._file.close()
+                self._file = None
+
+
+# 导出类
+__all__ = ['SingleFlight', 'FILE_LOCK_AVAILABLE']
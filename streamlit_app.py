@@ -9,6 +9,8 @@ import os
 import json
 import random
 
+from job_ids import make_job_id
+
 # 配置页面
 st.set_page_config(
     page_title="AI简历职位匹配系统",
@@ -275,10 +277,11 @@ def search_jobs(keywords, location='', limit=10, platform="模拟数据"):
         description = f"{job_title}职位描述：我们正在寻找一位经验丰富的{job_title}加入我们的团队。"
         
         # 生成职位数据
+        company = random.choice(companies)
         job = {
-            'id': f"job_{i+1}",
+            'id': make_job_id(platform, "", keywords, location, job_title, company, i),
             'title': job_title,
-            'company': random.choice(companies),
+            'company': company,
             'location': location if location else random.choice(["北京", "上海", "深圳", "杭州", "广州"]),
             'description': description,
             'required_skills': required_skills,
@@ -13,6 +13,10 @@ import datetime
 
 # 导入集成模块
 from job_search_integration import JobSearchIntegration, get_enhanced_functions
+from cache_manager import get_results_budget
+from cache_codec import dump_results
+from knowledge_base import get_knowledge_base
+from resume_cache import store_upload
 
 # 配置页面
 st.set_page_config(
@@ -21,6 +25,44 @@ st.set_page_config(
     layout="wide"
 )
 
+# 匹配结果在所有会话间共享的缓存时间（秒）和条目数
+RESULTS_CACHE_TTL = 10 * 60
+RESULTS_CACHE_ENTRIES = 64
+
+#################################################
+# 跨会话共享的资源
+#################################################
+
+@st.cache_resource(show_spinner=False)
+def get_integration() -> JobSearchIntegration:
+    """获取所有会话共享的集成对象，知识库、职位缓存和MCP抓取器在进程内只初始化一次"""
+    get_knowledge_base()
+    return JobSearchIntegration()
+
+@st.cache_data(show_spinner=False, ttl=RESULTS_CACHE_TTL, max_entries=RESULTS_CACHE_ENTRIES)
+def process_resume(resume_bytes: bytes, file_ext: str, kb_version: str, keywords: str, location: str, limit: int) -> dict:
+    """处理简历并搜索职位，结果按简历内容、知识库版本和搜索参数在所有会话间缓存
+    
+    Args:
+        resume_bytes: 简历文件字节
+        file_ext: 简历文件扩展名
+        kb_version: 知识库版本，只参与缓存键，知识库热更新后旧结果不再命中
+        keywords: 职位关键词
+        location: 工作地点
+        limit: 结果数量
+    
+    Returns:
+        dict: 处理结果
+    """
+    # store_upload按文件名取扩展名，单独的".docx"会被当成没有扩展名的文件名
+    resume_file_path = store_upload(resume_bytes, "resume" + file_ext)
+    return get_integration().process_resume_and_search_jobs(
+        resume_file_path=resume_file_path,
+        keywords=keywords,
+        location=location,
+        limit=limit
+    )
+
 #################################################
 # 自定义CSS样式
 #################################################
@@ -548,29 +590,28 @@ def main():
         # 显示处理中提示
         with st.spinner("正在处理中..."):
             # 确定使用的简历文件
-            resume_file_path = None
+            resume_bytes = None
+            file_ext = ""
             if sidebar_inputs["uploaded_file"] is not None:
-                # 保存上传的文件
-                temp_file_path = os.path.join("./cache", sidebar_inputs["uploaded_file"].name)
-                with open(temp_file_path, "wb") as f:
-                    f.write(sidebar_inputs["uploaded_file"].getbuffer())
-                resume_file_path = temp_file_path
+                resume_bytes = sidebar_inputs["uploaded_file"].getvalue()
+                file_ext = os.path.splitext(sidebar_inputs["uploaded_file"].name)[1]
                 st.sidebar.success(f"已上传简历: {sidebar_inputs['uploaded_file'].name}")
             elif sidebar_inputs["use_example"]:
-                resume_file_path = example_resume_path
+                with open(example_resume_path, "rb") as f:
+                    resume_bytes = f.read()
+                file_ext = ".txt"
                 st.sidebar.info("使用示例简历")
             
-            if resume_file_path:
+            if resume_bytes is not None:
                 try:
-                    # 创建集成对象
-                    integration = JobSearchIntegration()
-                    
-                    # 处理简历并搜索职位
-                    results = integration.process_resume_and_search_jobs(
-                        resume_file_path=resume_file_path,
-                        keywords=sidebar_inputs["job_keywords"],
-                        location=sidebar_inputs["job_location"],
-                        limit=sidebar_inputs["job_limit"]
+                    # 处理简历并搜索职位，相同简历和搜索参数直接复用其他会话的结果
+                    results = process_resume(
+                        resume_bytes,
+                        file_ext,
+                        get_knowledge_base().version,
+                        sidebar_inputs["job_keywords"],
+                        sidebar_inputs["job_location"],
+                        sidebar_inputs["job_limit"]
                     )
                     
                     # 提取结果
@@ -597,18 +638,18 @@ def main():
                     
                     # 保存结果
                     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                    result_file = f"./cache/match_results_{timestamp}.json"
-                    with open(result_file, 'w', encoding='utf-8') as f:
-                        json.dump(results, f, ensure_ascii=False, indent=2)
+                    results_budget = get_results_budget("./cache/results")
+                    result_file = os.path.join(results_budget.directory, f"match_results_{timestamp}.jobz")
+                    dump_results(results, result_file)
+                    results_budget.enforce()
                     
-                    # 添加下载结果按钮
-                    with open(result_file, 'r', encoding='utf-8') as f:
-                        st.download_button(
-                            label="下载匹配结果",
-                            data=f,
-                            file_name=f"match_results_{timestamp}.json",
-                            mime="application/json",
-                        )
+                    # 添加下载结果按钮，下载内容仍为可读的JSON
+                    st.download_button(
+                        label="下载匹配结果",
+                        data=json.dumps(results, ensure_ascii=False, indent=2),
+                        file_name=f"match_results_{timestamp}.json",
+                        mime="application/json",
+                    )
                     
                 except Exception as e:
                     st.error(f"处理过程中出错: {str(e)}")
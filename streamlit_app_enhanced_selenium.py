@@ -6,6 +6,7 @@ import os
 import time
 import json
 import base64
+import hashlib
 import streamlit as st
 import pandas as pd
 import datetime
@@ -22,6 +23,14 @@ except ImportError:
         st.error("集成模块导入失败，某些功能可能不可用")
         INTEGRATION_AVAILABLE = False
 
+from cache_manager import LRUCache
+from knowledge_base import get_knowledge_base
+from resume_cache import store_upload
+
+# 匹配结果在所有会话间共享的缓存时间（秒）和条目数
+RESULTS_CACHE_TTL = 10 * 60
+RESULTS_CACHE_ENTRIES = 64
+
 # 配置页面
 st.set_page_config(
     page_title="AI简历职位匹配系统",
@@ -86,6 +95,28 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def get_integration():
+    """获取所有会话共享的集成对象，知识库、职位缓存和抓取器在进程内只初始化一次"""
+    get_knowledge_base()
+    return JobSearchIntegration()
+
+@st.cache_resource(show_spinner=False)
+def get_results_memo() -> LRUCache:
+    """获取所有会话共享的匹配结果缓存
+    
+    处理过程会边处理边向页面输出中间结果，不能放进st.cache_data，
+    因此在处理完成后按简历内容哈希、知识库版本和搜索参数写入这里，值为(写入时间, 结果JSON)。
+    抓取失败改用模拟数据的结果不写入
+    """
+    return LRUCache(RESULTS_CACHE_ENTRIES)
+
+def make_results_key(resume_bytes, keywords, location, limit, platform):
+    """由简历内容哈希、知识库版本和搜索参数组成结果缓存键，知识库热更新后旧结果不再命中"""
+    digest = hashlib.sha256(resume_bytes).hexdigest()
+    kb_version = get_knowledge_base().version
+    return json.dumps([digest, kb_version, keywords, location, limit, platform], ensure_ascii=False)
+
 # 创建数据目录
 data_dir = "data"
 if not os.path.exists(data_dir):
@@ -127,6 +158,63 @@ def get_binary_file_downloader_html(bin_file, file_label='File'):
     href = f'<a href="data:application/octet-stream;base64,{b64}" download="{os.path.basename(bin_file)}">{file_label}</a>'
     return href
 
+def format_data_age(meta):
+    """将搜索结果的元数据格式化为数据年龄说明"""
+    if not meta or meta.get('source') != 'cache':
+        return "实时抓取"
+    
+    age = int(meta.get('age_seconds', 0))
+    if age < 60:
+        text = "刚刚更新"
+    elif age < 3600:
+        text = f"{age // 60}分钟前更新"
+    elif age < 86400:
+        text = f"{age // 3600}小时前更新"
+    else:
+        text = f"{age // 86400}天前更新"
+    
+    if meta.get('refreshing'):
+        text += "，后台刷新中"
+    return text
+
+def render_pipeline_event(event, placeholders, jobs_by_id):
+    """在处理过程中逐步显示流水线事件
+    
+    Args:
+        event: 集成模块产生的事件
+        placeholders: 简历、职位和匹配三个占位区域
+        jobs_by_id: 已收到的职位，按职位ID索引
+    """
+    event_type = event.get('type')
+    
+    if event_type == 'resume_parsed':
+        personal_info = event['resume_data'].get('personal_info', {})
+        skills = event['resume_data'].get('skills', [])
+        placeholders['resume'].info(f"已解析简历：{personal_info.get('name', '未知')}，识别到{len(skills)}项技能")
+    elif event_type == 'analysis_ready':
+        summary = event['resume_analysis'].get('personal_summary', {})
+        placeholders['resume'].info(
+            f"简历分析完成：{summary.get('name', '未知')} · {summary.get('highest_education', '未知')} · "
+            f"{summary.get('years_of_experience', 0)}年经验 · 方向：{summary.get('career_direction', '未知')}"
+        )
+    elif event_type == 'jobs_batch':
+        for job in event['jobs']:
+            jobs_by_id[job.get('id')] = job
+        placeholders['jobs'].info(f"已获取{event['total']}个职位，继续搜索中...")
+    elif event_type == 'top_matches':
+        rows = []
+        for match in event['matches']:
+            job = jobs_by_id.get(match.get('job_id'), {})
+            rows.append({
+                '职位': job.get('title', '未知'),
+                '公司': job.get('company', '未知'),
+                '地点': job.get('location', '未知'),
+                '匹配度': match.get('match_score', 0)
+            })
+        with placeholders['matches'].container():
+            st.markdown(f"**当前最佳匹配**（已匹配{event['total']}个职位）")
+            st.table(pd.DataFrame(rows))
+
 def main():
     """主函数"""
     # 显示标题
@@ -141,15 +229,16 @@ def main():
         st.session_state.jobs = None
     if 'match_results' not in st.session_state:
         st.session_state.match_results = None
-    if 'integration' not in st.session_state:
-        if INTEGRATION_AVAILABLE:
-            try:
-                st.session_state.integration = JobSearchIntegration()
-            except Exception as e:
-                st.error(f"初始化集成模块失败: {str(e)}")
-                st.session_state.integration = None
-        else:
-            st.session_state.integration = None
+    if 'jobs_meta' not in st.session_state:
+        st.session_state.jobs_meta = None
+    
+    # 集成对象由所有会话共享
+    integration = None
+    if INTEGRATION_AVAILABLE:
+        try:
+            integration = get_integration()
+        except Exception as e:
+            st.error(f"初始化集成模块失败: {str(e)}")
     
     # 侧边栏
     with st.sidebar:
@@ -180,30 +269,52 @@ def main():
             resume_path = example_resume_path if use_example else None
             
             if resume_file is not None:
-                # 保存上传的文件
-                resume_path = os.path.join(data_dir, resume_file.name)
-                with open(resume_path, "wb") as f:
-                    f.write(resume_file.getbuffer())
+                # 按内容哈希保存上传的文件，不同会话上传同名文件时互不覆盖
+                resume_path = store_upload(resume_file.getvalue(), resume_file.name)
             
             if resume_path:
                 try:
                     # 如果集成模块可用，使用集成模块处理
-                    if INTEGRATION_AVAILABLE and st.session_state.integration:
-                        # 处理简历并搜索职位
-                        results = st.session_state.integration.process_resume_and_search_jobs(
-                            resume_path, keywords, location, limit, platform
-                        )
+                    if INTEGRATION_AVAILABLE and integration:
+                        with open(resume_path, "rb") as f:
+                            results_key = make_results_key(f.read(), keywords, location, limit, platform)
+                        results_memo = get_results_memo()
+                        cached = results_memo.get(results_key)
+                        
+                        if cached is not None and time.time() - cached[0] <= RESULTS_CACHE_TTL:
+                            # 相同简历和搜索参数直接复用其他会话的结果，每次解码得到新的字典
+                            results = json.loads(cached[1])
+                        else:
+                            # 处理简历并搜索职位，边处理边显示已完成的部分
+                            placeholders = {'resume': st.empty(), 'jobs': st.empty(), 'matches': st.empty()}
+                            jobs_by_id = {}
+                            results = {}
+                            for event in integration.iter_process_resume_and_search_jobs(
+                                resume_path, keywords, location, limit, platform
+                            ):
+                                if event['type'] == 'complete':
+                                    results = event['results']
+                                else:
+                                    render_pipeline_event(event, placeholders, jobs_by_id)
+                            
+                            # 完整结果在下方显示，清除中间结果
+                            for placeholder in placeholders.values():
+                                placeholder.empty()
+                            
+                            if results and results.get('jobs_meta', {}).get('source') != 'mock':
+                                results_memo.set(results_key, (time.time(), json.dumps(results, ensure_ascii=False)))
                         
                         # 更新会话状态
                         st.session_state.resume_data = results.get('resume_data')
                         st.session_state.resume_analysis = results.get('resume_analysis')
                         st.session_state.jobs = results.get('jobs')
+                        st.session_state.jobs_meta = results.get('jobs_meta')
                         st.session_state.match_results = results.get('match_results')
                         
                         # 保存结果
                         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                        result_file = f"match_results_{timestamp}.json"
-                        result_path = st.session_state.integration.save_results(results, result_file)
+                        result_file = f"match_results_{timestamp}.jobz"
+                        integration.save_results(results, result_file)
                     else:
                         # 如果集成模块不可用，显示错误信息
                         st.error("集成模块不可用，无法处理简历和搜索职位")
@@ -359,7 +470,7 @@ def main():
         if jobs[0].get('platform') == "模拟数据":
             st.markdown("**注意:** 当前显示的是模拟数据，因为无法连接到实际招聘网站或者所选平台暂不支持。")
         else:
-            st.markdown(f"**数据来源:** {jobs[0].get('platform', '未知')}")
+            st.markdown(f"**数据来源:** {jobs[0].get('platform', '未知')}（{format_data_age(st.session_state.jobs_meta)}）")
         st.markdown('</div>', unsafe_allow_html=True)
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""
+测试jobz缓存格式的编码、读取和原子写入
+"""
+import os
+import threading
+
+from cache_codec import (encode_jobz, write_jobz, read_jobz, is_jobz, JobzReader, dump_results, load_results,
+                         MAGIC)
+
+JOBS = [
+    {'id': 'a1', 'title': 'Python开发工程师', 'company': '腾讯', 'required_skills': ['Python', 'Django'],
+     'description': '负责后端开发\n熟悉Linux'},
+    {'id': 'b2', 'title': 'Data Engineer', 'company': 'Google', 'salary_range': '30K-50K'},
+    {'id': '', 'title': '没有id的职位'},
+]
+
+
+def test_encode_and_read_round_trip(tmp_path):
+    path = str(tmp_path / "jobs.jobz")
+    data = encode_jobz(JOBS, {'keywords': 'Python'})
+    assert data.startswith(MAGIC)
+    assert write_jobz(path, JOBS, {'keywords': 'Python'}) == len(data)
+
+    reader = JobzReader(path)
+    assert len(reader) == len(JOBS)
+    assert reader.ids() == ['a1', 'b2', '']
+    assert reader.meta == {'keywords': 'Python'}
+    assert reader.get('b2') == JOBS[1]
+    assert reader.get('') is None
+    assert reader.get('missing') is None
+    assert reader.read(2) == JOBS[2]
+    assert list(reader) == JOBS
+    assert read_jobz(path) == ({'keywords': 'Python'}, JOBS)
+
+
+def test_dump_and_load_results_for_both_codecs(tmp_path):
+    results = {'resume_data': {'skills': ['Python']}, 'jobs': JOBS, 'match_results': [{'job_id': 'a1'}]}
+    for name in ("results.jobz", "results.json"):
+        path = str(tmp_path / name)
+        dump_results(results, path)
+        assert is_jobz(path) == name.endswith('.jobz')
+        assert load_results(path) == results
+
+
+def test_concurrent_writes_to_the_same_path(tmp_path):
+    path = str(tmp_path / "shared.jobz")
+    errors = []
+
+    def write():
+        for _ in range(50):
+            try:
+                dump_results({'jobs': JOBS}, path)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert os.listdir(tmp_path) == ["shared.jobz"]
+    assert load_results(path) == {'jobs': JOBS}
@@ -0,0 +1,63 @@
+"""
+测试名称词典的词边界和知识库的别名摘要
+"""
+import copy
+import json
+
+import pytest
+
+from gazetteer import Gazetteer
+from knowledge_base import KnowledgeBase, DEFAULT_KB_PATH, normalize_tokens
+
+
+@pytest.fixture(scope="module")
+def kb_data():
+    with open(DEFAULT_KB_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _names(gazetteer, text):
+    return [entry['name'] for entry, _, _ in gazetteer.finditer(text)]
+
+
+def test_gazetteer_english_names_need_word_boundaries():
+    gazetteer = Gazetteer([{'name': 'Meta', 'aliases': ['facebook']}, 'Go', 'Apple', 'Apple Music'])
+    assert _names(gazetteer, "metadata team") == []
+    assert _names(gazetteer, "worked at Meta, then Google") == ['Meta']
+    assert _names(gazetteer, "go-to person") == ['Go']
+    assert _names(gazetteer, "pineapple") == []
+    assert _names(gazetteer, "Apple Music and Apple") == ['Apple Music', 'Apple']
+    # 全角字符规范化后匹配
+    assert _names(gazetteer, "ＦＡＣＥＢＯＯＫ") == ['Meta']
+
+
+def test_gazetteer_chinese_names_match_inside_text():
+    gazetteer = Gazetteer([{'name': '阿里巴巴', 'aliases': ['阿里']}, '腾讯'])
+    assert _names(gazetteer, "曾在阿里巴巴和腾讯科技工作") == ['阿里巴巴', '腾讯']
+    assert _names(gazetteer, "阿里云") == ['阿里巴巴']
+    assert gazetteer.lookup("阿里")['name'] == '阿里巴巴'
+
+
+def test_alias_signature_changes_only_for_relevant_aliases(kb_data):
+    tokens = normalize_tokens("熟悉 Spring Boot、Rust 和 Haskell")
+    base = KnowledgeBase(kb_data).alias_signature(tokens)
+
+    unrelated = copy.deepcopy(kb_data)
+    unrelated['skill_aliases']['zzz unrelated'] = 'Go'
+    assert KnowledgeBase(unrelated).alias_signature(tokens) == base
+
+    single_word = copy.deepcopy(kb_data)
+    single_word['skill_aliases']['haskell'] = 'Haskell'
+    assert KnowledgeBase(single_word).alias_signature(tokens) != base
+
+    # 多词别名的全部规范化词都出现时才相关
+    partial = copy.deepcopy(kb_data)
+    partial['skill_aliases']['rust belt'] = 'Rust'
+    assert KnowledgeBase(partial).alias_signature(tokens) == base
+    multiword = copy.deepcopy(kb_data)
+    multiword['skill_aliases']['rust haskell'] = 'Rust'
+    assert KnowledgeBase(multiword).alias_signature(tokens) != base
+
+    stopword = copy.deepcopy(kb_data)
+    stopword['stopwords'].append('haskell')
+    assert KnowledgeBase(stopword).alias_signature(tokens) != base
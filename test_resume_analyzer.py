@@ -0,0 +1,96 @@
+"""
+测试简历分节和教育、工作经历的提取
+"""
+import pytest
+
+from resume_analyzer import ResumeAnalyzer, segment_resume, section_text, parse_resume_text
+
+# streamlit_app_enhanced_selenium.py中的示例简历
+EXAMPLE_RESUME = """张三
+电话: 13800138000
+邮箱: zhangsan@example.com
+北京市海淀区
+
+个人简介: 5年Python开发经验，熟悉Web开发和数据分析，有大型项目经验。
+
+教育经历
+清华大学 计算机科学与技术 本科 2015-2019
+
+工作经验
+阿里巴巴 高级Python开发工程师 2019-至今
+- 负责电商平台后端API开发
+- 优化数据处理流程，提高系统性能30%
+- 带领5人小组完成核心模块重构
+
+百度 Python开发实习生 2018-2019
+- 参与搜索引擎数据分析项目
+- 开发数据可视化工具
+
+技能
+Python, Django, Flask, RESTful API, MySQL, Redis, MongoDB, Docker, Git, Linux, JavaScript, HTML, CSS, Vue.js, 数据分析, 机器学习
+"""
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return ResumeAnalyzer().snapshot()
+
+
+def test_segment_resume_only_recognises_line_leading_headers():
+    content = "张三\n教育经历\n清华大学\n工作经历：\n掌握多项技能，负责项目经理工作\n一、专业技能\nPython\n"
+    sections = segment_resume(content)
+    assert set(sections) == {'header', 'education', 'experience', 'skills'}
+    assert section_text(content, sections, 'header') == "张三\n"
+    assert "掌握多项技能" in section_text(content, sections, 'experience')
+    assert section_text(content, sections, 'skills').strip() == "Python"
+
+
+def test_consecutive_entries_keep_their_own_dates(analyzer):
+    text = ("2022.07-至今 阿里巴巴集团 高级Java开发工程师\n"
+            "负责交易系统\n"
+            "2020.01-2022.06 腾讯科技有限公司 后端开发")
+    assert analyzer.extract_experience(text) == [
+        {'company': '阿里巴巴集团', 'position': '高级Java开发工程师', 'start_date': '2022.07', 'end_date': '至今'},
+        {'company': '腾讯科技有限公司', 'position': '后端开发', 'start_date': '2020.01', 'end_date': '2022.06'},
+    ]
+
+
+def test_english_open_end_date(analyzer):
+    text = ("2019.06-present Google Inc. Senior Software Engineer\n"
+            "Built search infrastructure\n"
+            "2017.01-2019.05 Microsoft Corporation Software Engineer")
+    experience = analyzer.extract_experience(text)
+    assert [(e['company'], e['start_date'], e['end_date']) for e in experience] == [
+        ('Google Inc.', '2019.06', 'present'),
+        ('Microsoft Corporation', '2017.01', '2019.05'),
+    ]
+    assert experience[0]['position'] == 'Senior Software Engineer'
+
+
+def test_gazetteer_companies_anchor_entries_only_at_line_start(analyzer):
+    text = "阿里巴巴 高级Python开发工程师 2019-至今\n负责与腾讯合作的项目\n\n百度 Python开发实习生 2018-2019"
+    experience = analyzer.extract_experience(text)
+    assert [(e['company'], e['position'], e['end_date']) for e in experience] == [
+        ('阿里巴巴', '高级Python开发工程师', '至今'),
+        ('百度', 'Python开发实习生', '2019'),
+    ]
+
+
+def test_open_end_counts_until_now(analyzer):
+    analysis = analyzer.analyze_experience([
+        {'company': '阿里巴巴', 'position': '工程师', 'start_date': '2019', 'end_date': '至今'},
+    ])
+    assert analysis['years'] > 0
+
+
+def test_example_resume(analyzer):
+    resume_data = parse_resume_text(EXAMPLE_RESUME, analyzer)
+    assert resume_data['personal_info']['name'] == '张三'
+    assert resume_data['education'] == [
+        {'school': '清华大学', 'degree': '本科', 'major': '计算机科学与技术', 'start_date': '2015', 'end_date': '2019'}
+    ]
+    assert [(e['company'], e['position']) for e in resume_data['experience']] == [
+        ('阿里巴巴', '高级Python开发工程师'),
+        ('百度', 'Python开发实习生'),
+    ]
+    assert 'Python' in resume_data['skills']
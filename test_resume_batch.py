@@ -0,0 +1,78 @@
+"""
+测试批量分析与逐份分析的结果一致
+"""
+import random
+
+from resume_analyzer import ResumeAnalyzer
+from resume_batch import analyze_resumes
+
+SCHOOLS = ['清华大学', '北京邮电大学', '某某学院', 'MIT', 'Summit College', '', '浙江大学城市学院']
+DEGREES = ['本科', '硕士', 'PhD', 'bachelor', '', '大专', 'diploma', '博士研究生']
+MAJORS = ['计算机科学', '金融', 'software engineering', '', '数学']
+COMPANIES = ['腾讯科技', '小公司', 'Google Inc', '', '字节跳动', 'metadata corp']
+POSITIONS = ['高级工程师', '工程师', '技术经理', 'Senior Developer', '', 'intern']
+
+
+def _random_resumes(analyzer, count, seed=3):
+    rng = random.Random(seed)
+    skills = sorted(set(analyzer.knowledge_base.skill_mapping.values())) + ['Unknown1', 'Unknown2']
+    resumes = []
+    for i in range(count):
+        resume = {
+            'personal_info': {'name': f'n{i}'} if rng.random() < 0.9 else {},
+            'skills': rng.sample(skills, rng.randint(0, 20)),
+            'education': [{'school': rng.choice(SCHOOLS), 'degree': rng.choice(DEGREES), 'major': rng.choice(MAJORS)}
+                          for _ in range(rng.randint(0, 3))],
+            'experience': [],
+        }
+        for _ in range(rng.randint(0, 4)):
+            end_date = rng.choice(['', f'{rng.randint(2005, 2024)}.0{rng.randint(1, 9)}', '至今', 'present',
+                                   f'{rng.randint(2005, 2024)}'])
+            resume['experience'].append({
+                'company': rng.choice(COMPANIES), 'position': rng.choice(POSITIONS),
+                'start_date': f'{rng.randint(2005, 2024)}' if rng.random() < 0.9 else '', 'end_date': end_date,
+            })
+        resumes.append(resume)
+    return resumes
+
+
+def _expected_columns(analysis, knowledge_base):
+    scores = analysis['overall_score']['component_scores']
+    expected = {
+        'name': analysis['personal_summary']['name'],
+        'skill_count': analysis['skills_analysis']['skill_count'],
+        'skill_level': analysis['skills_analysis']['skill_level'],
+        **analysis['career_direction'],
+        **analysis['education_analysis'],
+        **analysis['experience_analysis'],
+        'skill_score': scores['skills'],
+        'education_score': scores['education'],
+        'experience_score': scores['experience'],
+        'overall_score': analysis['overall_score']['overall_score'],
+        'level': analysis['overall_score']['level'],
+    }
+    for category in knowledge_base.skill_categories:
+        expected[f'category_{category}'] = analysis['skills_analysis']['skill_categories'].get(category, 0)
+    return expected
+
+
+def test_analyze_resumes_matches_analyze_resume():
+    analyzer = ResumeAnalyzer().snapshot()
+    resumes = _random_resumes(analyzer, 500)
+    frame = analyze_resumes(resumes, analyzer)
+    assert len(frame) == len(resumes)
+
+    for position, resume in enumerate(resumes):
+        row = frame.iloc[position]
+        for column, value in _expected_columns(analyzer.analyze_resume(resume), analyzer.knowledge_base).items():
+            if isinstance(value, float):
+                assert abs(row[column] - value) < 1e-9, (position, column)
+            else:
+                assert row[column] == value, (position, column)
+
+
+def test_analyze_resumes_empty_batch():
+    analyzer = ResumeAnalyzer().snapshot()
+    frame = analyze_resumes([], analyzer)
+    assert len(frame) == 0
+    assert frame.attrs['kb_version'] == analyzer.kb_version
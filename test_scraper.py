@@ -2,7 +2,6 @@
 测试修复后的web_scraper_selenium模块
 """
 import os
-import sys
 import logging
 import json
 from datetime import datetime
@@ -11,14 +10,8 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# 导入修复后的模块
-sys.path.append('/home/ubuntu')
-try:
-    from web_scraper_selenium_fixed import JobScraper, search_jobs_with_selenium
-    logger.info("成功导入修复后的web_scraper_selenium模块")
-except ImportError as e:
-    logger.error(f"导入修复后的web_scraper_selenium模块失败: {str(e)}")
-    sys.exit(1)
+# 导入抓取模块
+from web_scraper_selenium import JobScraper, search_jobs_with_selenium
 
 def test_job_scraper():
     """测试JobScraper类"""
@@ -5,23 +5,54 @@ AI简历职位匹配系统 - 网页抓取模块
 import os
 import json
 import time
+import atexit
+import asyncio
+import weakref
 import subprocess
 import requests
 from typing import List, Dict, Any, Optional, Union
 
+from job_ids import make_job_id
+from knowledge_base import get_knowledge_base
+
+# 异步HTTP客户端为可选依赖，不可用时异步接口在线程中调用同步实现
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# 异步搜索时同时抓取的详情页数量
+ASYNC_SCRAPE_CONCURRENCY = 8
+
 class JobScraper:
     """招聘网站职位信息抓取类"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, mcp_url: Optional[str] = None):
         """
         初始化职位抓取器
         
         Args:
             api_key: Firecrawl API密钥，如果为None则尝试从环境变量获取
+            mcp_url: MCP服务器地址，如果为None则尝试从环境变量FIRECRAWL_MCP_URL获取
         """
         self.api_key = api_key or os.environ.get("FIRECRAWL_API_KEY")
         self.mcp_process = None
-        self.mcp_url = "http://localhost:8787"  # MCP服务器默认地址
+        # MCP服务器默认地址，可指向本地替身服务器(mock_mcp_server.py)
+        self.mcp_url = mcp_url or os.environ.get("FIRECRAWL_MCP_URL", "http://localhost:8787")
+        
+    def _check_health(self) -> bool:
+        """
+        检查MCP服务器是否可用
+        
+        Returns:
+            bool: 服务器是否正常响应
+        """
+        try:
+            response = requests.get(f"{self.mcp_url}/health", timeout=2)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
         
     def start_mcp_server(self) -> bool:
         """
@@ -33,6 +64,10 @@ class JobScraper:
         if self.mcp_process is not None:
             print("MCP服务器已经在运行")
             return True
+        
+        # 如果地址上已有服务器（外部启动的MCP或本地替身服务器），直接复用
+        if self._check_health():
+            return True
             
         try:
             # 使用subprocess启动MCP服务器
@@ -87,22 +122,8 @@ class JobScraper:
         Returns:
             List[Dict[str, Any]]: 职位信息列表
         """
-        search_query = f"{keywords} {location} 招聘"
-        
         # 构建搜索请求
-        search_request = {
-            "name": "firecrawl_search",
-            "arguments": {
-                "query": search_query,
-                "limit": limit,
-                "lang": "zh",
-                "country": "cn",
-                "scrapeOptions": {
-                    "formats": ["markdown"],
-                    "onlyMainContent": True
-                }
-            }
-        }
+        search_request = self._build_search_request(keywords, location, limit)
         
         try:
             # 发送请求到MCP服务器
@@ -120,13 +141,11 @@ class JobScraper:
             # 处理搜索结果
             job_listings = []
             
-            if "content" in search_results and isinstance(search_results["content"], list):
-                for item in search_results["content"]:
-                    if "url" in item and "text" in item:
-                        # 抓取每个搜索结果的详细内容
-                        job_details = self.scrape_job_page(item["url"])
-                        if job_details:
-                            job_listings.append(job_details)
+            for url in self._extract_result_urls(search_results):
+                # 抓取每个搜索结果的详细内容
+                job_details = self.scrape_job_page(url)
+                if job_details:
+                    job_listings.append(job_details)
             
             return job_listings
             
@@ -145,20 +164,7 @@ class JobScraper:
             Dict[str, Any]: 职位详情信息
         """
         # 构建抓取请求
-        scrape_request = {
-            "name": "firecrawl_scrape",
-            "arguments": {
-                "url": url,
-                "formats": ["markdown"],
-                "onlyMainContent": True,
-                "waitFor": 1000,
-                "timeout": 30000,
-                "mobile": False,
-                "includeTags": ["article", "main", "div.job-description", "div.job-detail"],
-                "excludeTags": ["nav", "footer", "header", "aside"],
-                "skipJsVerification": False
-            }
-        }
+        scrape_request = self._build_scrape_request(url)
         
         try:
             # 发送请求到MCP服务器
@@ -181,6 +187,139 @@ class JobScraper:
             print(f"抓取职位页面时出错: {e}")
             return {}
     
+    def _build_search_request(self, keywords: str, location: str, limit: int) -> Dict[str, Any]:
+        """构建firecrawl_search请求"""
+        return {
+            "name": "firecrawl_search",
+            "arguments": {
+                "query": f"{keywords} {location} 招聘",
+                "limit": limit,
+                "lang": "zh",
+                "country": "cn",
+                "scrapeOptions": {
+                    "formats": ["markdown"],
+                    "onlyMainContent": True
+                }
+            }
+        }
+    
+    def _build_scrape_request(self, url: str) -> Dict[str, Any]:
+        """构建firecrawl_scrape请求"""
+        return {
+            "name": "firecrawl_scrape",
+            "arguments": {
+                "url": url,
+                "formats": ["markdown"],
+                "onlyMainContent": True,
+                "waitFor": 1000,
+                "timeout": 30000,
+                "mobile": False,
+                "includeTags": ["article", "main", "div.job-description", "div.job-detail"],
+                "excludeTags": ["nav", "footer", "header", "aside"],
+                "skipJsVerification": False
+            }
+        }
+    
+    @staticmethod
+    def _extract_result_urls(search_results: Dict[str, Any]) -> List[str]:
+        """从搜索结果中取出职位页面URL"""
+        urls = []
+        if "content" in search_results and isinstance(search_results["content"], list):
+            for item in search_results["content"]:
+                if "url" in item and "text" in item:
+                    urls.append(item["url"])
+        return urls
+    
+    async def _post_mcp_async(self, session: 'aiohttp.ClientSession', payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        异步发送MCP工具调用
+        
+        Args:
+            session: aiohttp会话
+            payload: 请求内容
+            
+        Returns:
+            Optional[Dict[str, Any]]: 响应内容，请求失败时返回None
+        """
+        async with session.post(f"{self.mcp_url}/mcp", json=payload) as response:
+            if response.status != 200:
+                print(f"{payload['name']}请求失败: {response.status}")
+                return None
+            return await response.json(content_type=None)
+    
+    async def check_health_async(self, session: 'aiohttp.ClientSession') -> bool:
+        """
+        异步检查MCP服务器是否可用
+        
+        Args:
+            session: aiohttp会话
+            
+        Returns:
+            bool: 服务器是否正常响应
+        """
+        try:
+            async with session.get(f"{self.mcp_url}/health", timeout=aiohttp.ClientTimeout(total=2)) as response:
+                return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+    
+    async def scrape_job_page_async(self, url: str, session: 'aiohttp.ClientSession') -> Dict[str, Any]:
+        """
+        异步抓取职位详情页面
+        
+        Args:
+            url: 职位页面URL
+            session: aiohttp会话
+            
+        Returns:
+            Dict[str, Any]: 职位详情信息
+        """
+        try:
+            scrape_result = await self._post_mcp_async(session, self._build_scrape_request(url))
+            if scrape_result is None:
+                return {}
+            return self._parse_job_content(scrape_result, url)
+        except aiohttp.ClientError as e:
+            print(f"抓取职位页面时出错: {e}")
+            return {}
+    
+    async def search_jobs_async(self, keywords: str, location: str = "", limit: int = 10,
+                                session: Optional['aiohttp.ClientSession'] = None) -> List[Dict[str, Any]]:
+        """
+        异步搜索职位信息，详情页并发抓取（最多ASYNC_SCRAPE_CONCURRENCY个同时进行）
+        
+        取消和超时会直接向上传递，其他错误返回空列表
+        
+        Args:
+            keywords: 搜索关键词
+            location: 位置信息
+            limit: 结果数量限制
+            session: aiohttp会话，为None时临时创建
+            
+        Returns:
+            List[Dict[str, Any]]: 职位信息列表
+        """
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.search_jobs_async(keywords, location, limit, own_session)
+        
+        try:
+            search_results = await self._post_mcp_async(session, self._build_search_request(keywords, location, limit))
+        except aiohttp.ClientError as e:
+            print(f"搜索职位时出错: {e}")
+            return []
+        if search_results is None:
+            return []
+        
+        semaphore = asyncio.Semaphore(ASYNC_SCRAPE_CONCURRENCY)
+        
+        async def scrape(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.scrape_job_page_async(url, session)
+        
+        pages = await asyncio.gather(*(scrape(url) for url in self._extract_result_urls(search_results)))
+        return [job for job in pages if job]
+    
     def batch_scrape_jobs(self, urls: List[str]) -> List[Dict[str, Any]]:
         """
         批量抓取多个职位页面
@@ -307,10 +446,11 @@ class JobScraper:
         Returns:
             Dict[str, Any]: 解析后的职位信息
         """
+        platform = self._extract_platform_from_url(url)
         job_info = {
-            'id': f"job_{hash(url) % 10000}",
+            'id': make_job_id(platform, url),
             'url': url,
-            'platform': self._extract_platform_from_url(url),
+            'platform': platform,
             'title': '',
             'company': '',
             'location': '',
@@ -414,11 +554,10 @@ class JobScraper:
                 if end_idx > start_idx:
                     return text[start_idx:end_idx].strip()
         
-        # 如果没有找到明确标识，尝试识别常见城市名称
-        common_cities = ["北京", "上海", "广州", "深圳", "杭州", "南京", "成都", "武汉", "西安", "苏州", "天津", "重庆"]
-        for city in common_cities:
-            if city in text[:500]:  # 只在前面部分查找
-                return city
+        # 如果没有找到明确标识，用知识库的城市词典一次扫描识别城市名称（含拼音别名）
+        city = get_knowledge_base().cities.find(text[:500])  # 只在前面部分查找
+        if city is not None:
+            return city['name']
         
         return "未知地点"
     
@@ -635,6 +774,85 @@ def search_jobs_with_mcp(keywords: str, location: str = "", limit: int = 10, pla
         scraper.stop_mcp_server()
 
 
+async def search_jobs_with_mcp_async(keywords: str, location: str = "", limit: int = 10, platform: str = "MCP抓取") -> List[Dict[str, Any]]:
+    """
+    search_jobs_with_mcp的异步版本：MCP调用使用aiohttp非阻塞执行，
+    aiohttp不可用时在线程中调用同步实现；MCP服务器在进程内共享，不随单次调用停止
+    
+    Args:
+        keywords: 搜索关键词
+        location: 位置信息
+        limit: 结果数量限制
+        platform: 平台标识
+        
+    Returns:
+        List[Dict[str, Any]]: 职位信息列表
+    """
+    api_key = os.environ.get("FIRECRAWL_API_KEY")
+    if not AIOHTTP_AVAILABLE or not api_key:
+        return await asyncio.to_thread(search_jobs_with_mcp, keywords, location, limit, platform)
+    
+    async with aiohttp.ClientSession() as session:
+        scraper = await _get_mcp_scraper_async(api_key, session)
+        if scraper is None:
+            print("启动MCP服务器失败，将使用模拟数据")
+            return await asyncio.to_thread(_search_jobs_mock, keywords, location, limit, platform)
+        jobs = await scraper.search_jobs_async(keywords, location, limit, session)
+    
+    if not jobs:
+        print("未找到职位信息，将使用模拟数据")
+        return await asyncio.to_thread(_search_jobs_mock, keywords, location, limit, platform)
+    return jobs
+
+
+# 进程级共享的MCP服务器：异步搜索首次需要时启动，之后的调用复用，进程退出时停止
+_mcp_scraper = None
+# 启动锁按事件循环区分（asyncio.Lock不能跨事件循环使用）
+_mcp_start_locks = weakref.WeakKeyDictionary()
+
+
+async def _get_mcp_scraper_async(api_key: str, session: 'aiohttp.ClientSession') -> Optional[JobScraper]:
+    """
+    获取进程级共享的抓取器，MCP服务器不可用时在锁内启动，并发调用只启动一次
+    
+    Args:
+        api_key: Firecrawl API密钥
+        session: aiohttp会话
+        
+    Returns:
+        Optional[JobScraper]: 抓取器，服务器启动失败时返回None
+    """
+    global _mcp_scraper
+    lock = _mcp_start_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+    async with lock:
+        scraper = _mcp_scraper
+        if scraper is None:
+            scraper = JobScraper(api_key)
+        # 已有可用的服务器（本进程启动的、外部启动的或本地替身服务器）时直接使用
+        if await scraper.check_health_async(session):
+            _mcp_scraper = scraper
+            return scraper
+        # 服务器不可用（尚未启动或已退出），在线程中启动（启动过程是阻塞的）
+        scraper.stop_mcp_server()
+        if not await asyncio.to_thread(scraper.start_mcp_server):
+            return None
+        _mcp_scraper = scraper
+        return scraper
+
+
+@atexit.register
+def _stop_shared_mcp_server() -> None:
+    """进程退出时停止共享的MCP服务器（未由本进程启动时不做任何事）"""
+    if _mcp_scraper is not None:
+        _mcp_scraper.stop_mcp_server()
+
+
+def _search_jobs_mock(keywords: str, location: str, limit: int, platform: str) -> List[Dict[str, Any]]:
+    """生成模拟职位数据"""
+    from streamlit_app import search_jobs as search_jobs_mock
+    return search_jobs_mock(keywords, location, limit, platform)
+
+
 if __name__ == "__main__":
     # 测试代码
     api_key = os.environ.get("FIRECRAWL_API_KEY")
@@ -4,13 +4,21 @@ AI简历职位匹配系统 - 网页抓取模块 (Streamlit Cloud兼容版)
 """
 import os
 import re
+import copy
 import time
 import random
 import json
 import logging
-from typing import List, Dict, Any, Optional, Union
+import threading
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from job_ids import make_job_id
+from cache_manager import get_job_cache, DEFAULT_SOFT_TTL, DEFAULT_HARD_TTL
+from query_normalizer import canonical_search_key, normalize_city
+from single_flight import SingleFlight
+
 # 尝试导入Selenium相关库，如果失败则提供备用方案
 try:
     from selenium import webdriver
@@ -39,6 +47,13 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 后台刷新任务：线程数有限，避免同时启动过多浏览器
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-refresh")
+_refreshing_keys = set()
+_refresh_lock = threading.Lock()
+# 后台刷新与前台搜索、预热使用相同的合并键和cache/locks下的文件锁，同一搜索在多个进程间只抓取一次
+_refresh_flight = SingleFlight(os.path.join("./cache", "locks"))
+
 class JobScraper:
     """职位抓取器，使用Selenium和BeautifulSoup抓取招聘网站职位信息"""
     
@@ -51,11 +66,22 @@ class JobScraper:
         self.headless = headless
         self.driver = None
         self.cache_dir = "./cache"
-        self.cache_duration = 24 * 60 * 60  # 缓存有效期（秒）
+        self.cache_duration = DEFAULT_SOFT_TTL  # 缓存有效期（秒）
+        
+        # stale-while-revalidate：soft_ttl内的缓存直接返回；soft_ttl到hard_ttl之间返回旧结果并在后台刷新
+        self.stale_while_revalidate = True
+        self.hard_ttl = DEFAULT_HARD_TTL
+        
+        # 同步抓取时每凑够多少个职位回调一次on_batch
+        self.stream_batch_size = 5
         
         # 确保缓存目录存在
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        
+        # 两级缓存：进程内LRU内存层 + SQLite职位库磁盘层，同一进程内的抓取器共享
+        self.job_cache = get_job_cache(self.cache_dir)
+        self.job_store = self.job_cache.store
     
     def _init_driver(self) -> bool:
         """初始化Selenium WebDriver
@@ -106,6 +132,11 @@ class JobScraper:
             logger.error(f"初始化WebDriver失败: {str(e)}")
             return False
     
+    @property
+    def soft_ttl(self) -> float:
+        """软过期时间，与cache_duration相同"""
+        return self.cache_duration
+    
     def _close_driver(self):
         """关闭WebDriver"""
         if self.driver:
@@ -115,8 +146,8 @@ class JobScraper:
                 pass
             self.driver = None
     
-    def _get_cache_path(self, query: str, location: str, platform: str) -> str:
-        """获取缓存文件路径
+    def _get_cache_key(self, query: str, location: str, platform: str) -> str:
+        """获取缓存键
         
         Args:
             query: 搜索关键词
@@ -124,59 +155,72 @@ class JobScraper:
             platform: 平台
         
         Returns:
-            str: 缓存文件路径
+            str: 缓存键
         """
-        # 规范化参数，移除特殊字符
-        query = re.sub(r'[^\w\s]', '', query).strip().lower()
-        location = re.sub(r'[^\w\s]', '', location).strip().lower()
-        platform = re.sub(r'[^\w\s]', '', platform).strip().lower()
-        
-        # 生成缓存文件名
-        cache_file = f"jobs_{platform}_{query}_{location}.json"
-        return os.path.join(self.cache_dir, cache_file)
+        # 关键词切分排序、城市规范化，近似重复的搜索共用同一缓存键
+        return canonical_search_key(query, location, platform)
     
-    def _load_from_cache(self, query: str, location: str, platform: str) -> Optional[List[Dict[str, Any]]]:
-        """从缓存加载职位信息
+    def _load_cache_entry(self, query: str, location: str, platform: str, limit: Optional[int] = None) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        """从两级缓存加载搜索结果及其保存时间，不检查过期
+        
+        同一搜索的结果不足limit时，尝试从不限地点的同一关键词搜索结果中按城市筛选
         
         Args:
             query: 搜索关键词
             location: 地点
             platform: 平台
+            limit: 需要的结果数量，None表示不限
         
         Returns:
-            Optional[List[Dict[str, Any]]]: 职位列表，如果缓存不存在或已过期则返回None
+            Optional[Tuple[float, List[Dict[str, Any]]]]: (保存时间戳, 职位列表)，缓存不存在时返回None
         """
-        cache_path = self._get_cache_path(query, location, platform)
+        cache_key = self._get_cache_key(query, location, platform)
+        city = normalize_city(location)
+        superset_keys = (self._get_cache_key(query, "", platform),) if city else ()
         
-        if not os.path.exists(cache_path):
+        try:
+            return self.job_cache.lookup(cache_key, limit, city, superset_keys)
+        except Exception as e:
+            logger.error(f"读取缓存失败: {str(e)}")
             return None
+    
+    def _load_from_cache(self, query: str, location: str, platform: str) -> Optional[List[Dict[str, Any]]]:
+        """从两级缓存加载搜索结果
         
-        # 检查缓存是否过期
-        file_time = os.path.getmtime(cache_path)
-        current_time = time.time()
-        if current_time - file_time > self.cache_duration:
-            return None
+        Args:
+            query: 搜索关键词
+            location: 地点
+            platform: 平台
+        
+        Returns:
+            Optional[List[Dict[str, Any]]]: 职位列表，如果缓存不存在或已过期则返回None
+        """
+        cache_key = self._get_cache_key(query, location, platform)
         
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
+            return self.job_cache.get(cache_key, max_age=self.cache_duration)
+        except Exception as e:
+            logger.error(f"读取缓存失败: {str(e)}")
             return None
     
-    def _save_to_cache(self, jobs: List[Dict[str, Any]], query: str, location: str, platform: str):
-        """将职位信息保存到缓存
+    def _save_to_cache(self, jobs: List[Dict[str, Any]], query: str, location: str, platform: str, limit: int = 0,
+                       reused_ids: Iterable[str] = (), exhausted: bool = False):
+        """将搜索结果保存到两级缓存
         
         Args:
             jobs: 职位列表
             query: 搜索关键词
             location: 地点
             platform: 平台
+            limit: 搜索时请求的结果数量
+            reused_ids: 直接复用职位库数据、没有重新打开详情页的职位ID
+            exhausted: 结果是否已经完整
         """
-        cache_path = self._get_cache_path(query, location, platform)
+        cache_key = self._get_cache_key(query, location, platform)
         
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(jobs, f, ensure_ascii=False, indent=2)
+            self.job_cache.put(cache_key, jobs, platform, query, location, request_limit=limit,
+                               reused_ids=reused_ids, exhausted=exhausted)
         except Exception as e:
             logger.error(f"保存缓存失败: {str(e)}")
     
@@ -416,4 +460,369 @@ class JobScraper:
             
             # 提取工作地点
             location_elem = soup.select_one('.basic-infor span')
-            if location_el<response clipped><NOTE>To save on context only part of this file has been shown to you. You should retry this tool after you have searched inside the file with `grep -n` in order to find the line numbers of what you are looking for.</NOTE>
\ No newline at end of file
+            if location_elem:
+                job_details['location'] = location_elem.text.strip()
+            
+            # 提取职位描述
+            description_elem = soup.select_one('.content.content-word')
+            if description_elem:
+                job_details['description'] = description_elem.text.strip()
+            
+            # 提取要求技能
+            skills = []
+            skill_elems = soup.select('.tag-list span')
+            for skill_elem in skill_elems:
+                skills.append(skill_elem.text.strip())
+            job_details['required_skills'] = skills
+            
+            # 提取教育和经验要求
+            job_request = soup.select('.job-qualifications span')
+            if len(job_request) >= 2:
+                job_details['education_requirement'] = job_request[0].text.strip()
+                job_details['experience_requirement'] = job_request[1].text.strip()
+                # 尝试提取经验年限数字
+                if job_details['experience_requirement']:
+                    experience_match = re.search(r'(\d+)-(\d+)年', job_details['experience_requirement'])
+                    if experience_match:
+                        job_details['experience_years'] = int(experience_match.group(2))
+                    else:
+                        job_details['experience_years'] = 0
+        
+        return job_details
+    
+    def _get_search_url(self, keywords: str, location: str, platform: str) -> str:
+        """获取平台搜索页面URL
+        
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            platform: 平台
+        
+        Returns:
+            str: 搜索页面URL，平台不支持时返回空字符串
+        """
+        from urllib.parse import quote
+        
+        kw = quote(keywords)
+        city = quote(location)
+        
+        if platform == "智联招聘":
+            return f"https://sou.zhaopin.com/?jl={city}&kw={kw}"
+        elif platform == "前程无忧":
+            return f"https://we.51job.com/pc/search?keyword={kw}&searchType=2"
+        elif platform == "BOSS直聘":
+            return f"https://www.zhipin.com/web/geek/job?query={kw}"
+        elif platform == "拉勾网":
+            return f"https://www.lagou.com/wn/jobs?kd={kw}&city={city}"
+        elif platform == "猎聘网":
+            return f"https://www.liepin.com/zhaopin/?key={kw}"
+        return ""
+    
+    def _get_job_links(self, platform: str, limit: int) -> List[str]:
+        """从当前搜索结果页面提取职位详情链接
+        
+        Args:
+            platform: 平台
+            limit: 结果数量限制
+        
+        Returns:
+            List[str]: 职位详情页面URL列表
+        """
+        # 各平台职位详情页链接的特征
+        link_patterns = {
+            "智联招聘": "jobs.zhaopin.com",
+            "前程无忧": "jobs.51job.com",
+            "BOSS直聘": "/job_detail/",
+            "拉勾网": "/jobs/",
+            "猎聘网": "/job/"
+        }
+        pattern = link_patterns.get(platform, "")
+        
+        links = []
+        for elem in self.driver.find_elements(By.TAG_NAME, "a"):
+            href = elem.get_attribute("href") or ""
+            if pattern and pattern in href and href not in links:
+                links.append(href)
+                if len(links) >= limit:
+                    break
+        return links
+    
+    def search_jobs(self, keywords: str, location: str = "北京", platform: str = "智联招聘", limit: int = 10) -> List[Dict[str, Any]]:
+        """搜索职位
+        
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            platform: 平台
+            limit: 结果数量限制
+        
+        Returns:
+            List[Dict[str, Any]]: 职位列表
+        """
+        jobs, _ = self.search_jobs_with_meta(keywords, location, platform, limit)
+        return jobs
+    
+    def search_jobs_with_meta(self, keywords: str, location: str = "北京", platform: str = "智联招聘", limit: int = 10,
+                              on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """搜索职位，并返回结果的来源和新鲜度
+        
+        缓存年龄小于soft_ttl时直接返回；介于soft_ttl和hard_ttl之间时立即返回旧结果，
+        同时在后台刷新（stale-while-revalidate）；超过hard_ttl或没有缓存时同步抓取。
+        
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            platform: 平台
+            limit: 结果数量限制
+            on_batch: 同步抓取时每抓到一批职位调用一次，用于逐步显示结果
+        
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, Any]]: (职位列表, 元数据)，元数据包含
+                source（cache/live/mock）、age_seconds、stale和refreshing
+        """
+        entry = self._load_cache_entry(keywords, location, platform, limit)
+        if entry is not None:
+            created_at, cached_jobs = entry
+            age = max(0.0, time.time() - created_at)
+            max_age = self.hard_ttl if self.stale_while_revalidate else self.soft_ttl
+            if age <= max_age:
+                stale = age > self.soft_ttl
+                refreshing = stale and self._schedule_refresh(keywords, location, platform, limit)
+                logger.info(f"从缓存加载职位: {platform} {keywords} {location} (缓存{int(age)}秒{'，后台刷新中' if refreshing else ''})")
+                meta = {'source': 'cache', 'age_seconds': age, 'stale': stale, 'refreshing': refreshing}
+                return cached_jobs[:limit], meta
+        
+        jobs = self._crawler()._crawl_jobs(keywords, location, platform, limit, on_batch)
+        if jobs is None:
+            meta = {'source': 'mock', 'age_seconds': 0.0, 'stale': False, 'refreshing': False}
+            return self._generate_mock_jobs(keywords, location, limit), meta
+        
+        meta = {'source': 'live', 'age_seconds': 0.0, 'stale': False, 'refreshing': False}
+        return jobs, meta
+    
+    def _crawler(self) -> 'JobScraper':
+        """复制出一个使用独立WebDriver的抓取器
+        
+        每次抓取都在副本上创建和关闭WebDriver，同一个抓取器被多个会话或线程共享时，
+        并发的抓取不会互相替换或关闭对方的浏览器
+        
+        Returns:
+            JobScraper: 与当前抓取器配置相同、尚未启动浏览器的副本
+        """
+        crawler = copy.copy(self)
+        crawler.driver = None
+        return crawler
+    
+    def _schedule_refresh(self, keywords: str, location: str, platform: str, limit: int) -> bool:
+        """在后台线程中重新抓取一次搜索，同一搜索同时只会有一个刷新任务
+        
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            platform: 平台
+            limit: 结果数量限制
+        
+        Returns:
+            bool: 该搜索当前是否有刷新任务在运行
+        """
+        cache_key = self._get_cache_key(keywords, location, platform)
+        with _refresh_lock:
+            if cache_key in _refreshing_keys:
+                return True
+            _refreshing_keys.add(cache_key)
+        
+        def crawl():
+            # 拿到锁后先检查磁盘层：其他进程或预热器可能已经刷新了这次搜索
+            info = self.job_cache.store.get_search_info(cache_key)
+            if info is not None and info['request_limit'] >= limit and time.time() - info['created_at'] <= self.soft_ttl:
+                logger.info(f"搜索已由其他进程刷新，跳过后台抓取: {cache_key}")
+                return None
+            # 使用独立的抓取器，避免与前台请求共用WebDriver
+            return self._crawler()._crawl_jobs(keywords, location, platform, limit)
+        
+        def refresh():
+            try:
+                _refresh_flight.do(f"{cache_key}|{limit}", crawl)
+            except Exception as e:
+                logger.error(f"后台刷新职位失败: {str(e)}")
+            finally:
+                with _refresh_lock:
+                    _refreshing_keys.discard(cache_key)
+        
+        _refresh_executor.submit(refresh)
+        return True
+    
+    def _crawl_jobs(self, keywords: str, location: str, platform: str, limit: int,
+                    on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Optional[List[Dict[str, Any]]]:
+        """使用Selenium抓取职位并写入缓存
+        
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            platform: 平台
+            limit: 结果数量限制
+            on_batch: 每抓到stream_batch_size个职位调用一次
+        
+        Returns:
+            Optional[List[Dict[str, Any]]]: 职位列表，无法抓取时返回None
+        """
+        search_url = self._get_search_url(keywords, location, platform)
+        if not search_url or not BS4_AVAILABLE or not self._init_driver():
+            logger.warning(f"无法抓取{platform}，使用模拟数据")
+            return None
+        
+        jobs = []
+        pending = []
+        reused_ids = set()
+        # 只有列表页的职位少于请求数量、且每个职位都抓取成功时，结果才是完整的
+        exhausted = False
+        
+        def emit(job: Dict[str, Any]) -> None:
+            jobs.append(job)
+            if on_batch is None:
+                return
+            pending.append(job)
+            if len(pending) >= self.stream_batch_size:
+                on_batch(list(pending))
+                pending.clear()
+        
+        try:
+            self.driver.set_page_load_timeout(30)
+            self.driver.get(search_url)
+            self._random_delay()
+            
+            job_links = self._get_job_links(platform, limit)
+            logger.info(f"在{platform}找到{len(job_links)}个职位链接")
+            
+            # 已在职位库中且未过期的职位直接复用，不再打开详情页
+            known_jobs = self.job_store.get_jobs(
+                [make_job_id(platform, url) for url in job_links], max_age=self.cache_duration
+            )
+            
+            for url in job_links:
+                job_id = make_job_id(platform, url)
+                if job_id in known_jobs:
+                    reused_ids.add(job_id)
+                    emit(known_jobs[job_id])
+                    continue
+                
+                try:
+                    self.driver.get(url)
+                    self._random_delay()
+                    job_details = self._extract_job_details_from_html(self.driver.page_source, platform)
+                except (TimeoutException, WebDriverException) as e:
+                    logger.warning(f"抓取职位详情失败: {url} - {str(e)}")
+                    continue
+                
+                if not job_details.get('title'):
+                    continue
+                
+                # 补全缺失字段
+                job = {
+                    'id': job_id,
+                    'title': '',
+                    'company': '',
+                    'location': location,
+                    'salary_range': '面议',
+                    'url': url,
+                    'platform': platform,
+                    'description': '',
+                    'required_skills': [],
+                    'education_requirement': '本科',
+                    'experience_requirement': '不限',
+                    'experience_years': 0
+                }
+                job.update(job_details)
+                emit(job)
+            
+            exhausted = len(job_links) < limit and len(jobs) == len(job_links)
+        except Exception as e:
+            logger.error(f"抓取{platform}职位失败: {str(e)}")
+        finally:
+            self._close_driver()
+        
+        if pending:
+            on_batch(list(pending))
+        
+        if not jobs:
+            logger.warning(f"未从{platform}抓取到职位，使用模拟数据")
+            return None
+        
+        self._save_to_cache(jobs, keywords, location, platform, limit, reused_ids, exhausted)
+        return jobs
+    
+    def _generate_mock_jobs(self, keywords: str, location: str, limit: int) -> List[Dict[str, Any]]:
+        """生成模拟职位数据
+        
+        Args:
+            keywords: 搜索关键词
+            location: 地点
+            limit: 结果数量限制
+        
+        Returns:
+            List[Dict[str, Any]]: 职位列表
+        """
+        # 根据查询关键词确定职位类型和技能
+        keywords_lower = keywords.lower()
+        if "python" in keywords_lower:
+            job_titles = ["Python开发工程师", "高级Python开发工程师", "Python后端工程师"]
+            skills = ["Python", "Django", "Flask", "MySQL", "Redis", "Docker", "Git", "Linux"]
+        elif "java" in keywords_lower:
+            job_titles = ["Java开发工程师", "高级Java开发工程师", "Java架构师"]
+            skills = ["Java", "Spring", "Spring Boot", "MySQL", "Redis", "Kubernetes", "微服务", "Git"]
+        elif "前端" in keywords_lower or "frontend" in keywords_lower:
+            job_titles = ["前端开发工程师", "高级前端工程师", "Web前端开发"]
+            skills = ["JavaScript", "TypeScript", "HTML", "CSS", "React", "Vue.js", "Webpack", "Git"]
+        elif "数据" in keywords_lower:
+            job_titles = ["数据分析师", "数据工程师", "数据挖掘工程师"]
+            skills = ["Python", "SQL", "MySQL", "Pandas", "NumPy", "机器学习", "Spark"]
+        else:
+            job_titles = [f"{keywords}工程师", f"高级{keywords}工程师", f"{keywords}专家"]
+            skills = ["Python", "Java", "JavaScript", "MySQL", "Git", "Linux"]
+        
+        companies = ["阿里巴巴", "腾讯", "百度", "京东", "美团", "字节跳动", "滴滴", "小米", "华为", "网易"]
+        experience_options = [("1-3年", 3), ("3-5年", 5), ("5-10年", 10)]
+        
+        jobs = []
+        for i in range(limit):
+            title = random.choice(job_titles)
+            company = random.choice(companies)
+            experience_requirement, experience_years = random.choice(experience_options)
+            required_skills = random.sample(skills, k=min(len(skills), random.randint(4, 6)))
+            
+            jobs.append({
+                'id': make_job_id("模拟数据", "", keywords, location, title, company, i),
+                'title': title,
+                'company': company,
+                'location': location,
+                'salary_range': random.choice(["15K-20K", "20K-30K", "25K-35K", "30K-40K", "35K-50K"]),
+                'url': "",
+                'platform': "模拟数据",
+                'description': f"{company}招聘{title}，需要熟悉{', '.join(required_skills[:3])}等技能。",
+                'required_skills': required_skills,
+                'education_requirement': random.choice(["本科", "硕士"]),
+                'experience_requirement': experience_requirement,
+                'experience_years': experience_years
+            })
+        
+        return jobs
+
+
+def search_jobs_with_selenium(keywords: str, location: str = "北京", platform: str = "智联招聘", limit: int = 10) -> List[Dict[str, Any]]:
+    """使用Selenium抓取招聘网站职位信息的接口函数
+    
+    Args:
+        keywords: 搜索关键词
+        location: 地点
+        platform: 平台
+        limit: 结果数量限制
+    
+    Returns:
+        List[Dict[str, Any]]: 职位列表
+    """
+    scraper = JobScraper(headless=True)
+    return scraper.search_jobs(keywords, location, platform, limit)
+
+
+# 导出函数
+__all__ = ['JobScraper', 'search_jobs_with_selenium']